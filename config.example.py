@@ -18,9 +18,39 @@ DB_PATH = "data/medical_costs.db"
 DB_CONFIG = {
     "path": DB_PATH,
     "backup_path": "data/backups/medical_costs_backup.db",
+    "backup_keep": 7,  # Nombre de sauvegardes conservées
+    "backup_step_pages": 256,  # Pages copiées par étape de sauvegarde
+    "backup_step_sleep": 0.05,  # Pause (s) entre deux étapes
+    "backup_max_restarts": 10,  # Reprises (écritures concurrentes) avant abandon
+    "backup_max_duration": 600,  # Durée maximale (s) d'une sauvegarde
     "max_connections": 10,
     "timeout": 30,
     "echo": False,
+    # Patients synthétiques ajoutés aux données réelles à la création de la
+    # base (0 : uniquement data/insurance.csv)
+    "synthetic_patients": 0,
+    # Mesure des requêtes SQL et journal des requêtes lentes
+    "query_stats": True,
+    "slow_query_ms": 250,  # Seuil (ms) du journal des requêtes lentes
+    "explain_slow_queries": False,  # Journalise le plan des SELECT lents
+    # Engines en lecture seule des pages : fichier déclaré immuable (sans
+    # verrou ni lecture du WAL), à réserver aux bases figées
+    "readonly_immutable": False,
+    # Maintenance périodique (python -m modules.maintenance run, via cron)
+    "maintenance": {
+        "time_budget": 30,  # Durée maximale d'une exécution (s)
+        "wal_checkpoint_mb": 64,  # Taille du WAL déclenchant un checkpoint
+        "vacuum_pages": 1024,  # Pages libérées par lot de VACUUM incrémental
+        "min_fragmentation": 0.05,  # Part de pages libres déclenchant le VACUUM
+        "analysis_limit": 1000,  # Lignes échantillonnées par PRAGMA optimize
+    },
+    # Profil de performance SQLite appliqué à chaque connexion du pool
+    # (défini dans modules.db_loader.SQLITE_PROFILES : "dashboard",
+    # "bulk_load" ou "readonly")
+    "profile": "dashboard",
+    # Valeurs remplacées une à une, par profil, ex. :
+    # {"dashboard": {"cache_size": -131072, "mmap_size": 0}}
+    "profile_overrides": {},
 }
 
 # Configuration de l'authentification
@@ -42,6 +72,8 @@ SECURITY_CONFIG = {
     "require_special_chars": True,
     "require_numbers": True,
     "require_uppercase": True,
+    "hash_workers": 2,  # Vérifications bcrypt simultanées
+    "hash_queue_size": 16,  # Vérifications en attente avant refus (« occupé »)
 }
 
 # Configuration du modèle
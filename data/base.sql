@@ -1,25 +1,26 @@
 CREATE TABLE SEX(
-   id_sex INTEGER PRIMARY KEY AUTOINCREMENT,
+   id_sex INTEGER PRIMARY KEY,
    sex_type VARCHAR(50)
-);
+) WITHOUT ROWID;
 
 CREATE TABLE SMOKING(
-   id_smoking_status INTEGER PRIMARY KEY AUTOINCREMENT,
+   id_smoking_status INTEGER PRIMARY KEY,
    smoking_status VARCHAR(50)
-);
+) WITHOUT ROWID;
 
 CREATE TABLE REGION(
-   id_region INTEGER PRIMARY KEY AUTOINCREMENT,
+   id_region INTEGER PRIMARY KEY,
    region_name VARCHAR(50)
-);
+) WITHOUT ROWID;
 
 CREATE TABLE USER_TYPE(
-   id_user_type INTEGER PRIMARY KEY AUTOINCREMENT,
+   id_user_type INTEGER PRIMARY KEY,
    type_name VARCHAR(50)
-);
+) WITHOUT ROWID;
 
 CREATE TABLE PATIENT(
-   id_patient VARCHAR(50),
+   id_patient INTEGER PRIMARY KEY,
+   external_id VARCHAR(50),
    age INT,
    nb_children INT,
    bmi DECIMAL(15,2),
@@ -27,12 +28,16 @@ CREATE TABLE PATIENT(
    id_region INT NOT NULL,
    id_smoking_status INT NOT NULL,
    id_sex INT NOT NULL,
-   PRIMARY KEY(id_patient),
    FOREIGN KEY(id_region) REFERENCES REGION(id_region),
    FOREIGN KEY(id_smoking_status) REFERENCES SMOKING(id_smoking_status),
    FOREIGN KEY(id_sex) REFERENCES SEX(id_sex)
 );
 
+CREATE UNIQUE INDEX idx_patient_external_id ON PATIENT(external_id) WHERE external_id IS NOT NULL;
+CREATE INDEX idx_patient_sex ON PATIENT(id_sex);
+CREATE INDEX idx_patient_region ON PATIENT(id_region);
+CREATE INDEX idx_patient_smoking_age_bmi ON PATIENT(id_smoking_status, age, bmi, insurance_cost);
+
 CREATE TABLE USER_ACCOUNT(
    id_user_account INTEGER PRIMARY KEY AUTOINCREMENT,
    username VARCHAR(50) UNIQUE NOT NULL,
@@ -45,9 +50,28 @@ CREATE TABLE USER_ACCOUNT(
 );
 
 CREATE TABLE manages(
-   id_patient VARCHAR(50),
+   id_patient INTEGER,
    id_user_account INT,
    PRIMARY KEY(id_patient, id_user_account),
    FOREIGN KEY(id_patient) REFERENCES PATIENT(id_patient),
    FOREIGN KEY(id_user_account) REFERENCES USER_ACCOUNT(id_user_account)
+) WITHOUT ROWID;
+
+CREATE INDEX idx_manages_user_account ON manages(id_user_account);
+
+CREATE TABLE DB_METADATA(
+   key VARCHAR(50) PRIMARY KEY,
+   value VARCHAR(255)
+);
+
+-- Journal des exécutions de modules.maintenance
+CREATE TABLE MAINTENANCE_LOG(
+   id_run INTEGER PRIMARY KEY,
+   started_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+   duration_s REAL NOT NULL,
+   bytes_freed INTEGER NOT NULL,
+   fragmentation REAL,
+   wal_bytes INTEGER,
+   steps TEXT,
+   completed BOOLEAN NOT NULL
 );
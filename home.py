@@ -1,6 +1,6 @@
 import streamlit as st
-from modules.db_loader import create_database
-from modules.auth import verify_user
+from modules.db_loader import get_engine
+from modules.auth import AuthBusyError, verify_user
 
 # Configuration de la page avec métadonnées améliorées
 st.set_page_config(
@@ -266,8 +266,8 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-# Création/vérification de la base de données au démarrage
-engine = create_database(force_recreate=False)
+# Engine partagé du processus (création/vérification au premier appel)
+engine = get_engine()
 
 # Initialisation des variables de session
 if "user" not in st.session_state:
@@ -315,20 +315,27 @@ with st.sidebar:
                 submit = st.form_submit_button("Se connecter")
 
                 if submit:
-                    user = verify_user(engine, username, password)
-                    if user:
-                        st.session_state.user = user
-                        st.session_state.is_authenticated = True
+                    try:
+                        user = verify_user(engine, username, password)
+                    except AuthBusyError:
                         st.markdown(
-                            '<div class="message message-success">✓ Connexion réussie</div>',
+                            '<div class="message message-error">⏳ Service de connexion saturé, réessayez dans un instant</div>',
                             unsafe_allow_html=True,
                         )
-                        st.rerun()
                     else:
-                        st.markdown(
-                            '<div class="message message-error">❌ Identifiants incorrects</div>',
-                            unsafe_allow_html=True,
-                        )
+                        if user:
+                            st.session_state.user = user
+                            st.session_state.is_authenticated = True
+                            st.markdown(
+                                '<div class="message message-success">✓ Connexion réussie</div>',
+                                unsafe_allow_html=True,
+                            )
+                            st.rerun()
+                        else:
+                            st.markdown(
+                                '<div class="message message-error">❌ Identifiants incorrects</div>',
+                                unsafe_allow_html=True,
+                            )
     else:
         if st.button("📤 Déconnexion"):
             st.session_state.user = None
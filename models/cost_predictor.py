@@ -1,5 +1,4 @@
 from sklearn.model_selection import train_test_split, cross_val_predict
-from sqlalchemy import create_engine
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
@@ -11,8 +10,14 @@ import mlflow
 import mlflow.sklearn
 from loguru import logger
 import os
+import sys
 from sklearn.model_selection import KFold
 
+# Racine du projet dans le PYTHONPATH (exécution directe du script)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from modules.db_loader import get_engine  # noqa: E402
+from modules.patient_frame import load_patient_frame  # noqa: E402
+
 
 class CostPredictor:
     def __init__(self):
@@ -113,22 +118,7 @@ class CostPredictor:
 
     def load_data(self):
         """Charge les données depuis la base de données"""
-        engine = create_engine("sqlite:///data/medical_costs.db")
-        query = """
-        SELECT
-            p.age,
-            p.nb_children,
-            p.bmi,
-            p.insurance_cost,
-            s.sex_type as sex,
-            sm.smoking_status as smoker,
-            r.region_name as region
-        FROM PATIENT p
-        JOIN SEX s ON p.id_sex = s.id_sex
-        JOIN SMOKING sm ON p.id_smoking_status = sm.id_smoking_status
-        JOIN REGION r ON p.id_region = r.id_region
-        """
-        return pd.read_sql(query, engine)
+        return load_patient_frame(get_engine())
 
     def prepare_data(self, df):
         """Prépare les données pour l'entraînement"""
@@ -162,7 +152,7 @@ class CostPredictor:
 
     def _analyze_distributions(self, df):
         """Analyse et log la distribution des variables"""
-        numeric_cols = df.select_dtypes(include=["int64", "float64"]).columns
+        numeric_cols = df.select_dtypes(include="number").columns
 
         for col in numeric_cols:
             skewness = df[col].skew()
@@ -174,7 +164,7 @@ class CostPredictor:
     def _handle_missing_and_outliers(self, df):
         """Gère les valeurs manquantes et aberrantes"""
         # Gestion des valeurs manquantes
-        numeric_columns = df.select_dtypes(include=["int64", "float64"]).columns
+        numeric_columns = df.select_dtypes(include="number").columns
         for col in numeric_columns:
             if df[col].isnull().sum() > 0:
                 logger.info(
@@ -182,7 +172,7 @@ class CostPredictor:
                 )
                 df[col].fillna(df[col].median(), inplace=True)
 
-        categorical_columns = df.select_dtypes(include=["object"]).columns
+        categorical_columns = df.select_dtypes(include=["object", "category"]).columns
         for col in categorical_columns:
             if df[col].isnull().sum() > 0:
                 logger.info(
@@ -202,9 +192,8 @@ class CostPredictor:
             if outliers_mask.any():
                 n_outliers = outliers_mask.sum()
                 logger.warning(f"{n_outliers} valeurs aberrantes détectées dans {col}")
-                # Remplacement par les bornes
-                df.loc[df[col] < lower_bound, col] = lower_bound
-                df.loc[df[col] > upper_bound, col] = upper_bound
+                # Remplacement par les bornes (clip : compatible dtypes compacts)
+                df[col] = df[col].clip(lower_bound, upper_bound)
 
         return df
 
@@ -519,7 +508,10 @@ class CostPredictor:
                 if not pd.api.types.is_numeric_dtype(df[col]):
                     raise ValueError(f"La colonne {col} doit être numérique")
             elif dtype == "categorical":
-                if not pd.api.types.is_object_dtype(df[col]):
+                if not (
+                    pd.api.types.is_object_dtype(df[col])
+                    or isinstance(df[col].dtype, pd.CategoricalDtype)
+                ):
                     raise ValueError(f"La colonne {col} doit être catégorielle")
 
         logger.info("Validation des données réussie")
@@ -1,23 +1,54 @@
+import os
+import sys
+import time
+
+import numpy as np
 from faker import Faker
 from sqlalchemy import text
 import pandas as pd
-from sqlalchemy import create_engine, inspect
+from sqlalchemy import inspect
 from loguru import logger
 
+# Racine du projet dans le PYTHONPATH (exécution directe du script)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from modules.db_loader import (  # noqa: E402
+    PATIENT_CHUNK_SIZE,
+    get_engine,
+    transaction,
+    write_fingerprint,
+)
+
+# Nombre de prénoms et de noms générés par Faker, puis tirés au hasard
+NAME_POOL_SIZE = 2000
+
 
 class MedicalDataGenerator:
-    def __init__(self):
+    def __init__(self, engine=None, seed: int = None):
         self.fake = Faker("fr_FR")
-        self.engine = create_engine("sqlite:///data/medical_costs.db")
+        if seed is not None:
+            self.fake.seed_instance(seed)
+        self.rng = np.random.default_rng(seed)
+        self.engine = engine or get_engine()
         self._initialize_name_columns()
 
-    def _initialize_name_columns(self):
-        """Initialise les colonnes prenom et nom et met à jour les valeurs manquantes"""
+    def _name_pools(self) -> tuple:
+        """Génère une fois les réservoirs de prénoms et de noms avec Faker"""
+        first_names = np.array([self.fake.first_name() for _ in range(NAME_POOL_SIZE)])
+        last_names = np.array([self.fake.last_name() for _ in range(NAME_POOL_SIZE)])
+        return first_names, last_names
+
+    def _initialize_name_columns(self, chunk_size: int = PATIENT_CHUNK_SIZE):
+        """Initialise les colonnes prenom et nom et met à jour les valeurs manquantes
+
+        Les noms sont tirés avec NumPy dans des réservoirs générés une seule
+        fois par Faker, puis écrits par paquets (executemany, clé rowid) dans
+        une seule transaction.
+        """
         try:
             inspector = inspect(self.engine)
             existing_columns = [col["name"] for col in inspector.get_columns("PATIENT")]
 
-            with self.engine.connect() as conn:
+            with transaction(self.engine) as conn:
                 # Création des colonnes si nécessaire
                 if "prenom" not in existing_columns:
                     logger.info("Ajout de la colonne 'prenom'")
@@ -27,33 +58,59 @@ class MedicalDataGenerator:
                     logger.info("Ajout de la colonne 'nom'")
                     conn.execute(text("ALTER TABLE PATIENT ADD COLUMN nom TEXT"))
 
-                # Mise à jour des valeurs NULL
-                result = pd.read_sql(
-                    "SELECT id_patient FROM PATIENT WHERE prenom IS NULL OR nom IS NULL",
-                    conn,
+                # Mise à jour des valeurs NULL, lignes identifiées par leur rowid
+                rowids = np.array(
+                    conn.execute(
+                        text(
+                            "SELECT rowid FROM PATIENT "
+                            "WHERE prenom IS NULL OR nom IS NULL ORDER BY rowid"
+                        )
+                    )
+                    .scalars()
+                    .all(),
+                    dtype="int64",
                 )
 
-                if not result.empty:
-                    logger.info(
-                        f"Mise à jour de {len(result)} enregistrements sans nom..."
+                if rowids.size:
+                    nb_rows = rowids.size
+                    logger.info(f"Mise à jour de {nb_rows} enregistrements sans nom...")
+                    start_time = time.perf_counter()
+
+                    first_names, last_names = self._name_pools()
+                    prenoms = self.rng.choice(first_names, nb_rows)
+                    noms = self.rng.choice(last_names, nb_rows)
+
+                    # Les valeurs déjà renseignées sont conservées
+                    update_sql = (
+                        "UPDATE PATIENT SET prenom = COALESCE(prenom, ?), "
+                        "nom = COALESCE(nom, ?) WHERE rowid = ?"
                     )
-                    for _, row in result.iterrows():
-                        conn.execute(
-                            text(
-                                "UPDATE PATIENT SET prenom = :prenom, nom = :nom WHERE id_patient = :id"
+                    for start in range(0, nb_rows, chunk_size):
+                        stop = min(start + chunk_size, nb_rows)
+                        conn.exec_driver_sql(
+                            update_sql,
+                            list(
+                                zip(
+                                    prenoms[start:stop].tolist(),
+                                    noms[start:stop].tolist(),
+                                    rowids[start:stop].tolist(),
+                                )
                             ),
-                            {
-                                "prenom": self.fake.first_name(),
-                                "nom": self.fake.last_name(),
-                                "id": row["id_patient"],
-                            },
                         )
+                        logger.info(f"Noms mis à jour : {stop}/{nb_rows}")
+
+                    elapsed = time.perf_counter() - start_time
+                    rate = nb_rows / elapsed if elapsed > 0 else float("inf")
+                    logger.info(
+                        f"{nb_rows} noms mis à jour en {elapsed:.2f}s "
+                        f"({rate:,.0f} lignes/s)"
+                    )
 
-                conn.commit()
+                write_fingerprint(conn)
 
                 # Afficher un exemple des données
                 sample = pd.read_sql(
-                    "SELECT id_patient, prenom, nom FROM PATIENT ORDER BY RANDOM() LIMIT 5",
+                    "SELECT rowid, prenom, nom FROM PATIENT ORDER BY RANDOM() LIMIT 5",
                     conn,
                 )
                 if not sample.empty:
@@ -1,6 +1,6 @@
 import pandas as pd
 import os
-from sqlalchemy import create_engine
+import sys
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestRegressor
@@ -15,6 +15,11 @@ from sklearn.pipeline import Pipeline
 # Obtenir le chemin absolu du répertoire racine du projet
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
+# Racine du projet dans le PYTHONPATH (exécution directe du script)
+sys.path.insert(0, BASE_DIR)
+from modules.db_loader import get_engine  # noqa: E402
+from modules.patient_frame import load_patient_frame  # noqa: E402
+
 # Configuration MLflow avec chemin absolu
 mlflow_dir = os.path.join(BASE_DIR, "mlruns")
 mlflow.set_tracking_uri(f"file:{mlflow_dir}")
@@ -39,22 +44,7 @@ def load_data():
     # Utiliser un chemin absolu pour la base de données
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     db_path = os.path.join(base_dir, "data", "medical_costs.db")
-    engine = create_engine(f"sqlite:///{db_path}")
-    query = """
-    SELECT
-        p.age,
-        p.nb_children,
-        p.bmi,
-        p.insurance_cost,
-        s.sex_type as sex,
-        sm.smoking_status as smoker,
-        r.region_name as region
-    FROM PATIENT p
-    JOIN SEX s ON p.id_sex = s.id_sex
-    JOIN SMOKING sm ON p.id_smoking_status = sm.id_smoking_status
-    JOIN REGION r ON p.id_region = r.id_region
-    """
-    return pd.read_sql(query, engine)
+    return load_patient_frame(get_engine(db_path=db_path))
 
 
 def prepare_data(df):
@@ -0,0 +1,147 @@
+"""Accès asynchrone à la base pour exécuter plusieurs requêtes en parallèle.
+
+Les fonctions de ce module sont des coroutines qui exécutent les fonctions
+synchrones existantes dans des threads (asyncio.to_thread), sur l'engine
+passé par l'appelant : pool de connexions, profils PRAGMA, cache de
+références et détection de remplacement du fichier restent ceux de
+db_loader. L'engine est obligatoire : aucune coroutine ne se rabat sur
+l'engine en lecture-écriture de get_engine, qui peut créer ou reconstruire
+la base (une page en lecture seule passe son engine get_readonly_engine). SQLite et
+bcrypt libèrent le GIL pendant leur travail, les requêtes s'exécutent donc
+réellement en parallèle, dans la limite de la taille du pool.
+
+Exemple dans une page Streamlit (sans boucle asyncio en cours) :
+
+    engine = get_readonly_engine()
+    results = run_concurrently(
+        mean=fetch_scalar_async(engine, "SELECT AVG(insurance_cost) FROM PATIENT"),
+        similar=get_similar_profiles_async(engine, "yes", 40, 28.0),
+    )
+"""
+
+import asyncio
+
+import pandas as pd
+from sqlalchemy import Engine, text
+
+from modules.auth import verify_user
+from modules.db_loader import (
+    get_reference_cache,
+    get_reference_id,
+    get_similar_profiles,
+)
+from modules.patient_frame import load_patient_frame
+
+
+def _require_engine(engine: Engine) -> Engine:
+    """Refuse un engine absent (get_readonly_engine retourne None en cas d'échec).
+
+    Raises:
+        ValueError: Si engine vaut None
+    """
+    if engine is None:
+        raise ValueError("Engine requis : base de données indisponible")
+    return engine
+
+
+async def load_patient_frame_async(
+    engine: Engine, columns: list = None
+) -> pd.DataFrame:
+    """Version asynchrone de load_patient_frame."""
+    engine = _require_engine(engine)
+    return await asyncio.to_thread(load_patient_frame, engine, columns)
+
+
+async def get_reference_cache_async(engine: Engine):
+    """Retourne le cache de références de l'engine, rechargé si nécessaire."""
+    references = get_reference_cache(_require_engine(engine))
+    await asyncio.to_thread(references.refresh)
+    return references
+
+
+async def get_reference_id_async(engine, table: str, column: str, value: str):
+    """Version asynchrone de get_reference_id."""
+    engine = _require_engine(engine)
+    return await asyncio.to_thread(get_reference_id, engine, table, column, value)
+
+
+async def verify_user_async(engine, username: str, password: str) -> dict:
+    """Version asynchrone de verify_user (requête et vérification bcrypt)."""
+    engine = _require_engine(engine)
+    return await asyncio.to_thread(verify_user, engine, username, password)
+
+
+async def get_similar_profiles_async(
+    engine, smoker: str, age: int, bmi: float, **margins
+) -> pd.DataFrame:
+    """Version asynchrone de get_similar_profiles."""
+    engine = _require_engine(engine)
+    return await asyncio.to_thread(
+        get_similar_profiles, engine, smoker, age, bmi, **margins
+    )
+
+
+def _read_query(engine: Engine, sql: str, params: dict) -> pd.DataFrame:
+    with engine.connect() as conn:
+        return pd.read_sql_query(text(sql), conn, params=params)
+
+
+def _read_scalar(engine: Engine, sql: str, params: dict):
+    with engine.connect() as conn:
+        return conn.execute(text(sql), params).scalar()
+
+
+async def fetch_frame_async(
+    engine: Engine, sql: str, params: dict = None
+) -> pd.DataFrame:
+    """Exécute une requête en lecture et retourne le résultat en DataFrame.
+
+    Args:
+        engine: Connexion à la base de données
+        sql: Requête SQL (paramètres nommés :nom)
+        params: Valeurs des paramètres
+
+    Returns:
+        pd.DataFrame: Résultat de la requête
+
+    Raises:
+        ValueError: Si engine vaut None
+    """
+    engine = _require_engine(engine)
+    return await asyncio.to_thread(_read_query, engine, sql, params or {})
+
+
+async def fetch_scalar_async(engine: Engine, sql: str, params: dict = None):
+    """Exécute une requête en lecture et retourne la première valeur.
+
+    Args:
+        engine: Connexion à la base de données
+        sql: Requête SQL (paramètres nommés :nom)
+        params: Valeurs des paramètres
+
+    Returns:
+        Première colonne de la première ligne, None si aucun résultat
+
+    Raises:
+        ValueError: Si engine vaut None
+    """
+    engine = _require_engine(engine)
+    return await asyncio.to_thread(_read_scalar, engine, sql, params or {})
+
+
+async def gather_named(**coroutines) -> dict:
+    """Exécute des coroutines en parallèle et retourne leurs résultats par nom."""
+    results = await asyncio.gather(*coroutines.values())
+    return dict(zip(coroutines, results))
+
+
+def run_concurrently(**coroutines) -> dict:
+    """Exécute des coroutines en parallèle depuis du code synchrone.
+
+    À appeler depuis un thread sans boucle asyncio en cours, comme le thread
+    d'exécution d'une page Streamlit.
+
+    Returns:
+        dict: Résultat de chaque coroutine, sous le nom passé en argument
+    """
+    return asyncio.run(gather_named(**coroutines))
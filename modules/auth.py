@@ -1,7 +1,31 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import bcrypt
 from sqlalchemy import text
 from loguru import logger
 
+from modules.query_stats import LatencyHistogram
+
+try:
+    from config import SECURITY_CONFIG
+except ImportError:  # config.py absent : valeurs par défaut du module
+    SECURITY_CONFIG = {}
+
+# Vérifications bcrypt exécutées simultanément
+DEFAULT_HASH_WORKERS = 2
+
+# Vérifications en attente au-delà desquelles les connexions sont refusées
+DEFAULT_HASH_QUEUE_SIZE = 16
+
+_HASHER = None
+_HASHER_LOCK = threading.Lock()
+
+
+class AuthBusyError(RuntimeError):
+    """File des vérifications de mot de passe pleine : réessayer plus tard."""
+
 
 def hash_password(password: str) -> str:
     """Hash un mot de passe avec bcrypt"""
@@ -13,6 +37,120 @@ def verify_password(password: str, password_hash: str) -> bool:
     return bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8"))
 
 
+class PasswordHasher:
+    """Vérifications bcrypt dans un pool de threads de taille fixe.
+
+    bcrypt monopolise un cœur pendant chaque vérification : limiter le nombre
+    de vérifications simultanées préserve le temps de réponse des pages lors
+    d'un afflux de connexions. Au-delà de `queue_size` vérifications en
+    attente, verify échoue immédiatement (AuthBusyError) au lieu d'empiler
+    les demandes.
+
+    Args:
+        workers: Vérifications simultanées, SECURITY_CONFIG["hash_workers"]
+            par défaut
+        queue_size: Vérifications en attente, SECURITY_CONFIG["hash_queue_size"]
+            par défaut
+    """
+
+    def __init__(self, workers: int = None, queue_size: int = None):
+        self.workers = workers or SECURITY_CONFIG.get(
+            "hash_workers", DEFAULT_HASH_WORKERS
+        )
+        self.queue_size = (
+            queue_size
+            if queue_size is not None
+            else SECURITY_CONFIG.get("hash_queue_size", DEFAULT_HASH_QUEUE_SIZE)
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="bcrypt"
+        )
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.rejected = 0
+        self.hash_latency = LatencyHistogram()
+        self.queue_wait = LatencyHistogram()
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        """Vérifie un mot de passe dans le pool.
+
+        Raises:
+            AuthBusyError: Si la file d'attente est pleine
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            logger.warning("File des vérifications de mot de passe pleine")
+            raise AuthBusyError("Service d'authentification occupé")
+
+        with self._lock:
+            self.queued += 1
+        try:
+            future = self._executor.submit(
+                self._verify, time.perf_counter(), password, password_hash
+            )
+        except Exception:
+            with self._lock:
+                self.queued -= 1
+            self._slots.release()
+            raise
+        return future.result()
+
+    def _verify(self, submitted: float, password: str, password_hash: str) -> bool:
+        started = time.perf_counter()
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+            self.queue_wait.record((started - submitted) * 1000)
+        try:
+            return verify_password(password, password_hash)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self.active -= 1
+                self.hash_latency.record(elapsed_ms)
+            self._slots.release()
+
+    def stats(self) -> dict:
+        """Retourne l'occupation du pool et les temps de vérification.
+
+        Returns:
+            dict: workers, queue_size, queued (en attente), active (en cours),
+            rejected (refus pour file pleine), hash_latency et queue_wait
+            (résumés d'histogrammes, en ms)
+        """
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "queued": self.queued,
+                "active": self.active,
+                "rejected": self.rejected,
+                "hash_latency": self.hash_latency.result(),
+                "queue_wait": self.queue_wait.result(),
+            }
+
+    def shutdown(self):
+        """Arrête le pool après les vérifications en cours."""
+        self._executor.shutdown(wait=True)
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Retourne le pool de vérification partagé par les sessions."""
+    global _HASHER
+    with _HASHER_LOCK:
+        if _HASHER is None:
+            _HASHER = PasswordHasher()
+        return _HASHER
+
+
+def get_auth_stats() -> dict:
+    """Retourne les statistiques du pool de vérification partagé."""
+    return get_password_hasher().stats()
+
+
 def create_user(
     engine, username: str, password: str, email: str = None, is_admin: bool = False
 ):
@@ -57,8 +195,17 @@ def create_user(
         raise
 
 
-def verify_user(engine, username: str, password: str) -> dict:
-    """Vérifie les identifiants d'un utilisateur et retourne ses informations"""
+def verify_user(
+    engine, username: str, password: str, hasher: PasswordHasher = None
+) -> dict:
+    """Vérifie les identifiants d'un utilisateur et retourne ses informations
+
+    La vérification bcrypt est confiée au pool partagé (get_password_hasher),
+    la connexion à la base est rendue avant.
+
+    Raises:
+        AuthBusyError: Si le pool de vérification est saturé
+    """
     with engine.connect() as conn:
         result = conn.execute(
             text(
@@ -72,17 +219,17 @@ def verify_user(engine, username: str, password: str) -> dict:
             {"username": username},
         ).fetchone()
 
-        if not result:
-            return None
+    if not result:
+        return None
 
-        user_id, stored_hash, email, user_type = result
+    user_id, stored_hash, email, user_type = result
 
-        if verify_password(password, stored_hash):
-            return {
-                "id": user_id,
-                "username": username,
-                "email": email,
-                "is_admin": user_type == "admin",
-            }
+    if (hasher or get_password_hasher()).verify(password, stored_hash):
+        return {
+            "id": user_id,
+            "username": username,
+            "email": email,
+            "is_admin": user_type == "admin",
+        }
 
-        return None
+    return None
@@ -0,0 +1,264 @@
+"""Sauvegardes à chaud de la base SQLite (API de sauvegarde SQLite).
+
+Les pages sont copiées par petites étapes entrecoupées de pauses : lecteurs et
+écrivains ne sont pas bloqués pendant la sauvegarde. Une écriture pendant la
+copie la fait reprendre depuis le début ; le nombre de reprises et la durée
+totale sont bornés (DB_CONFIG["backup_max_restarts"] et
+DB_CONFIG["backup_max_duration"]). Les sauvegardes sont
+horodatées à côté de DB_CONFIG["backup_path"] et les plus anciennes sont
+supprimées au-delà de DB_CONFIG["backup_keep"].
+
+Usage :
+    python -m modules.backup backup
+    python -m modules.backup list
+    python -m modules.backup restore [--snapshot CHEMIN]
+"""
+
+import argparse
+import glob
+import os
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime
+
+from loguru import logger
+
+from modules.db_loader import DB_CONFIG, get_db_path
+
+DEFAULT_BACKUP_PATH = "data/backups/medical_costs_backup.db"
+DEFAULT_MAX_RESTARTS = 10
+DEFAULT_MAX_DURATION = 600  # Secondes
+
+
+def _snapshot_pattern(backup_path: str) -> tuple:
+    """Retourne le préfixe et l'extension des sauvegardes horodatées."""
+    root, ext = os.path.splitext(backup_path)
+    return root, ext or ".db"
+
+
+def _check_database(path: str) -> bool:
+    """Vérifie l'intégrité d'un fichier de base (PRAGMA quick_check)."""
+    try:
+        with closing(sqlite3.connect(path)) as conn:
+            return conn.execute("PRAGMA quick_check").fetchone()[0] == "ok"
+    except sqlite3.Error as e:
+        logger.error(f"Base {path} illisible : {str(e)}")
+        return False
+
+
+def list_backups(backup_path: str = None) -> list:
+    """Liste les sauvegardes disponibles, de la plus récente à la plus ancienne.
+
+    Args:
+        backup_path: Chemin de référence des sauvegardes, DB_CONFIG par défaut
+
+    Returns:
+        list: Chemins des sauvegardes
+    """
+    backup_path = backup_path or DB_CONFIG.get("backup_path", DEFAULT_BACKUP_PATH)
+    root, ext = _snapshot_pattern(backup_path)
+    return sorted(glob.glob(f"{glob.escape(root)}_*{ext}"), reverse=True)
+
+
+def rotate_backups(keep: int = None, backup_path: str = None) -> list:
+    """Supprime les sauvegardes les plus anciennes.
+
+    Args:
+        keep: Nombre de sauvegardes conservées, DB_CONFIG["backup_keep"] par défaut
+        backup_path: Chemin de référence des sauvegardes, DB_CONFIG par défaut
+
+    Returns:
+        list: Chemins des sauvegardes supprimées
+    """
+    keep = keep if keep is not None else DB_CONFIG.get("backup_keep", 7)
+    removed = list_backups(backup_path)[max(keep, 1) :]
+    for path in removed:
+        os.remove(path)
+        logger.info(f"Ancienne sauvegarde supprimée : {path}")
+    return removed
+
+
+def _bounded_progress(sleep: float, max_restarts: int, max_duration: float):
+    """Retourne un suivi de progression qui espace les étapes et borne la copie.
+
+    sqlite3 n'attend `sleep` qu'après une étape refusée (base occupée) : la
+    pause entre deux étapes réussies est faite ici. La copie reprend depuis le
+    début lorsque la base source est modifiée par une autre connexion : le
+    nombre de pages restantes cesse alors de décroître après une étape
+    réussie. Lever une exception depuis le suivi abandonne la copie.
+
+    Raises:
+        TimeoutError: Au-delà de max_restarts reprises ou de max_duration secondes
+    """
+    deadline = time.monotonic() + max_duration
+    state = {"remaining": None, "restarts": 0}
+
+    def _progress(status, remaining, total):
+        logger.debug(f"Sauvegarde : {total - remaining}/{total} pages copiées")
+        restarted = state["remaining"] is not None and remaining >= state["remaining"]
+        if status == sqlite3.SQLITE_OK and restarted:
+            state["restarts"] += 1
+            logger.debug(f"Sauvegarde reprise ({state['restarts']}/{max_restarts})")
+        state["remaining"] = remaining
+        if state["restarts"] > max_restarts:
+            raise TimeoutError(
+                f"Copie reprise plus de {max_restarts} fois (écritures continues)"
+            )
+        if remaining and time.monotonic() > deadline:
+            raise TimeoutError(f"Copie non terminée après {max_duration}s")
+        if remaining:
+            time.sleep(sleep)
+
+    return _progress
+
+
+def backup_database(
+    test_mode: bool = False,
+    db_path: str = None,
+    backup_path: str = None,
+    pages: int = None,
+    sleep: float = None,
+    keep: int = None,
+    max_restarts: int = None,
+    max_duration: float = None,
+) -> str:
+    """Sauvegarde la base en service sans interrompre l'application.
+
+    La copie est écrite dans un fichier temporaire, vérifiée, puis renommée :
+    une sauvegarde listée est toujours complète. Si des écritures continues la
+    font reprendre trop souvent, ou si elle dure trop longtemps, elle est
+    abandonnée et l'échec est journalisé.
+
+    Args:
+        test_mode: Si True, sauvegarde la base de test
+        db_path: Chemin personnalisé de la base de données
+        backup_path: Chemin de référence des sauvegardes, DB_CONFIG par défaut
+        pages: Pages copiées par étape, DB_CONFIG["backup_step_pages"] par défaut
+        sleep: Pause (s) entre deux étapes, DB_CONFIG["backup_step_sleep"] par défaut
+        keep: Nombre de sauvegardes conservées, DB_CONFIG["backup_keep"] par défaut
+        max_restarts: Reprises tolérées, DB_CONFIG["backup_max_restarts"] par défaut
+        max_duration: Durée maximale (s), DB_CONFIG["backup_max_duration"] par défaut
+
+    Returns:
+        str: Chemin de la sauvegarde créée, ou None en cas d'erreur
+    """
+    db_path = get_db_path(test_mode, db_path)
+    backup_path = backup_path or DB_CONFIG.get("backup_path", DEFAULT_BACKUP_PATH)
+    pages = pages or DB_CONFIG.get("backup_step_pages", 256)
+    sleep = sleep if sleep is not None else DB_CONFIG.get("backup_step_sleep", 0.05)
+    progress = _bounded_progress(
+        sleep,
+        (
+            max_restarts
+            if max_restarts is not None
+            else DB_CONFIG.get("backup_max_restarts", DEFAULT_MAX_RESTARTS)
+        ),
+        (
+            max_duration
+            if max_duration is not None
+            else DB_CONFIG.get("backup_max_duration", DEFAULT_MAX_DURATION)
+        ),
+    )
+
+    if not os.path.exists(db_path):
+        logger.error(f"Base introuvable : {db_path}")
+        return None
+
+    os.makedirs(os.path.dirname(backup_path) or ".", exist_ok=True)
+    root, ext = _snapshot_pattern(backup_path)
+    snapshot = f"{root}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}{ext}"
+    partial = f"{snapshot}.partial"
+
+    logger.info(f"Sauvegarde de {db_path} vers {snapshot}")
+    start_time = time.perf_counter()
+    try:
+        timeout = DB_CONFIG.get("timeout", 30)
+        with closing(sqlite3.connect(db_path, timeout=timeout)) as source:
+            with closing(sqlite3.connect(partial)) as target:
+                source.backup(target, pages=pages, progress=progress, sleep=sleep)
+
+        if not _check_database(partial):
+            raise RuntimeError("Sauvegarde corrompue")
+        os.replace(partial, snapshot)
+    except Exception as e:
+        logger.error(f"Erreur lors de la sauvegarde : {str(e)}")
+        if os.path.exists(partial):
+            os.remove(partial)
+        return None
+
+    elapsed = time.perf_counter() - start_time
+    size_mb = os.path.getsize(snapshot) / 1024**2
+    logger.info(f"Sauvegarde terminée en {elapsed:.2f}s ({size_mb:.1f} Mio)")
+
+    rotate_backups(keep, backup_path)
+    return snapshot
+
+
+def restore_backup(
+    snapshot: str = None,
+    test_mode: bool = False,
+    db_path: str = None,
+    backup_path: str = None,
+) -> bool:
+    """Restaure une sauvegarde dans la base en service.
+
+    La restauration passe elle aussi par l'API de sauvegarde SQLite : elle est
+    appliquée en une transaction, les sessions voient l'ancienne puis la
+    nouvelle version de la base, jamais un état intermédiaire.
+
+    Args:
+        snapshot: Sauvegarde à restaurer, la plus récente par défaut
+        test_mode: Si True, restaure la base de test
+        db_path: Chemin personnalisé de la base de données
+        backup_path: Chemin de référence des sauvegardes, DB_CONFIG par défaut
+
+    Returns:
+        True si la restauration a réussi, False sinon
+    """
+    db_path = get_db_path(test_mode, db_path)
+    if snapshot is None:
+        backups = list_backups(backup_path)
+        if not backups:
+            logger.error("Aucune sauvegarde disponible")
+            return False
+        snapshot = backups[0]
+
+    if not os.path.exists(snapshot) or not _check_database(snapshot):
+        logger.error(f"Sauvegarde invalide : {snapshot}")
+        return False
+
+    logger.info(f"Restauration de {snapshot} vers {db_path}")
+    try:
+        timeout = DB_CONFIG.get("timeout", 30)
+        with closing(sqlite3.connect(snapshot)) as source:
+            with closing(sqlite3.connect(db_path, timeout=timeout)) as target:
+                source.backup(target)
+    except Exception as e:
+        logger.error(f"Erreur lors de la restauration : {str(e)}")
+        return False
+
+    logger.info("Restauration terminée")
+    return True
+
+
+def main(argv: list = None):
+    """Point d'entrée en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Sauvegardes de la base SQLite")
+    parser.add_argument("command", choices=["backup", "list", "restore"])
+    parser.add_argument("--db-path", default=None, help="Base de données visée")
+    parser.add_argument("--snapshot", default=None, help="Sauvegarde à restaurer")
+    parser.add_argument("--keep", type=int, default=None, help="Sauvegardes gardées")
+    args = parser.parse_args(argv)
+
+    if args.command == "backup":
+        return 0 if backup_database(db_path=args.db_path, keep=args.keep) else 1
+    if args.command == "list":
+        for path in list_backups():
+            print(path)
+        return 0
+    return 0 if restore_backup(args.snapshot, db_path=args.db_path) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,196 @@
+"""Journal des modifications de PATIENT, alimenté par triggers.
+
+Chaque INSERT, UPDATE ou DELETE sur PATIENT ajoute une ligne à
+PATIENT_CHANGES, numérotée par une séquence strictement croissante
+(AUTOINCREMENT : un numéro n'est jamais réutilisé). Les traitements en aval
+(réentraînement, agrégats, exports) retiennent le dernier numéro traité et ne
+relisent ensuite que les patients modifiés depuis, via get_patient_changes.
+
+Le journal est optionnel : enable_change_tracking installe la table et les
+triggers. Chaque écriture dans PATIENT coûte alors une écriture
+supplémentaire. Le journal référence les patients par rowid, alias de la clé
+id_patient : il reste valide après un VACUUM.
+"""
+
+import pandas as pd
+from loguru import logger
+from sqlalchemy import Engine, text
+
+from modules.db_loader import (
+    drop_triggers,
+    get_engine,
+    get_reference_cache,
+    has_triggers,
+    install_triggers,
+    transaction,
+)
+from modules.patient_frame import patient_select, resolve_columns, to_patient_frame
+
+# id_patient est l'alias du rowid : un changement d'ID journalise aussi la
+# disparition de l'ancien. Les bases dont le trigger précède cette version sont
+# mises à jour par la migration v4 de db_loader
+CHANGE_LOG_UPDATE_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS trg_patient_changes_update AFTER UPDATE ON PATIENT
+    BEGIN
+        INSERT INTO PATIENT_CHANGES (patient_rowid, operation)
+        SELECT OLD.rowid, 'D' WHERE OLD.rowid <> NEW.rowid;
+        INSERT INTO PATIENT_CHANGES (patient_rowid, operation) VALUES (NEW.rowid, 'U');
+    END
+    """
+
+CHANGE_LOG_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS PATIENT_CHANGES(
+       seq INTEGER PRIMARY KEY AUTOINCREMENT,
+       patient_rowid INTEGER NOT NULL,
+       operation CHAR(1) NOT NULL,
+       changed_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_patient_changes_insert AFTER INSERT ON PATIENT
+    BEGIN
+        INSERT INTO PATIENT_CHANGES (patient_rowid, operation) VALUES (NEW.rowid, 'I');
+    END
+    """,
+    CHANGE_LOG_UPDATE_TRIGGER,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_patient_changes_delete AFTER DELETE ON PATIENT
+    BEGIN
+        INSERT INTO PATIENT_CHANGES (patient_rowid, operation) VALUES (OLD.rowid, 'D');
+    END
+    """,
+)
+
+CHANGE_LOG_OBJECTS = (
+    ("TRIGGER", "trg_patient_changes_insert"),
+    ("TRIGGER", "trg_patient_changes_update"),
+    ("TRIGGER", "trg_patient_changes_delete"),
+    ("TABLE", "PATIENT_CHANGES"),
+)
+
+
+def has_change_tracking(engine) -> bool:
+    """Indique si le journal PATIENT_CHANGES et ses triggers sont installés.
+
+    Args:
+        engine: Engine, ou connexion ouverte
+
+    Returns:
+        True si le journal est disponible, False sinon
+    """
+    return has_triggers(engine, CHANGE_LOG_OBJECTS)
+
+
+def enable_change_tracking(engine) -> bool:
+    """Crée le journal PATIENT_CHANGES et installe ses triggers.
+
+    Les patients déjà présents ne sont pas journalisés : un consommateur
+    démarre par un chargement complet, puis suit le journal à partir de
+    get_change_sequence.
+
+    Args:
+        engine: Engine, ou connexion dont la transaction est gérée par l'appelant
+
+    Returns:
+        True si le journal est disponible, False en cas d'erreur
+    """
+    return install_triggers(engine, "PATIENT_CHANGES", CHANGE_LOG_DDL)
+
+
+def disable_change_tracking(engine) -> bool:
+    """Supprime le journal PATIENT_CHANGES et ses triggers.
+
+    Args:
+        engine: Engine, ou connexion dont la transaction est gérée par l'appelant
+
+    Returns:
+        True si la suppression a réussi, False sinon
+    """
+    return drop_triggers(engine, "PATIENT_CHANGES", CHANGE_LOG_OBJECTS)
+
+
+def get_change_sequence(engine) -> int:
+    """Retourne le numéro de la dernière modification journalisée.
+
+    Args:
+        engine: Engine, ou connexion ouverte
+
+    Returns:
+        int: Dernier numéro de séquence, 0 si le journal est vide
+    """
+    with transaction(engine) as conn:
+        return conn.execute(
+            text("SELECT COALESCE(MAX(seq), 0) FROM PATIENT_CHANGES")
+        ).scalar()
+
+
+def get_patient_changes(
+    engine: Engine = None, since: int = 0, columns: list = None
+) -> tuple:
+    """Retourne les patients modifiés depuis un numéro de séquence.
+
+    Un patient modifié plusieurs fois n'apparaît qu'une fois, avec ses
+    valeurs actuelles. Le numéro retourné est à passer comme `since` au
+    prochain appel : les deux lectures ont lieu dans la même transaction,
+    aucune modification ne peut être perdue entre deux appels.
+
+    Args:
+        engine: Connexion à la base de données, engine partagé par défaut
+        since: Dernier numéro de séquence déjà traité
+        columns: Colonnes à charger (parmi PATIENT_FRAME_COLUMNS), toutes si None
+
+    Returns:
+        tuple: (DataFrame indexé par rowid avec les colonnes seq, deleted puis
+        les colonnes typées de load_patient_frame, dernier numéro de séquence)
+    """
+    engine = engine or get_engine()
+    columns = resolve_columns(columns)
+    select, _, _ = patient_select(columns, flat=False)
+
+    with engine.connect() as conn:
+        last = conn.execute(
+            text("SELECT COALESCE(MAX(seq), 0) FROM PATIENT_CHANGES")
+        ).scalar()
+        raw = pd.read_sql_query(
+            text(
+                f"""
+                WITH changed AS (
+                    SELECT patient_rowid, MAX(seq) AS seq FROM PATIENT_CHANGES
+                    WHERE seq > :since AND seq <= :last
+                    GROUP BY patient_rowid
+                )
+                SELECT changed.patient_rowid, changed.seq,
+                       PATIENT.rowid IS NULL AS deleted, {select}
+                FROM changed
+                LEFT JOIN PATIENT ON PATIENT.rowid = changed.patient_rowid
+                ORDER BY changed.seq
+                """
+            ),
+            conn,
+            params={"since": since, "last": last},
+            index_col="patient_rowid",
+        )
+
+    changes = to_patient_frame(raw[columns], get_reference_cache(engine))
+    changes.insert(0, "deleted", raw["deleted"].astype(bool))
+    changes.insert(0, "seq", raw["seq"].astype("int64"))
+    return changes, max(last, since)
+
+
+def prune_patient_changes(engine, up_to: int) -> int:
+    """Supprime les entrées du journal déjà traitées par tous les consommateurs.
+
+    Args:
+        engine: Engine, ou connexion dont la transaction est gérée par l'appelant
+        up_to: Numéro de séquence jusqu'auquel le journal est purgé (inclus)
+
+    Returns:
+        int: Nombre d'entrées supprimées
+    """
+    with transaction(engine) as conn:
+        result = conn.execute(
+            text("DELETE FROM PATIENT_CHANGES WHERE seq <= :up_to"), {"up_to": up_to}
+        )
+    logger.info(f"{result.rowcount} entrées du journal purgées")
+    return result.rowcount
@@ -1,16 +1,204 @@
+import hashlib
 import os
-
-# import pandas as pd  # Non utilisé, commenté pour éviter l'erreur F401
-from sqlalchemy import create_engine, text
+import sqlite3
+import tempfile
+import threading
+import time
+import urllib.parse
+import weakref
+from contextlib import closing, contextmanager
+
+import numpy as np
+
+import pandas as pd
+from sqlalchemy import create_engine, event, text
 from loguru import logger
 
 # import bcrypt  # Non utilisé, commenté pour éviter l'erreur F401
 
-from faker import Faker
-from sqlalchemy import Engine
-
-# Configuration du Faker
-fake = Faker()
+from sqlalchemy import Connection, Engine
+from sqlalchemy.exc import DisconnectionError, OperationalError
+
+from modules.query_stats import (
+    DEFAULT_SLOW_QUERY_MS,
+    TimedQueuePool,
+    instrument_engine,
+)
+
+try:
+    from config import DB_CONFIG
+except ImportError:  # config.py absent : valeurs par défaut du module
+    DB_CONFIG = {}
+
+# Nombre de lignes envoyées par appel à executemany lors des chargements en masse
+PATIENT_CHUNK_SIZE = 50_000
+
+# Fichier de données réelles livré avec le projet
+INSURANCE_CSV_PATH = "data/insurance.csv"
+
+# Colonnes lues dans les fichiers CSV de patients et leurs types
+CSV_COLUMN_DTYPES = {
+    "age": "Int64",
+    "sex": "string",
+    "bmi": "float64",
+    "children": "Int64",
+    "smoker": "string",
+    "region": "string",
+    "charges": "float64",
+}
+
+# Profils de performance SQLite par défaut (surchargeables via DB_CONFIG)
+DEFAULT_SQLITE_PROFILE = "dashboard"
+SQLITE_PROFILES = {
+    "dashboard": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+        "busy_timeout": 30000,
+    },
+    "bulk_load": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -262144,
+        "mmap_size": 0,
+        "temp_store": "MEMORY",
+        "busy_timeout": 60000,
+    },
+    # Engines en lecture seule (get_readonly_engine) : ni journal ni écriture
+    "readonly": {
+        "cache_size": -65536,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+        "busy_timeout": 30000,
+        "query_only": "ON",
+    },
+}
+
+# PRAGMA appliqués à chaque connexion, dans cet ordre
+SQLITE_PRAGMAS = (
+    "journal_mode",
+    "synchronous",
+    "cache_size",
+    "mmap_size",
+    "temp_store",
+    "busy_timeout",
+    "query_only",
+)
+
+# Version du schéma et identifiant applicatif inscrits dans l'en-tête SQLite
+SCHEMA_VERSION = 4
+APPLICATION_ID = 0x49434131  # "ICA1" : InsureCost Analytics
+
+# Tables attendues dans une base complète
+REQUIRED_TABLES = (
+    "SEX",
+    "SMOKING",
+    "REGION",
+    "USER_TYPE",
+    "PATIENT",
+    "USER_ACCOUNT",
+    "manages",
+    "DB_METADATA",
+)
+
+# Tables dont le contenu entre dans l'empreinte de la base, et leur clé
+# (les tables de référence sont WITHOUT ROWID depuis le schéma v3)
+FINGERPRINT_TABLES = {
+    "SEX": "id_sex",
+    "SMOKING": "id_smoking_status",
+    "REGION": "id_region",
+    "USER_TYPE": "id_user_type",
+    "PATIENT": "rowid",
+}
+
+# Compteur de modifications de DB_METADATA, incrémenté par un trigger à chaque
+# INSERT, UPDATE ou DELETE sur une table de FINGERPRINT_TABLES (schéma v4)
+DATA_VERSION_KEY = "data_version"
+DATA_VERSION_OPERATIONS = ("INSERT", "UPDATE", "DELETE")
+
+# Index secondaires : clés étrangères de PATIENT et index couvrant des profils
+# similaires (statut tabagique, âge, IMC, coût). L'index composite sert aussi
+# d'index de clé étrangère pour id_smoking_status.
+SCHEMA_INDEXES = {
+    "idx_patient_sex": "PATIENT(id_sex)",
+    "idx_patient_region": "PATIENT(id_region)",
+    "idx_patient_smoking_age_bmi": (
+        "PATIENT(id_smoking_status, age, bmi, insurance_cost)"
+    ),
+    "idx_manages_user_account": "manages(id_user_account)",
+}
+
+# Requêtes fréquentes et index que leur plan d'exécution doit utiliser
+HOT_QUERIES = {
+    "similar_profiles": (
+        """
+        SELECT age, bmi, insurance_cost FROM PATIENT
+        WHERE id_smoking_status = :id_smoking_status
+          AND age BETWEEN :age_min AND :age_max
+          AND bmi BETWEEN :bmi_min AND :bmi_max
+        """,
+        {
+            "id_smoking_status": 1,
+            "age_min": 30,
+            "age_max": 40,
+            "bmi_min": 25.0,
+            "bmi_max": 29.0,
+        },
+        "idx_patient_smoking_age_bmi",
+    ),
+    "costs_by_region": (
+        "SELECT COUNT(*), AVG(insurance_cost) FROM PATIENT "
+        "WHERE id_region = :id_region",
+        {"id_region": 1},
+        "idx_patient_region",
+    ),
+    "costs_by_sex": (
+        "SELECT COUNT(*), AVG(insurance_cost) FROM PATIENT WHERE id_sex = :id_sex",
+        {"id_sex": 1},
+        "idx_patient_sex",
+    ),
+    "costs_by_smoking_status": (
+        "SELECT COUNT(*), AVG(insurance_cost) FROM PATIENT "
+        "WHERE id_smoking_status = :id_smoking_status",
+        {"id_smoking_status": 1},
+        "idx_patient_smoking_age_bmi",
+    ),
+}
+
+# Registre des engines partagés par le processus, indexés par (chemin, profil) ;
+# les engines en lecture seule utilisent les profils "readonly" et "immutable"
+_ENGINES = {}
+_ENGINES_LOCK = threading.Lock()
+
+# Tables de référence : (table, colonne ID, colonne libellé)
+REFERENCE_TABLES = {
+    "sex": ("SEX", "id_sex", "sex_type"),
+    "smoking": ("SMOKING", "id_smoking_status", "smoking_status"),
+    "region": ("REGION", "id_region", "region_name"),
+    "user_type": ("USER_TYPE", "id_user_type", "type_name"),
+}
+
+# Valeurs des tables de référence insérées à l'initialisation
+REFERENCE_VALUES = {
+    "sex": ("male", "female"),
+    "smoking": ("yes", "no"),
+    "region": ("southwest", "southeast", "northwest", "northeast"),
+    "user_type": ("admin", "user"),
+}
+
+# Autres noms de colonnes désignant une table de référence
+REFERENCE_ALIASES = {"smoker": "smoking", "smoking_status": "smoking"}
+
+# Délai (s) entre deux vérifications de l'empreinte par le cache de références
+REFERENCE_CACHE_TTL = 5.0
+
+# Caches de références partagés, indexés par engine
+_REFERENCE_CACHES = weakref.WeakKeyDictionary()
+
+# Colonnes CSV converties en IDs de référence
+CSV_REFERENCE_COLUMNS = ("sex", "smoker", "region")
 
 
 def get_db_path(test_mode: bool = False, db_path: str = None) -> str:
@@ -32,9 +220,303 @@ def get_db_path(test_mode: bool = False, db_path: str = None) -> str:
     return db_path
 
 
+def get_sqlite_profile(profile: str = None) -> dict:
+    """Retourne les PRAGMA d'un profil de performance SQLite.
+
+    Les profils sont définis uniquement dans SQLITE_PROFILES ; la
+    configuration choisit un profil par son nom (DB_CONFIG["profile"], utilisé
+    sans nom explicite) et peut en remplacer des valeurs une à une via
+    DB_CONFIG["profile_overrides"][nom].
+
+    Args:
+        profile: Nom du profil ("dashboard", "bulk_load", ...)
+
+    Returns:
+        dict: Valeurs des PRAGMA indexées par nom
+
+    Raises:
+        ValueError: Si le profil n'existe pas
+    """
+    name = profile or DB_CONFIG.get("profile", DEFAULT_SQLITE_PROFILE)
+    if name not in SQLITE_PROFILES:
+        raise ValueError(f"Profil SQLite inconnu : {name}")
+    overrides = DB_CONFIG.get("profile_overrides", {}).get(name, {})
+    return {**SQLITE_PROFILES[name], **overrides}
+
+
+def apply_sqlite_profile(engine: Engine, profile: str = None) -> dict:
+    """Applique un profil de performance à chaque connexion ouverte par l'engine.
+
+    Args:
+        engine: Connexion à la base de données
+        profile: Nom du profil, DB_CONFIG["profile"] par défaut
+
+    Returns:
+        dict: PRAGMA appliqués
+    """
+    settings = get_sqlite_profile(profile)
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in SQLITE_PRAGMAS:
+                if pragma in settings:
+                    cursor.execute(f"PRAGMA {pragma} = {settings[pragma]}")
+        finally:
+            cursor.close()
+
+    return settings
+
+
+def build_engine(
+    db_path: str, profile: str = None, readonly: bool = False, immutable: bool = False
+) -> Engine:
+    """Construit un engine poolé et partageable entre threads.
+
+    La taille du pool et le délai d'attente d'une connexion proviennent de
+    DB_CONFIG["max_connections"] et DB_CONFIG["timeout"]. Sauf si
+    DB_CONFIG["query_stats"] vaut False, les requêtes et l'attente du pool
+    sont mesurées (voir modules.query_stats).
+
+    Args:
+        db_path: Chemin de la base de données
+        profile: Profil de performance SQLite, DB_CONFIG["profile"] par défaut
+            ("readonly" par défaut pour un engine en lecture seule)
+        readonly: Si True, ouvre le fichier en lecture seule (URI mode=ro)
+        immutable: Si True (avec readonly), déclare le fichier immuable :
+            SQLite ne pose aucun verrou et ignore le journal
+
+    Returns:
+        Engine: Connexion à la base de données
+    """
+    if readonly:
+        path = urllib.parse.quote(os.path.abspath(db_path))
+        options = "mode=ro&immutable=1" if immutable else "mode=ro"
+        url = f"sqlite:///file:{path}?{options}&uri=true"
+        profile = profile or "readonly"
+    else:
+        url = f"sqlite:///{db_path}"
+
+    timeout = DB_CONFIG.get("timeout", 30)
+    engine = create_engine(
+        url,
+        poolclass=TimedQueuePool,
+        pool_size=DB_CONFIG.get("max_connections", 10),
+        max_overflow=0,
+        pool_timeout=timeout,
+        echo=DB_CONFIG.get("echo", False),
+        connect_args={"check_same_thread": False, "timeout": timeout},
+    )
+    enable_transactional_ddl(engine)
+    apply_sqlite_profile(engine, profile)
+    watch_database_file(engine, db_path)
+    if DB_CONFIG.get("query_stats", True):
+        instrument_engine(
+            engine,
+            DB_CONFIG.get("slow_query_ms", DEFAULT_SLOW_QUERY_MS),
+            DB_CONFIG.get("explain_slow_queries", False),
+        )
+    return engine
+
+
+def enable_transactional_ddl(engine: Engine):
+    """Confie à SQLAlchemy l'ouverture des transactions SQLite.
+
+    Par défaut, le pilote sqlite3 n'ouvre une transaction qu'avant un
+    INSERT/UPDATE/DELETE : les CREATE TABLE sont validés un par un. Un BEGIN
+    explicite à chaque début de transaction SQLAlchemy rend le DDL
+    transactionnel.
+
+    Args:
+        engine: Connexion à la base de données
+    """
+
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin_transaction(conn):
+        conn.exec_driver_sql("BEGIN")
+
+
+def _file_id(path: str) -> tuple:
+    """Identifie un fichier par (périphérique, inode), None s'il n'existe pas."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_dev, stat.st_ino)
+
+
+def watch_database_file(engine: Engine, db_path: str):
+    """Reconnecte les connexions du pool lorsque le fichier de base est remplacé.
+
+    L'identité du fichier est mémorisée à l'ouverture de chaque connexion et
+    comparée à chaque emprunt au pool : après un remplacement du fichier
+    (base supprimée puis recréée, fichier copié par-dessus), la connexion est
+    invalidée et le pool en ouvre une nouvelle sur le nouveau fichier.
+
+    Args:
+        engine: Connexion à la base de données
+        db_path: Chemin de la base de données
+    """
+
+    @event.listens_for(engine, "connect")
+    def _record_file_id(dbapi_connection, connection_record):
+        connection_record.info["file_id"] = _file_id(db_path)
+
+    @event.listens_for(engine, "checkout")
+    def _detect_swap(dbapi_connection, connection_record, connection_proxy):
+        if connection_record.info.get("file_id") != _file_id(db_path):
+            raise DisconnectionError("Fichier de base de données remplacé")
+
+
+@contextmanager
+def transaction(bind):
+    """Ouvre une transaction sur un engine, ou réutilise celle d'une connexion.
+
+    Args:
+        bind: Engine, ou connexion dont la transaction est gérée par l'appelant
+
+    Yields:
+        Connection: Connexion dans une transaction
+    """
+    if isinstance(bind, Connection):
+        yield bind
+    else:
+        with bind.begin() as conn:
+            yield conn
+
+
+def has_triggers(engine, objects: tuple) -> bool:
+    """Indique si les tables et triggers d'une fonctionnalité optionnelle existent.
+
+    Args:
+        engine: Engine, ou connexion ouverte
+        objects: Paires (type, nom) des objets de la fonctionnalité
+
+    Returns:
+        True si tous les objets sont installés, False sinon
+    """
+    with transaction(engine) as conn:
+        existing = {
+            row[0]
+            for row in conn.execute(
+                text(
+                    "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')"
+                )
+            )
+        }
+    return {name for _, name in objects} <= existing
+
+
+def install_triggers(engine, label: str, ddl: tuple, populate=None) -> bool:
+    """Crée les tables et triggers d'une fonctionnalité optionnelle.
+
+    Le DDL et le remplissage initial s'exécutent dans la même transaction :
+    en cas d'erreur, rien n'est installé.
+
+    Args:
+        engine: Engine, ou connexion dont la transaction est gérée par l'appelant
+        label: Nom de la fonctionnalité dans le journal
+        ddl: Instructions exécutées dans l'ordre
+        populate: Fonction populate(conn) retournant le nombre de lignes
+            chargées, None si la fonctionnalité démarre vide
+
+    Returns:
+        True si la fonctionnalité est disponible, False en cas d'erreur
+    """
+    try:
+        with transaction(engine) as conn:
+            for statement in ddl:
+                conn.execute(text(statement))
+            nb_rows = populate(conn) if populate is not None else None
+        details = f" ({nb_rows} lignes)" if nb_rows is not None else ""
+        logger.info(f"{label} : activation terminée{details}")
+        return True
+    except Exception as e:
+        logger.error(f"Erreur lors de l'activation de {label} : {str(e)}")
+        return False
+
+
+def drop_triggers(engine, label: str, objects: tuple) -> bool:
+    """Supprime les tables et triggers d'une fonctionnalité optionnelle.
+
+    Args:
+        engine: Engine, ou connexion dont la transaction est gérée par l'appelant
+        label: Nom de la fonctionnalité dans le journal
+        objects: Paires (type, nom), triggers avant les tables qu'ils alimentent
+
+    Returns:
+        True si la suppression a réussi, False sinon
+    """
+    try:
+        with transaction(engine) as conn:
+            for object_type, name in objects:
+                conn.execute(text(f"DROP {object_type} IF EXISTS {name}"))
+        logger.info(f"{label} : désactivation terminée")
+        return True
+    except Exception as e:
+        logger.error(f"Erreur lors de la désactivation de {label} : {str(e)}")
+        return False
+
+
+def replace_trigger(conn, name: str, ddl: str) -> bool:
+    """Recrée un trigger existant avec sa définition courante.
+
+    Utilisé par les migrations pour mettre à jour les triggers d'une
+    fonctionnalité optionnelle : un trigger absent (fonctionnalité non
+    activée) n'est pas créé.
+
+    Args:
+        conn: Connexion ouverte (la transaction est gérée par l'appelant)
+        name: Nom du trigger
+        ddl: Instruction CREATE TRIGGER courante
+
+    Returns:
+        True si le trigger a été recréé, False s'il n'existait pas
+    """
+    exists = conn.execute(
+        text("SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name = :n"),
+        {"n": name},
+    ).scalar()
+    if not exists:
+        return False
+    conn.execute(text(f"DROP TRIGGER {name}"))
+    conn.execute(text(ddl))
+    return True
+
+
+def split_sql_script(script: str) -> list:
+    """Découpe un script SQL en instructions complètes.
+
+    Les ';' présents dans les chaînes ou les corps de triggers ne coupent pas
+    l'instruction en cours.
+
+    Args:
+        script: Contenu du script SQL
+
+    Returns:
+        list: Instructions SQL, dans l'ordre du script
+    """
+    statements = []
+    current = ""
+    for piece in script.split(";"):
+        current += piece + ";"
+        if sqlite3.complete_statement(current):
+            if current.strip() != ";":
+                statements.append(current.strip())
+            current = ""
+    return statements
+
+
 def remove_database(db_path: str) -> bool:
     """Supprime la base de données existante.
 
+    Les fichiers annexes du mode WAL (-wal, -shm) sont supprimés avec elle.
+
     Args:
         db_path: Chemin de la base de données
 
@@ -45,15 +527,198 @@ def remove_database(db_path: str) -> bool:
         if os.path.exists(db_path):
             os.remove(db_path)
             logger.info("Ancienne base supprimée")
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
         return True
     except Exception as e:
         logger.error(f"Erreur lors de la suppression de l'ancienne base : {e}")
         return False
 
 
+def read_schema_stamp(conn) -> tuple:
+    """Lit la version du schéma et l'identifiant applicatif de la base.
+
+    Args:
+        conn: Connexion ouverte à la base de données
+
+    Returns:
+        tuple: (user_version, application_id)
+    """
+    return tuple(
+        conn.execute(
+            text(
+                "SELECT user_version, application_id "
+                "FROM pragma_user_version, pragma_application_id"
+            )
+        ).fetchone()
+    )
+
+
+def compute_fingerprint(conn) -> str:
+    """Calcule l'empreinte du schéma et du contenu de la base.
+
+    L'empreinte combine la définition des objets du schéma avec, pour chaque
+    table de FINGERPRINT_TABLES, le nombre de lignes et la plus grande clé,
+    ainsi que la somme des coûts et des âges des patients.
+
+    Args:
+        conn: Connexion ouverte à la base de données
+
+    Returns:
+        str: Empreinte hexadécimale
+    """
+    hasher = hashlib.sha256()
+    schema = conn.execute(
+        text(
+            "SELECT type, name, sql FROM sqlite_master "
+            "WHERE name NOT LIKE 'sqlite_%' ORDER BY type, name"
+        )
+    ).fetchall()
+    hasher.update(repr([tuple(row) for row in schema]).encode("utf-8"))
+
+    for table, key in FINGERPRINT_TABLES.items():
+        stats = conn.execute(
+            text(f"SELECT COUNT(*), MAX({key}) FROM {table}")
+        ).fetchone()
+        hasher.update(f"{table}:{tuple(stats)}".encode("utf-8"))
+
+    totals = conn.execute(
+        text("SELECT TOTAL(insurance_cost), TOTAL(age) FROM PATIENT")
+    ).fetchone()
+    hasher.update(repr(tuple(totals)).encode("utf-8"))
+
+    return hasher.hexdigest()[:32]
+
+
+def write_fingerprint(conn) -> str:
+    """Recalcule l'empreinte de la base et l'enregistre dans DB_METADATA.
+
+    À appeler dans la transaction de tout chargement qui modifie les données,
+    afin que les caches en aval détectent le changement.
+
+    Args:
+        conn: Connexion ouverte (la transaction est gérée par l'appelant)
+
+    Returns:
+        str: Nouvelle empreinte
+    """
+    fingerprint = compute_fingerprint(conn)
+    conn.execute(
+        text(
+            """
+        INSERT INTO DB_METADATA (key, value) VALUES (:key, :value)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value
+        """
+        ),
+        [
+            {"key": "fingerprint", "value": fingerprint},
+            {"key": "updated_at", "value": time.strftime("%Y-%m-%d %H:%M:%S")},
+        ],
+    )
+    return fingerprint
+
+
+def install_data_version_triggers(conn):
+    """Crée le compteur de modifications et ses triggers s'ils n'existent pas.
+
+    Chaque INSERT, UPDATE ou DELETE sur une table de FINGERPRINT_TABLES
+    incrémente DB_METADATA.data_version dans la transaction de l'écriture :
+    l'empreinte lue par _read_fingerprint change à chaque modification, y
+    compris celles qui ne passent pas par un chargeur (write_fingerprint).
+
+    Args:
+        conn: Connexion ouverte (la transaction est gérée par l'appelant)
+    """
+    conn.execute(
+        text("INSERT OR IGNORE INTO DB_METADATA (key, value) VALUES (:key, '0')"),
+        {"key": DATA_VERSION_KEY},
+    )
+    for table in FINGERPRINT_TABLES:
+        for operation in DATA_VERSION_OPERATIONS:
+            conn.execute(
+                text(
+                    f"""
+                CREATE TRIGGER IF NOT EXISTS
+                    trg_data_version_{table.lower()}_{operation.lower()}
+                AFTER {operation} ON {table}
+                BEGIN
+                    UPDATE DB_METADATA SET value = CAST(value AS INTEGER) + 1
+                    WHERE key = '{DATA_VERSION_KEY}';
+                END
+                """
+                )
+            )
+
+
+def _read_fingerprint(conn) -> str:
+    """Lit l'empreinte de la base, None si DB_METADATA n'existe pas encore.
+
+    L'empreinte enregistrée par write_fingerprint est suffixée du compteur de
+    modifications, lus en une seule requête.
+    """
+    try:
+        return conn.execute(
+            text(
+                """
+            SELECT f.value || '-' || COALESCE(v.value, '0')
+            FROM DB_METADATA f
+            LEFT JOIN DB_METADATA v ON v.key = :data_version
+            WHERE f.key = 'fingerprint'
+            """
+            ),
+            {"data_version": DATA_VERSION_KEY},
+        ).scalar()
+    except OperationalError:
+        return None
+
+
+def stamp_schema(conn):
+    """Inscrit la version du schéma et l'identifiant applicatif dans la base.
+
+    Args:
+        conn: Connexion ouverte (la transaction est gérée par l'appelant)
+    """
+    conn.execute(
+        text(
+            """
+        INSERT INTO DB_METADATA (key, value) VALUES ('schema_version', :version)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value
+        """
+        ),
+        {"version": str(SCHEMA_VERSION)},
+    )
+    conn.execute(text(f"PRAGMA application_id = {APPLICATION_ID}"))
+    conn.execute(text(f"PRAGMA user_version = {SCHEMA_VERSION}"))
+
+
+def get_database_fingerprint(engine: Engine) -> str:
+    """Retourne l'empreinte enregistrée de la base.
+
+    Elle change à chaque rechargement comme à chaque écriture sur les tables
+    de FINGERPRINT_TABLES : elle peut servir de clé aux caches des pages.
+
+    Args:
+        engine: Connexion à la base de données
+
+    Returns:
+        str: Empreinte de la base, ou None si elle n'est pas disponible
+    """
+    try:
+        with engine.connect() as conn:
+            return _read_fingerprint(conn)
+    except Exception as e:
+        logger.error(f"Erreur lors de la lecture de l'empreinte : {str(e)}")
+        return None
+
+
 def is_database_valid(engine: Engine) -> bool:
     """Vérifie si la base de données est valide.
 
+    La vérification se limite à la lecture de l'en-tête SQLite : la base est
+    valide si elle porte l'identifiant applicatif et la version de schéma
+    courante, inscrits uniquement à la fin d'une initialisation réussie.
+
     Args:
         engine: Connexion à la base de données
 
@@ -62,52 +727,328 @@ def is_database_valid(engine: Engine) -> bool:
     """
     try:
         with engine.connect() as conn:
-            result = conn.execute(
-                text("SELECT name FROM sqlite_master WHERE type='table'")
-            ).fetchall()
-            return bool(result)
+            return read_schema_stamp(conn) == (SCHEMA_VERSION, APPLICATION_ID)
     except Exception as e:
         logger.error(f"Base existante mais invalide : {str(e)}")
         return False
 
 
-def initialize_database(engine: Engine) -> bool:
+def _migrate_to_v1(conn):
+    """Migration 0 -> 1 : ajout de la table DB_METADATA."""
+    existing = {
+        row[0]
+        for row in conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type='table'")
+        )
+    }
+    missing = set(REQUIRED_TABLES) - existing - {"DB_METADATA"}
+    if missing:
+        raise ValueError(f"Tables manquantes : {', '.join(sorted(missing))}")
+
+    conn.execute(
+        text(
+            """
+        CREATE TABLE IF NOT EXISTS DB_METADATA(
+           key VARCHAR(50) PRIMARY KEY,
+           value VARCHAR(255)
+        )
+        """
+        )
+    )
+
+
+def _migrate_to_v2(conn):
+    """Migration 1 -> 2 : index secondaires et statistiques du planificateur."""
+    for name, target in SCHEMA_INDEXES.items():
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {target}"))
+    conn.execute(text("ANALYZE"))
+
+
+# Colonnes de PATIENT communes aux schémas v2 et v3, hors clé
+PATIENT_COLUMNS = (
+    ("age", "INT"),
+    ("nb_children", "INT"),
+    ("bmi", "DECIMAL(15,2)"),
+    ("insurance_cost", "DECIMAL(15,2)"),
+    ("id_region", "INT NOT NULL"),
+    ("id_smoking_status", "INT NOT NULL"),
+    ("id_sex", "INT NOT NULL"),
+)
+
+PATIENT_EXTERNAL_ID_INDEX = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_patient_external_id "
+    "ON PATIENT(external_id) WHERE external_id IS NOT NULL"
+)
+
+
+def _is_without_rowid(conn, table: str) -> bool:
+    sql = conn.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": table},
+    ).scalar()
+    return sql.rstrip().upper().endswith("WITHOUT ROWID")
+
+
+def _replace_table(conn, table: str, create_sql: str, copy_sql: str):
+    """Reconstruit une table : copie en masse, puis index et triggers recréés."""
+    dependents = conn.execute(
+        text(
+            "SELECT sql FROM sqlite_master WHERE tbl_name = :name "
+            "AND type IN ('index', 'trigger') AND sql IS NOT NULL "
+            "ORDER BY type = 'trigger'"
+        ),
+        {"name": table},
+    ).fetchall()
+
+    conn.execute(text(create_sql.strip().format(name=f"{table}_v3")))
+    conn.execute(text(copy_sql.format(name=f"{table}_v3")))
+    conn.execute(text(f"DROP TABLE {table}"))
+    conn.execute(text(f"ALTER TABLE {table}_v3 RENAME TO {table}"))
+    for (sql,) in dependents:
+        conn.execute(text(sql))
+
+
+def _migrate_to_v3(conn):
+    """Migration 2 -> 3 : clé entière pour PATIENT, tables de référence WITHOUT ROWID.
+
+    PATIENT.id_patient devient un alias du rowid (les rowid existants sont
+    conservés : PATIENT_FLAT et le journal des modifications restent valides) ;
+    l'ancien identifiant texte est conservé dans external_id. manages est
+    réindexé sur la nouvelle clé. Chaque table est copiée en une requête
+    INSERT ... SELECT ; une table déjà au format v3 est laissée telle quelle.
+    """
+    for table, id_column, label_column in REFERENCE_TABLES.values():
+        if _is_without_rowid(conn, table):
+            continue
+        _replace_table(
+            conn,
+            table,
+            f"""
+            CREATE TABLE {{name}}(
+               {id_column} INTEGER PRIMARY KEY,
+               {label_column} VARCHAR(50)
+            ) WITHOUT ROWID
+            """,
+            f"INSERT INTO {{name}} SELECT {id_column}, {label_column} FROM {table}",
+        )
+
+    columns = conn.execute(text("PRAGMA table_info(PATIENT)")).fetchall()
+    if "external_id" not in {column[1] for column in columns}:
+        # Colonnes ajoutées après coup (prenom, nom...) conservées telles quelles
+        known = {"id_patient"} | {name for name, _ in PATIENT_COLUMNS}
+        extra = [(column[1], column[2]) for column in columns if column[1] not in known]
+        definitions = PATIENT_COLUMNS + tuple(extra)
+        names = ", ".join(name for name, _ in definitions)
+
+        # manages est migré avant PATIENT : la correspondance passe par l'ancien
+        # identifiant texte
+        if not _is_without_rowid(conn, "manages"):
+            _replace_table(
+                conn,
+                "manages",
+                """
+                CREATE TABLE {name}(
+                   id_patient INTEGER,
+                   id_user_account INT,
+                   PRIMARY KEY(id_patient, id_user_account),
+                   FOREIGN KEY(id_patient) REFERENCES PATIENT(id_patient),
+                   FOREIGN KEY(id_user_account) REFERENCES USER_ACCOUNT(id_user_account)
+                ) WITHOUT ROWID
+                """,
+                """
+                INSERT INTO {name}
+                SELECT p.rowid, m.id_user_account
+                FROM manages m JOIN PATIENT p ON p.id_patient = m.id_patient
+                """,
+            )
+
+        _replace_table(
+            conn,
+            "PATIENT",
+            f"""
+            CREATE TABLE {{name}}(
+               id_patient INTEGER PRIMARY KEY,
+               external_id VARCHAR(50),
+               {", ".join(f"{name} {decl}" for name, decl in definitions)},
+               FOREIGN KEY(id_region) REFERENCES REGION(id_region),
+               FOREIGN KEY(id_smoking_status) REFERENCES SMOKING(id_smoking_status),
+               FOREIGN KEY(id_sex) REFERENCES SEX(id_sex)
+            )
+            """,
+            f"""
+            INSERT INTO {{name}} (id_patient, external_id, {names})
+            SELECT rowid, id_patient, {names} FROM PATIENT ORDER BY rowid
+            """,
+        )
+
+    conn.execute(text(PATIENT_EXTERNAL_ID_INDEX))
+    conn.execute(text("ANALYZE"))
+
+
+def _migrate_to_v4(conn):
+    """Migration 3 -> 4 : compteur de modifications, triggers optionnels à jour.
+
+    Les triggers de mise à jour de PATIENT_FLAT et de PATIENT_CHANGES, s'ils
+    sont installés, sont recréés pour suivre les changements de id_patient.
+    Le journal de modules.maintenance rejoint le schéma (data/base.sql).
+    """
+    # Imports locaux : les modules des fonctionnalités importent db_loader
+    from modules.change_log import CHANGE_LOG_UPDATE_TRIGGER
+    from modules.patient_flat import PATIENT_FLAT_UPDATE_TRIGGER
+
+    install_data_version_triggers(conn)
+    conn.execute(
+        text(
+            """
+        CREATE TABLE IF NOT EXISTS MAINTENANCE_LOG(
+           id_run INTEGER PRIMARY KEY,
+           started_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+           duration_s REAL NOT NULL,
+           bytes_freed INTEGER NOT NULL,
+           fragmentation REAL,
+           wal_bytes INTEGER,
+           steps TEXT,
+           completed BOOLEAN NOT NULL
+        )
+        """
+        )
+    )
+    replace_trigger(conn, "trg_patient_flat_update", PATIENT_FLAT_UPDATE_TRIGGER)
+    replace_trigger(conn, "trg_patient_changes_update", CHANGE_LOG_UPDATE_TRIGGER)
+
+
+# Migrations indexées par la version de schéma qu'elles produisent
+SCHEMA_MIGRATIONS = {
+    1: _migrate_to_v1,
+    2: _migrate_to_v2,
+    3: _migrate_to_v3,
+    4: _migrate_to_v4,
+}
+
+
+def explain_hot_queries(engine: Engine) -> dict:
+    """Vérifie que les requêtes fréquentes utilisent les index attendus.
+
+    Exécute EXPLAIN QUERY PLAN sur chaque requête de HOT_QUERIES et contrôle
+    que le plan mentionne l'index attendu. Utile après une migration ou un
+    changement de requête :
+
+        for name, result in explain_hot_queries(engine).items():
+            print(name, result["uses_index"], result["plan"])
+
+    Args:
+        engine: Connexion à la base de données
+
+    Returns:
+        dict: Pour chaque requête, le plan ("plan"), l'index attendu ("index")
+        et s'il est utilisé ("uses_index")
+    """
+    report = {}
+    with engine.connect() as conn:
+        for name, (query, params, index) in HOT_QUERIES.items():
+            plan = [
+                row[-1]
+                for row in conn.execute(text(f"EXPLAIN QUERY PLAN {query}"), params)
+            ]
+            uses_index = any(index in detail for detail in plan)
+            if not uses_index:
+                logger.warning(f"La requête {name} n'utilise pas l'index {index}")
+            report[name] = {"plan": plan, "index": index, "uses_index": uses_index}
+    return report
+
+
+def upgrade_database(engine: Engine) -> bool:
+    """Met à niveau une base existante vers la version de schéma courante.
+
+    Les migrations manquantes sont appliquées dans une seule transaction, puis
+    l'empreinte et la version sont inscrites.
+
+    Args:
+        engine: Connexion à la base de données
+
+    Returns:
+        True si la base est à jour, False si elle ne peut pas être migrée
+    """
+    try:
+        with engine.begin() as conn:
+            version, application_id = read_schema_stamp(conn)
+            if application_id not in (0, APPLICATION_ID):
+                logger.error(f"Identifiant applicatif inconnu : {application_id}")
+                return False
+            if version > SCHEMA_VERSION:
+                logger.error(f"Version de schéma {version} plus récente que le code")
+                return False
+            if version == SCHEMA_VERSION and application_id == APPLICATION_ID:
+                return True
+
+            for target in range(version + 1, SCHEMA_VERSION + 1):
+                logger.info(f"Migration du schéma vers la version {target}")
+                SCHEMA_MIGRATIONS[target](conn)
+
+            write_fingerprint(conn)
+            stamp_schema(conn)
+        logger.info(f"Base mise à niveau (schéma v{SCHEMA_VERSION})")
+        return True
+    except Exception as e:
+        logger.error(f"Erreur lors de la mise à niveau de la base : {str(e)}")
+        return False
+
+
+def initialize_database(engine: Engine, nb_patients: int = None) -> bool:
     """Initialise la base de données avec les tables et les données.
 
+    Schéma, données de référence, compte admin, patients et version du schéma
+    sont appliqués dans une seule transaction : en cas d'erreur, la base reste
+    vide. Les patients sont ceux de data/insurance.csv ; des patients
+    synthétiques ne sont ajoutés que sur demande.
+
     Args:
         engine: Connexion à la base de données
+        nb_patients: Nombre de patients synthétiques à ajouter,
+            DB_CONFIG["synthetic_patients"] (0 par défaut) si None
 
     Returns:
         True si l'initialisation a réussi, False sinon
     """
     try:
-        # Lecture et exécution du script SQL
+        # Lecture du script SQL
         with open("data/base.sql", "r", encoding="utf-8") as f:
             sql_commands = f.read()
 
-        # Création des tables
-        with engine.connect() as conn:
-            for command in sql_commands.split(";"):
-                if command.strip():
-                    conn.execute(text(command))
-                    conn.commit()
-
+        with engine.begin() as conn:
+            # Création des tables
+            for command in split_sql_script(sql_commands):
+                conn.exec_driver_sql(command)
             logger.info("Tables créées avec succès")
 
             # Chargement des données de référence d'abord
-            load_reference_data(engine)
+            load_reference_data(conn)
             logger.info("Données de référence chargées")
 
             # Puis création du compte admin
-            create_admin_account(engine)
+            create_admin_account(conn)
             logger.info("Compte admin créé")
 
-            # Enfin chargement des données patients
-            load_patient_data(engine)
+            # Enfin chargement des données patients : réelles, puis synthétiques
+            # uniquement si demandé (jamais mélangées aux réelles par défaut)
+            if os.path.exists(INSURANCE_CSV_PATH):
+                load_csv_patient_data(conn, INSURANCE_CSV_PATH)
+            else:
+                logger.warning(f"Fichier {INSURANCE_CSV_PATH} introuvable")
+            if nb_patients is None:
+                nb_patients = DB_CONFIG.get("synthetic_patients", 0)
+            if nb_patients > 0:
+                load_patient_data(conn, nb_patients=nb_patients)
             logger.info("Données patients chargées")
 
-            logger.info("Base de données créée et initialisée avec succès")
+            # Compteur de modifications après le chargement initial, puis
+            # version du schéma inscrite en dernier
+            install_data_version_triggers(conn)
+            conn.execute(text("ANALYZE"))
+            write_fingerprint(conn)
+            stamp_schema(conn)
 
+        logger.info("Base de données créée et initialisée avec succès")
         return True
     except Exception as e:
         logger.error(f"Erreur lors de la création de la base : {str(e)}")
@@ -115,7 +1056,11 @@ def initialize_database(engine: Engine) -> bool:
 
 
 def create_database(
-    test_mode: bool = False, force_recreate: bool = False, db_path: str = None
+    test_mode: bool = False,
+    force_recreate: bool = False,
+    db_path: str = None,
+    profile: str = None,
+    rebuild: bool = False,
 ) -> Engine:
     """Crée la base de données si elle n'existe pas.
 
@@ -123,6 +1068,10 @@ def create_database(
         test_mode: Si True, utilise la base de test
         force_recreate: Si True, force la recréation de la base
         db_path: Chemin personnalisé de la base de données
+        profile: Profil de performance SQLite, DB_CONFIG["profile"] par défaut
+        rebuild: Avec force_recreate, reconstruit la base à côté puis la
+            substitue à l'ancienne (voir rebuild_database) au lieu de la
+            supprimer d'abord
 
     Returns:
         Engine: Connexion à la base de données ou None en cas d'erreur
@@ -132,35 +1081,249 @@ def create_database(
     # Détermination du chemin de la base
     db_path = get_db_path(test_mode, db_path)
 
+    # Reconstruction sans interruption si demandé
+    if force_recreate and rebuild and os.path.exists(db_path):
+        if not rebuild_database(db_path=db_path):
+            return None
+        return build_engine(db_path, profile)
+
     # Suppression de l'ancienne base si demandé
     if force_recreate and not remove_database(db_path):
         return None
 
-    # Création de l'engine
-    engine = create_engine(f"sqlite:///{db_path}")
+    # Création de l'engine avec le profil de performance
+    engine = build_engine(db_path, profile)
 
     # Si la base existe et qu'on ne force pas la recréation, on vérifie juste si elle est valide
     if os.path.exists(db_path) and not force_recreate:
         if is_database_valid(engine):
             logger.info("Base de données existante et valide")
             return engine
+        elif upgrade_database(engine):
+            return engine
         else:
-            # On va recréer la base
+            # On va recréer la base (connexions du pool fermées au préalable)
             force_recreate = True
+            engine.dispose()
             if not remove_database(db_path):
                 return None
 
-    # Initialisation de la base de données
+    # Initialisation de la base de données (transaction annulée en cas d'échec)
     if initialize_database(engine):
         return engine
     else:
-        # Nettoyage en cas d'échec
-        remove_database(db_path)
+        engine.dispose()
         return None
 
 
+def _fsync(path: str):
+    """Force l'écriture sur disque d'un fichier ou d'un répertoire."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        # Répertoires non ouvrables (Windows) : rien à synchroniser
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _copy_into_live(tmp_path: str, db_path: str):
+    """Copie la base reconstruite dans la base en service avec l'API de sauvegarde.
+
+    La copie est faite en une seule étape, donc en une seule transaction
+    d'écriture : les lecteurs, y compris ceux d'autres processus, gardent leur
+    instantané puis voient la nouvelle base à leur transaction suivante. En
+    WAL, aucune connexion n'a besoin d'être fermée ; un écrivain en cours
+    retarde seulement la copie (busy timeout).
+    """
+    timeout = DB_CONFIG.get("timeout", 30)
+    with closing(sqlite3.connect(tmp_path)) as source:
+        with closing(sqlite3.connect(db_path, timeout=timeout)) as target:
+            target.execute(f"PRAGMA busy_timeout = {int(timeout * 1000)}")
+            source.backup(target)
+            # Pages recopiées dans la base sans attendre les lecteurs
+            target.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+
+def rebuild_database(
+    test_mode: bool = False,
+    db_path: str = None,
+    profile: str = "bulk_load",
+    nb_patients: int = None,
+) -> bool:
+    """Reconstruit la base sans interruption de service.
+
+    La nouvelle base est construite et analysée dans un fichier temporaire du
+    même répertoire, puis vérifiée (quick_check, version de schéma) avant
+    d'être copiée dans la base en service avec l'API de sauvegarde SQLite, en
+    une transaction (voir _copy_into_live). Pendant la reconstruction comme
+    pendant la copie, les sessions et les autres processus gardent leurs
+    connexions ouvertes et continuent de lire l'ancienne version.
+
+    Args:
+        test_mode: Si True, utilise la base de test
+        db_path: Chemin personnalisé de la base de données
+        profile: Profil SQLite utilisé pour la construction
+        nb_patients: Nombre de patients synthétiques à ajouter (voir
+            initialize_database)
+
+    Returns:
+        True si la base a été remplacée, False sinon (base en service intacte)
+    """
+    db_path = get_db_path(test_mode, db_path)
+    directory = os.path.dirname(os.path.abspath(db_path))
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f"{os.path.basename(db_path)}.", suffix=".rebuild", dir=directory
+    )
+    os.close(fd)
+    logger.info(f"Reconstruction de la base dans {tmp_path}")
+    start_time = time.perf_counter()
+
+    tmp_engine = build_engine(tmp_path, profile)
+    try:
+        if not initialize_database(tmp_engine, nb_patients=nb_patients):
+            raise RuntimeError("Initialisation de la nouvelle base impossible")
+
+        with tmp_engine.connect() as conn:
+            check = conn.execute(text("PRAGMA quick_check")).scalar()
+        if check != "ok" or not is_database_valid(tmp_engine):
+            raise RuntimeError(f"Nouvelle base invalide : {check}")
+
+        # Statistiques calculées par initialize_database (ANALYZE). Retour au
+        # journal classique : le fichier est autonome (aucun -wal/-shm). Le
+        # VACUUM active auto_vacuum INCREMENTAL, utilisé par
+        # modules.maintenance, et aligne la taille de page sur celle de la
+        # base en service (condition de la copie vers une base en WAL)
+        tmp_engine.dispose()
+        with closing(sqlite3.connect(tmp_path, isolation_level=None)) as raw_conn:
+            raw_conn.execute("PRAGMA journal_mode = DELETE")
+            raw_conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            if os.path.exists(db_path):
+                with closing(sqlite3.connect(db_path)) as live:
+                    page_size = live.execute("PRAGMA page_size").fetchone()[0]
+                raw_conn.execute(f"PRAGMA page_size = {page_size}")
+            raw_conn.execute("VACUUM")
+
+        if os.path.exists(db_path):
+            _copy_into_live(tmp_path, db_path)
+            remove_database(tmp_path)
+        else:
+            _fsync(tmp_path)
+            os.replace(tmp_path, db_path)
+            _fsync(directory)
+    except Exception as e:
+        logger.error(f"Erreur lors de la reconstruction de la base : {str(e)}")
+        tmp_engine.dispose()
+        remove_database(tmp_path)
+        return False
+
+    elapsed = time.perf_counter() - start_time
+    logger.info(f"Base reconstruite et remplacée en {elapsed:.2f}s")
+    return True
+
+
+def get_engine(
+    test_mode: bool = False, db_path: str = None, profile: str = None
+) -> Engine:
+    """Retourne l'engine partagé du processus pour une base de données.
+
+    Au premier appel pour un chemin donné, la base est créée ou vérifiée via
+    create_database ; les appels suivants (reruns Streamlit, connexions,
+    chargements de pages) réutilisent le même engine poolé sans refaire les
+    vérifications.
+
+    Args:
+        test_mode: Si True, utilise la base de test
+        db_path: Chemin personnalisé de la base de données
+        profile: Profil de performance SQLite, DB_CONFIG["profile"] par défaut
+
+    Returns:
+        Engine: Connexion à la base de données ou None en cas d'erreur
+    """
+    db_path = os.path.abspath(get_db_path(test_mode, db_path))
+    key = (db_path, profile or DB_CONFIG.get("profile", DEFAULT_SQLITE_PROFILE))
+
+    engine = _ENGINES.get(key)
+    if engine is not None:
+        return engine
+
+    with _ENGINES_LOCK:
+        # Un autre thread a pu créer l'engine pendant l'attente du verrou
+        engine = _ENGINES.get(key)
+        if engine is None:
+            engine = create_database(db_path=db_path, profile=profile)
+            if engine is not None:
+                _ENGINES[key] = engine
+        return engine
+
+
+def get_readonly_engine(
+    test_mode: bool = False, db_path: str = None, immutable: bool = None
+) -> Engine:
+    """Retourne l'engine partagé en lecture seule d'une base existante.
+
+    Les connexions sont ouvertes en mode=ro avec PRAGMA query_only : toute
+    écriture échoue. La base n'est jamais créée ni reconstruite ; si elle est
+    absente ou invalide, None est retourné. Avec immutable, SQLite ne pose
+    aucun verrou et ne lit pas le journal WAL : à réserver aux fichiers figés
+    (sauvegardes, bases archivées).
+
+    Args:
+        test_mode: Si True, utilise la base de test
+        db_path: Chemin personnalisé de la base de données
+        immutable: Fichier immuable, DB_CONFIG["readonly_immutable"] par défaut
+
+    Returns:
+        Engine: Connexion en lecture seule, ou None si la base est indisponible
+    """
+    if immutable is None:
+        immutable = DB_CONFIG.get("readonly_immutable", False)
+    db_path = os.path.abspath(get_db_path(test_mode, db_path))
+    key = (db_path, "immutable" if immutable else "readonly")
+
+    engine = _ENGINES.get(key)
+    if engine is not None:
+        return engine
+
+    with _ENGINES_LOCK:
+        engine = _ENGINES.get(key)
+        if engine is not None:
+            return engine
+        if not os.path.exists(db_path):
+            logger.error(f"Base introuvable pour la lecture seule : {db_path}")
+            return None
+
+        engine = build_engine(db_path, readonly=True, immutable=immutable)
+        if not is_database_valid(engine):
+            logger.error(f"Base invalide, lecture seule impossible : {db_path}")
+            engine.dispose()
+            return None
+        _ENGINES[key] = engine
+        return engine
+
+
+def dispose_engines(db_path: str = None):
+    """Ferme et retire du registre les engines partagés.
+
+    Args:
+        db_path: Chemin de la base concernée, toutes les bases si None
+    """
+    with _ENGINES_LOCK:
+        for key in list(_ENGINES):
+            if db_path is None or key[0] == os.path.abspath(db_path):
+                _ENGINES.pop(key).dispose()
+
+
 def create_admin_account(engine):
-    """Crée le compte administrateur"""
+    """Crée le compte administrateur.
+
+    Args:
+        engine: Engine, ou connexion dont la transaction est gérée par l'appelant
+    """
     logger.info("Création du compte administrateur")
 
     # Mot de passe par défaut pour l'admin (à changer en production)
@@ -168,7 +1331,7 @@ def create_admin_account(engine):
     admin_password = "password123"  # En pratique, utiliser un mot de passe fort
     admin_email = "admin@example.com"
 
-    with engine.connect() as conn:
+    with transaction(engine) as conn:
         try:
             # Vérification de l'existence du type admin
             admin_type = conn.execute(
@@ -213,121 +1376,473 @@ def create_admin_account(engine):
                 },
             )
 
-            conn.commit()
             logger.info("Compte administrateur créé avec succès")
 
         except Exception as e:
             logger.error(f"Erreur lors de la création du compte admin: {str(e)}")
-            conn.rollback()
+            raise
 
 
 def load_reference_data(engine):
     """Charge les données de référence dans la base de données.
 
-    Cette fonction insère les données de référence (sexe, statut tabagique, région)
-    dans les tables correspondantes.
+    Cette fonction insère les données de référence (sexe, statut tabagique, région,
+    type d'utilisateur) dans les tables correspondantes, un executemany par table.
+    Les tables étant WITHOUT ROWID, les IDs sont attribués explicitement (1, 2,
+    ... dans l'ordre de REFERENCE_VALUES).
 
     Args:
-        engine: Connexion à la base de données
+        engine: Engine, ou connexion dont la transaction est gérée par l'appelant
     """
     logger.info("Chargement des données de référence")
-    with engine.connect() as conn:
-        # Insertion des données de sexe
-        conn.execute(text("INSERT INTO SEX (sex_type) VALUES ('male')"))
-        conn.execute(text("INSERT INTO SEX (sex_type) VALUES ('female')"))
+    with transaction(engine) as conn:
+        for key, values in REFERENCE_VALUES.items():
+            table, id_column, label_column = REFERENCE_TABLES[key]
+            conn.execute(
+                text(
+                    f"INSERT INTO {table} ({id_column}, {label_column}) "
+                    "VALUES (:id, :label)"
+                ),
+                [
+                    {"id": ref_id, "label": value}
+                    for ref_id, value in enumerate(values, 1)
+                ],
+            )
 
-        # Insertion des données de statut tabagique
-        conn.execute(text("INSERT INTO SMOKING (smoking_status) VALUES ('yes')"))
-        conn.execute(text("INSERT INTO SMOKING (smoking_status) VALUES ('no')"))
 
-        # Insertion des données de région
-        conn.execute(text("INSERT INTO REGION (region_name) VALUES ('southwest')"))
-        conn.execute(text("INSERT INTO REGION (region_name) VALUES ('southeast')"))
-        conn.execute(text("INSERT INTO REGION (region_name) VALUES ('northwest')"))
-        conn.execute(text("INSERT INTO REGION (region_name) VALUES ('northeast')"))
+def get_patient_reference_ids(conn) -> dict:
+    """Récupère les IDs de référence utilisés pour générer des patients.
 
-        # Insertion des types d'utilisateurs
-        conn.execute(text("INSERT INTO USER_TYPE (type_name) VALUES ('admin')"))
-        conn.execute(text("INSERT INTO USER_TYPE (type_name) VALUES ('user')"))
+    Args:
+        conn: Connexion ouverte
 
-        conn.commit()
+    Returns:
+        dict: Arguments sex_ids, smoking_ids, region_ids et smoker_id de
+        generate_patient_arrays
+    """
+    sex_ids = [row[0] for row in conn.execute(text("SELECT id_sex FROM SEX"))]
+    smoking_rows = conn.execute(
+        text("SELECT id_smoking_status, smoking_status FROM SMOKING")
+    ).fetchall()
+    region_ids = [row[0] for row in conn.execute(text("SELECT id_region FROM REGION"))]
+
+    return {
+        "sex_ids": sex_ids,
+        "smoking_ids": [row[0] for row in smoking_rows],
+        "region_ids": region_ids,
+        "smoker_id": next((row[0] for row in smoking_rows if row[1] == "yes"), None),
+    }
+
+
+def generate_patient_arrays(
+    rng: np.random.Generator,
+    nb_patients: int,
+    sex_ids: list,
+    smoking_ids: list,
+    region_ids: list,
+    smoker_id: int,
+) -> dict:
+    """Génère en une fois toutes les colonnes d'un lot de patients.
+
+    Chaque colonne est tirée d'un seul appel au générateur NumPy et le coût
+    d'assurance est calculé par une unique expression vectorisée.
+
+    Args:
+        rng: Générateur NumPy (initialisé avec une graine pour la reproductibilité)
+        nb_patients: Nombre de patients à générer
+        sex_ids: IDs valides de la table SEX
+        smoking_ids: IDs valides de la table SMOKING
+        region_ids: IDs valides de la table REGION
+        smoker_id: ID correspondant au statut fumeur ('yes')
 
+    Returns:
+        dict: Tableaux NumPy indexés par nom de colonne de PATIENT
+    """
+    age = rng.integers(18, 66, size=nb_patients)
+    bmi = np.round(rng.uniform(15.0, 50.0, size=nb_patients), 1)
+    nb_children = rng.integers(0, 6, size=nb_patients)
+    id_sex = rng.choice(np.asarray(sex_ids), size=nb_patients)
+    id_smoking = rng.choice(np.asarray(smoking_ids), size=nb_patients)
+    id_region = rng.choice(np.asarray(region_ids), size=nb_patients)
+
+    # Calcul d'un coût d'assurance fictif
+    insurance_cost = (
+        5000
+        + age * 50
+        + bmi * 300
+        + nb_children * 500
+        + np.where(id_smoking == smoker_id, 15000, 0)
+    )
+    insurance_cost = np.round(insurance_cost * (0.8 + rng.random(nb_patients) * 0.4), 2)
+
+    return {
+        "age": age,
+        "bmi": bmi,
+        "nb_children": nb_children,
+        "insurance_cost": insurance_cost,
+        "id_sex": id_sex,
+        "id_smoking_status": id_smoking,
+        "id_region": id_region,
+    }
+
+
+def insert_patient_arrays(conn, columns: dict, chunk_size: int = PATIENT_CHUNK_SIZE):
+    """Insère des colonnes de patients par paquets avec executemany.
 
-def load_patient_data(engine):
+    Args:
+        conn: Connexion ouverte (la transaction est gérée par l'appelant)
+        columns: Tableaux NumPy indexés par nom de colonne de PATIENT
+        chunk_size: Nombre de lignes envoyées par appel à executemany
+
+    Returns:
+        int: Nombre de lignes insérées
+    """
+    names = list(columns)
+    placeholders = ", ".join("?" for _ in names)
+    insert_sql = f"INSERT INTO PATIENT ({', '.join(names)}) VALUES ({placeholders})"
+
+    nb_rows = len(columns[names[0]]) if names else 0
+    for start in range(0, nb_rows, chunk_size):
+        # Conversion en types Python natifs, attendus par le pilote sqlite3
+        chunk = [columns[name][start : start + chunk_size].tolist() for name in names]
+        conn.exec_driver_sql(insert_sql, list(zip(*chunk)))
+
+    return nb_rows
+
+
+def load_patient_data(
+    engine,
+    nb_patients: int = 1000,
+    seed: int = None,
+    chunk_size: int = PATIENT_CHUNK_SIZE,
+) -> int:
     """Charge les données des patients dans la base de données.
 
-    Cette fonction génère des données aléatoires pour les patients
-    et les insère dans la table PATIENT.
+    Cette fonction génère des données aléatoires pour les patients de manière
+    vectorisée et les insère par paquets dans la table PATIENT, au sein d'une
+    seule transaction.
 
     Args:
-        engine: Connexion à la base de données
+        engine: Engine, ou connexion dont la transaction est gérée par l'appelant
+        nb_patients: Nombre de patients à générer
+        seed: Graine du générateur aléatoire (None pour un tirage non reproductible)
+        chunk_size: Nombre de lignes insérées par appel à executemany
+
+    Returns:
+        int: Nombre de patients insérés
     """
-    logger.info("Chargement des données des patients")
+    logger.info(f"Chargement des données de {nb_patients} patients")
+    start_time = time.perf_counter()
+
+    rng = np.random.default_rng(seed)
+
+    with transaction(engine) as conn:
+        columns = generate_patient_arrays(
+            rng, nb_patients, **get_patient_reference_ids(conn)
+        )
+        nb_inserted = insert_patient_arrays(conn, columns, chunk_size)
+        write_fingerprint(conn)
+
+    elapsed = time.perf_counter() - start_time
+    rate = nb_inserted / elapsed if elapsed > 0 else float("inf")
+    logger.info(
+        f"{nb_inserted} patients insérés en {elapsed:.2f}s ({rate:,.0f} lignes/s)"
+    )
+    return nb_inserted
+
+
+def load_csv_patient_data(
+    engine,
+    csv_path: str = INSURANCE_CSV_PATH,
+    chunk_size: int = PATIENT_CHUNK_SIZE,
+) -> int:
+    """Charge un fichier CSV de patients dans la table PATIENT en streaming.
+
+    Le fichier (même schéma que data/insurance.csv) est lu par blocs de taille
+    fixe : la mémoire utilisée reste constante quelle que soit sa taille. Les
+    libellés sex/smoker/region sont convertis en IDs de référence à partir de
+    dictionnaires construits une seule fois, puis chaque bloc est inséré avec
+    executemany. L'ensemble du fichier est chargé dans une seule transaction.
 
-    # Nombre de patients à générer
-    nb_patients = 1000
+    Args:
+        engine: Engine, ou connexion dont la transaction est gérée par l'appelant
+        csv_path: Chemin du fichier CSV à charger
+        chunk_size: Nombre de lignes lues et insérées par bloc
 
-    with engine.connect() as conn:
-        # Récupération des IDs de référence
-        sex_ids = conn.execute(text("SELECT id_sex FROM SEX")).fetchall()
-        smoking_ids = conn.execute(
-            text("SELECT id_smoking_status FROM SMOKING")
-        ).fetchall()
-        region_ids = conn.execute(text("SELECT id_region FROM REGION")).fetchall()
-
-        # Génération et insertion des données patients
-        for _ in range(nb_patients):
-            # Génération de données aléatoires
-            age = fake.random_int(min=18, max=65)
-            bmi = round(fake.random_number(digits=2, fix_len=False) % 35 + 15, 1)
-            nb_children = fake.random_int(min=0, max=5)
-
-            # Sélection aléatoire des IDs de référence
-            id_sex = fake.random_element(sex_ids)[0]
-            id_smoking = fake.random_element(smoking_ids)[0]
-            id_region = fake.random_element(region_ids)[0]
-
-            # Calcul d'un coût d'assurance fictif
-            base_cost = 5000
-            age_factor = age * 50
-            bmi_factor = bmi * 300
-            children_factor = nb_children * 500
-            smoking_factor = 15000 if id_smoking == 1 else 0
-
-            insurance_cost = (
-                base_cost + age_factor + bmi_factor + children_factor + smoking_factor
-            )
-            insurance_cost = round(
-                insurance_cost * (0.8 + fake.random.random() * 0.4), 2
+    Returns:
+        int: Nombre de patients insérés
+    """
+    logger.info(f"Chargement des patients depuis {csv_path}")
+    start_time = time.perf_counter()
+    nb_inserted = 0
+    nb_rejected = 0
+
+    with transaction(engine) as conn:
+        # Références chargées une fois dans la transaction de chargement
+        references = ReferenceCache()
+        references.load(conn)
+
+        chunks = pd.read_csv(
+            csv_path,
+            usecols=list(CSV_COLUMN_DTYPES),
+            dtype=CSV_COLUMN_DTYPES,
+            chunksize=chunk_size,
+        )
+        for chunk in chunks:
+            columns = {
+                "age": chunk["age"],
+                "bmi": chunk["bmi"].round(2),
+                "nb_children": chunk["children"],
+                "insurance_cost": chunk["charges"].round(2),
+            }
+            for csv_column in CSV_REFERENCE_COLUMNS:
+                id_column = REFERENCE_TABLES[ReferenceCache.resolve(csv_column)][1]
+                labels = chunk[csv_column].str.strip().str.lower()
+                columns[id_column] = references.codes_for(csv_column, labels)
+
+            frame = pd.DataFrame(columns)
+            valid = frame.notna().all(axis=1)
+            nb_rejected += int((~valid).sum())
+            frame = frame[valid].astype(
+                {
+                    "age": "int64",
+                    "nb_children": "int64",
+                    "id_sex": "int64",
+                    "id_smoking_status": "int64",
+                    "id_region": "int64",
+                }
             )
 
-            # Insertion dans la base
-            conn.execute(
-                text(
-                    """
-                INSERT INTO PATIENT (age, bmi, nb_children, insurance_cost, id_sex, id_smoking_status, id_region)
-                VALUES (:age, :bmi, :nb_children, :insurance_cost, :id_sex, :id_smoking, :id_region)
-                """
-                ),
-                {
-                    "age": age,
-                    "bmi": bmi,
-                    "nb_children": nb_children,
-                    "insurance_cost": insurance_cost,
-                    "id_sex": id_sex,
-                    "id_smoking": id_smoking,
-                    "id_region": id_region,
-                },
+            nb_inserted += insert_patient_arrays(
+                conn,
+                {name: frame[name].to_numpy() for name in frame.columns},
+                chunk_size,
             )
 
-        conn.commit()
+        write_fingerprint(conn)
+
+    if nb_rejected:
+        logger.warning(
+            f"{nb_rejected} lignes ignorées (valeurs manquantes ou inconnues)"
+        )
+
+    elapsed = time.perf_counter() - start_time
+    rate = nb_inserted / elapsed if elapsed > 0 else float("inf")
+    logger.info(
+        f"{nb_inserted} patients importés en {elapsed:.2f}s ({rate:,.0f} lignes/s)"
+    )
+    return nb_inserted
+
+
+def get_similar_profiles(
+    engine,
+    smoker: str,
+    age: int,
+    bmi: float,
+    age_margin: int = 5,
+    bmi_margin: float = 2.0,
+) -> pd.DataFrame:
+    """Récupère les patients au profil proche (même statut tabagique).
+
+    La requête est servie par l'index couvrant idx_patient_smoking_age_bmi,
+    sans lecture de la table PATIENT.
+
+    Args:
+        engine: Connexion à la base de données
+        smoker: Statut tabagique ('yes' ou 'no')
+        age: Âge de référence
+        bmi: IMC de référence
+        age_margin: Écart d'âge toléré
+        bmi_margin: Écart d'IMC toléré
+
+    Returns:
+        pd.DataFrame: Colonnes age, bmi et insurance_cost des profils similaires
+    """
+    query, _, _ = HOT_QUERIES["similar_profiles"]
+    with engine.connect() as conn:
+        id_smoking_status = conn.execute(
+            text(
+                "SELECT id_smoking_status FROM SMOKING WHERE smoking_status = :smoker"
+            ),
+            {"smoker": smoker},
+        ).scalar()
+        return pd.read_sql_query(
+            text(query),
+            conn,
+            params={
+                "id_smoking_status": id_smoking_status,
+                "age_min": age - age_margin,
+                "age_max": age + age_margin,
+                "bmi_min": bmi - bmi_margin,
+                "bmi_max": bmi + bmi_margin,
+            },
+        )
+
+
+class ReferenceCache:
+    """Cache en mémoire des tables de référence (SEX, SMOKING, REGION, USER_TYPE).
+
+    Les tables sont chargées en une requête dans des dictionnaires
+    libellé -> ID et ID -> libellé. Le cache est invalidé lorsque l'empreinte
+    de la base (DB_METADATA) change ; celle-ci est relue au plus une fois
+    toutes les `ttl` secondes. Sans engine, le cache est figé sur les données
+    passées à load (utile au sein d'une transaction de chargement).
+    """
+
+    def __init__(self, engine: Engine = None, ttl: float = REFERENCE_CACHE_TTL):
+        self.engine = engine
+        self.ttl = ttl
+        self.fingerprint = None
+        self._ids = {}
+        self._labels = {}
+        self._loaded = False
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def resolve(column: str) -> str:
+        """Retourne la clé de REFERENCE_TABLES pour un nom de table ou de colonne.
+
+        Args:
+            column: "sex", "smoking", "smoker", "region", "user_type", ...
+
+        Returns:
+            str: Clé de REFERENCE_TABLES
+
+        Raises:
+            KeyError: Si la colonne ne correspond à aucune table de référence
+        """
+        key = column.lower()
+        key = REFERENCE_ALIASES.get(key, key)
+        if key not in REFERENCE_TABLES:
+            raise KeyError(f"Table de référence inconnue : {column}")
+        return key
+
+    def load(self, conn):
+        """Charge toutes les tables de référence depuis une connexion ouverte.
+
+        Args:
+            conn: Connexion ouverte à la base de données
+        """
+        query = " UNION ALL ".join(
+            f"SELECT '{key}', {id_column}, {label_column} FROM {table}"
+            for key, (table, id_column, label_column) in REFERENCE_TABLES.items()
+        )
+        ids = {key: {} for key in REFERENCE_TABLES}
+        labels = {key: {} for key in REFERENCE_TABLES}
+        for key, ref_id, label in conn.execute(text(query)):
+            ids[key][label] = ref_id
+            labels[key][ref_id] = label
+
+        self._ids, self._labels = ids, labels
+        self.fingerprint = _read_fingerprint(conn)
+        self._loaded = True
+        self._checked_at = time.monotonic()
+
+    def invalidate(self):
+        """Force le rechargement au prochain accès."""
+        self._loaded = False
+
+    def refresh(self, force: bool = False):
+        """Recharge le cache s'il est vide ou si l'empreinte de la base a changé.
+
+        Args:
+            force: Si True, recharge sans vérifier l'empreinte
+        """
+        if self.engine is None:
+            return
+        if self._loaded and not force:
+            if time.monotonic() - self._checked_at < self.ttl:
+                return
+
+        with self._lock:
+            with self.engine.connect() as conn:
+                if self._loaded and not force:
+                    self._checked_at = time.monotonic()
+                    if _read_fingerprint(conn) == self.fingerprint:
+                        return
+                    logger.info("Empreinte modifiée : rechargement des références")
+                self.load(conn)
+
+    def get_id(self, column: str, label: str):
+        """Retourne l'ID d'un libellé, ou None s'il n'existe pas."""
+        self.refresh()
+        return self._ids[self.resolve(column)].get(label)
+
+    def get_label(self, column: str, ref_id: int):
+        """Retourne le libellé d'un ID, ou None s'il n'existe pas."""
+        self.refresh()
+        return self._labels[self.resolve(column)].get(ref_id)
+
+    def codes_for(self, column: str, values: pd.Series) -> pd.Series:
+        """Convertit une série de libellés en IDs en un seul appel vectorisé.
+
+        Args:
+            column: Table ou colonne de référence ("sex", "smoker", "region", ...)
+            values: Libellés à convertir
+
+        Returns:
+            pd.Series: IDs (dtype Int64), <NA> pour les libellés inconnus
+        """
+        self.refresh()
+        return values.map(self._ids[self.resolve(column)]).astype("Int64")
+
+    def labels_for(self, column: str, codes: pd.Series) -> pd.Series:
+        """Convertit une série d'IDs en libellés.
+
+        Args:
+            column: Table ou colonne de référence ("sex", "smoker", "region", ...)
+            codes: IDs à convertir
+
+        Returns:
+            pd.Series: Libellés, NaN pour les IDs inconnus
+        """
+        self.refresh()
+        return codes.map(self._labels[self.resolve(column)])
+
+    def categorical_for(self, column: str, codes: pd.Series) -> pd.Series:
+        """Convertit une série d'IDs en série de dtype category.
+
+        Les catégories sont tous les libellés de la table, dans l'ordre des
+        IDs : elles sont identiques d'un chargement à l'autre.
+
+        Args:
+            column: Table ou colonne de référence ("sex", "smoker", "region", ...)
+            codes: IDs à convertir
+
+        Returns:
+            pd.Series: Libellés en dtype category, NaN pour les IDs inconnus
+        """
+        self.refresh()
+        labels = self._labels[self.resolve(column)]
+        ids = sorted(labels)
+        positions = pd.Index(ids).get_indexer(codes)
+        categorical = pd.Categorical.from_codes(positions, [labels[i] for i in ids])
+        return pd.Series(categorical, index=codes.index, name=codes.name)
+
+
+def get_reference_cache(engine: Engine) -> ReferenceCache:
+    """Retourne le cache de références partagé associé à un engine.
+
+    Args:
+        engine: Connexion à la base de données
+
+    Returns:
+        ReferenceCache: Cache des tables de référence de cette base
+    """
+    cache = _REFERENCE_CACHES.get(engine)
+    if cache is None:
+        with _ENGINES_LOCK:
+            cache = _REFERENCE_CACHES.setdefault(engine, ReferenceCache(engine))
+    return cache
 
 
 def get_reference_id(engine, table, column, value):
     """Récupère l'ID d'une valeur de référence dans une table.
 
     Cette fonction permet de récupérer l'ID correspondant à une valeur
-    dans une table de référence (sex, smoking, region, etc.).
+    dans une table de référence (sex, smoking, region, etc.). La recherche
+    est servie par le cache de références de l'engine.
 
     Args:
         engine: Connexion à la base de données
@@ -338,26 +1853,15 @@ def get_reference_id(engine, table, column, value):
     Returns:
         int: L'ID correspondant à la valeur, ou None si la valeur n'existe pas
     """
-    logger.info(f"Récupération de l'ID pour {value} dans {table}.{column}")
-
     try:
-        with engine.connect() as conn:
-            # Construction de la requête SQL sécurisée avec paramètres
-            # Correction du nom de la colonne ID en fonction de la table
-            id_column = f"id_{table}"
-            if table == "smoking":
-                id_column = "id_smoking_status"
-
-            query = text(
-                f"SELECT {id_column} FROM {table.upper()} WHERE {column} = :value"
-            )
-            result = conn.execute(query, {"value": value}).fetchone()
-
-            if result:
-                return result[0]
-            else:
-                logger.warning(f"Aucun ID trouvé pour {value} dans {table}.{column}")
-                return None
+        key = ReferenceCache.resolve(table)
+        if REFERENCE_TABLES[key][2] != column:
+            raise KeyError(f"Colonne inconnue : {table}.{column}")
+
+        ref_id = get_reference_cache(engine).get_id(key, value)
+        if ref_id is None:
+            logger.warning(f"Aucun ID trouvé pour {value} dans {table}.{column}")
+        return ref_id
     except Exception as e:
         logger.error(f"Erreur lors de la récupération de l'ID: {str(e)}")
         return None
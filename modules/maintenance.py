@@ -0,0 +1,333 @@
+"""Maintenance périodique de la base SQLite dans un budget de temps.
+
+Après des chargements en masse et des suppressions, le planificateur de
+requêtes manque de statistiques, les pages libérées restent dans le fichier
+et le WAL grossit. run_maintenance mesure d'abord la fragmentation (pages
+libres) et la taille du WAL, puis enchaîne, tant que le budget le permet :
+
+1. VACUUM incrémental par lots de pages (bases en auto_vacuum INCREMENTAL),
+   ou VACUUM complet si l'administrateur le demande ;
+2. ANALYZE si la base n'a pas de statistiques, sinon PRAGMA optimize ;
+3. checkpoint du WAL (TRUNCATE) si le WAL dépasse le seuil ou après un VACUUM.
+
+Chaque exécution est consignée dans la table MAINTENANCE_LOG du schéma
+(data/base.sql) : durée, octets rendus par le fichier de base, étapes
+réalisées. Un VACUUM complet convertit la base en auto_vacuum INCREMENTAL :
+les exécutions suivantes récupèrent l'espace par petits lots.
+
+Usage (par exemple depuis cron, une fois par nuit) :
+    python -m modules.maintenance run [--budget SECONDES] [--full-vacuum]
+    python -m modules.maintenance status
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+from loguru import logger
+
+from modules.db_loader import DB_CONFIG, get_db_path
+
+# Budget par défaut d'une exécution (s)
+DEFAULT_TIME_BUDGET = 30.0
+
+# Taille du WAL (Mio) au-delà de laquelle il est tronqué
+DEFAULT_WAL_CHECKPOINT_MB = 64
+
+# Pages rendues au système par lot de VACUUM incrémental
+DEFAULT_VACUUM_PAGES = 1024
+
+# Part de pages libres à partir de laquelle le VACUUM incrémental est lancé
+DEFAULT_MIN_FRAGMENTATION = 0.05
+
+# Lignes échantillonnées par index lors de PRAGMA optimize
+DEFAULT_ANALYSIS_LIMIT = 1000
+
+# Valeurs de PRAGMA auto_vacuum
+AUTO_VACUUM_MODES = {0: "NONE", 1: "FULL", 2: "INCREMENTAL"}
+
+
+def _setting(name: str, default):
+    return DB_CONFIG.get("maintenance", {}).get(name, default)
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    """Connexion en autocommit : VACUUM et checkpoint refusent les transactions."""
+    timeout = DB_CONFIG.get("timeout", 30)
+    return sqlite3.connect(db_path, timeout=timeout, isolation_level=None)
+
+
+def get_database_health(test_mode: bool = False, db_path: str = None) -> dict:
+    """Mesure la fragmentation de la base et la taille de son WAL.
+
+    Args:
+        test_mode: Si True, examine la base de test
+        db_path: Chemin personnalisé de la base de données
+
+    Returns:
+        dict: page_size, page_count, freelist_count, fragmentation (part de
+        pages libres), auto_vacuum, file_bytes, wal_bytes, has_statistics ;
+        None si la base est introuvable
+    """
+    db_path = get_db_path(test_mode, db_path)
+    if not os.path.exists(db_path):
+        logger.error(f"Base introuvable : {db_path}")
+        return None
+
+    with closing(_connect(db_path)) as conn:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        has_statistics = (
+            conn.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE name = 'sqlite_stat1'"
+            ).fetchone()[0]
+            > 0
+        )
+
+    wal_path = f"{db_path}-wal"
+    return {
+        "page_size": page_size,
+        "page_count": page_count,
+        "freelist_count": freelist_count,
+        "fragmentation": freelist_count / page_count if page_count else 0.0,
+        "auto_vacuum": AUTO_VACUUM_MODES.get(auto_vacuum, str(auto_vacuum)),
+        "file_bytes": os.path.getsize(db_path),
+        "wal_bytes": os.path.getsize(wal_path) if os.path.exists(wal_path) else 0,
+        "has_statistics": has_statistics,
+    }
+
+
+def _incremental_vacuum(conn, pages: int, deadline: float) -> int:
+    """Rend les pages libres au système par lots, jusqu'à l'échéance."""
+    freed = 0
+    while time.perf_counter() < deadline:
+        before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if before == 0:
+            break
+        # executescript exécute le PRAGMA jusqu'au bout (execute ne libère
+        # qu'une page par appel)
+        conn.executescript(f"PRAGMA incremental_vacuum({int(pages)})")
+        freed += before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return freed
+
+
+def _record_run(conn, report: dict):
+    """Consigne l'exécution, sauf sur une base antérieure au schéma v4."""
+    exists = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE name = 'MAINTENANCE_LOG'"
+    ).fetchone()[0]
+    if not exists:
+        logger.warning("Table MAINTENANCE_LOG absente : exécution non consignée")
+        return
+    conn.execute(
+        "INSERT INTO MAINTENANCE_LOG (duration_s, bytes_freed, fragmentation, "
+        "wal_bytes, steps, completed) VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            report["duration_s"],
+            report["bytes_freed"],
+            report["health"]["fragmentation"],
+            report["health"]["wal_bytes"],
+            json.dumps(report["steps"]),
+            report["completed"],
+        ),
+    )
+
+
+def _vacuum_step(conn, health: dict, full_vacuum: bool, deadline: float) -> tuple:
+    """Récupère l'espace libre : VACUUM complet ou incrémental.
+
+    Returns:
+        tuple: (étapes réalisées, étapes sautées)
+    """
+    if full_vacuum:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        return ["vacuum"], []
+
+    min_fragmentation = _setting("min_fragmentation", DEFAULT_MIN_FRAGMENTATION)
+    if not health["freelist_count"] or health["fragmentation"] < min_fragmentation:
+        return [], []
+    if health["auto_vacuum"] != "INCREMENTAL":
+        logger.warning(
+            "VACUUM incrémental indisponible (auto_vacuum "
+            f"{health['auto_vacuum']}) : lancer un VACUUM complet"
+        )
+        return [], ["incremental_vacuum"]
+
+    pages = _setting("vacuum_pages", DEFAULT_VACUUM_PAGES)
+    freed = _incremental_vacuum(conn, pages, deadline)
+    logger.info(f"VACUUM incrémental : {freed} pages libérées")
+    return ["incremental_vacuum"], []
+
+
+def _optimize_step(conn, health: dict) -> str:
+    """Met à jour les statistiques du planificateur, retourne l'étape réalisée."""
+    if not health["has_statistics"]:
+        conn.execute("ANALYZE")
+        return "analyze"
+    limit = _setting("analysis_limit", DEFAULT_ANALYSIS_LIMIT)
+    conn.execute(f"PRAGMA analysis_limit = {int(limit)}")
+    conn.execute("PRAGMA optimize")
+    return "optimize"
+
+
+def _checkpoint_step(conn):
+    """Reporte le WAL dans la base et le tronque."""
+    busy, _, _ = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+    if busy:
+        logger.warning("Checkpoint incomplet : lecteurs en cours")
+
+
+def _maintain(conn, health: dict, full_vacuum: bool, deadline: float) -> tuple:
+    """Enchaîne les étapes de maintenance tant que le budget le permet.
+
+    Returns:
+        tuple: (étapes réalisées, étapes sautées)
+    """
+    steps, skipped = _vacuum_step(conn, health, full_vacuum, deadline)
+
+    if time.perf_counter() >= deadline:
+        skipped.append("optimize")
+    else:
+        steps.append(_optimize_step(conn, health))
+
+    wal_limit = _setting("wal_checkpoint_mb", DEFAULT_WAL_CHECKPOINT_MB) * 1024**2
+    vacuumed = bool({"vacuum", "incremental_vacuum"} & set(steps))
+    if health["wal_bytes"] >= wal_limit or vacuumed:
+        if time.perf_counter() >= deadline:
+            skipped.append("wal_checkpoint")
+        else:
+            _checkpoint_step(conn)
+            steps.append("wal_checkpoint")
+    return steps, skipped
+
+
+def run_maintenance(
+    test_mode: bool = False,
+    db_path: str = None,
+    time_budget: float = None,
+    full_vacuum: bool = False,
+) -> dict:
+    """Exécute les opérations de maintenance utiles dans un budget de temps.
+
+    Une étape n'est lancée que s'il reste du budget ; une étape commencée va
+    à son terme (un VACUUM complet n'est pas interruptible et n'est lancé que
+    sur demande explicite).
+
+    Args:
+        test_mode: Si True, entretient la base de test
+        db_path: Chemin personnalisé de la base de données
+        time_budget: Durée maximale (s), DB_CONFIG["maintenance"] par défaut ;
+            un budget nul ne lance que le VACUUM complet demandé
+        full_vacuum: Si True, reconstruit le fichier (VACUUM) et le convertit
+            en auto_vacuum INCREMENTAL
+
+    Returns:
+        dict: health (mesures initiales), steps (étapes réalisées),
+        skipped (étapes sautées faute de budget), duration_s, bytes_freed
+        (réduction du fichier de base, WAL exclu), completed ; None si la base est introuvable ou en cas d'erreur
+    """
+    db_path = get_db_path(test_mode, db_path)
+    if time_budget is None:
+        time_budget = _setting("time_budget", DEFAULT_TIME_BUDGET)
+
+    health = get_database_health(db_path=db_path)
+    if health is None:
+        return None
+
+    start_time = time.perf_counter()
+    size_before = os.path.getsize(db_path)
+    logger.info(
+        f"Maintenance de {db_path} : {health['fragmentation']:.1%} de pages libres, "
+        f"WAL de {health['wal_bytes'] / 1024**2:.1f} Mio"
+    )
+
+    try:
+        with closing(_connect(db_path)) as conn:
+            steps, skipped = _maintain(
+                conn, health, full_vacuum, start_time + time_budget
+            )
+            report = {
+                "health": health,
+                "steps": steps,
+                "skipped": skipped,
+                "duration_s": time.perf_counter() - start_time,
+                # Fichier de base seul : la troncature du WAL ne rend pas de
+                # place occupée par les données
+                "bytes_freed": max(size_before - os.path.getsize(db_path), 0),
+                "completed": not skipped,
+            }
+            _record_run(conn, report)
+    except Exception as e:
+        logger.error(f"Erreur lors de la maintenance : {str(e)}")
+        return None
+
+    logger.info(
+        f"Maintenance terminée en {report['duration_s']:.2f}s "
+        f"({report['bytes_freed'] / 1024**2:.1f} Mio libérés, "
+        f"étapes : {', '.join(steps) or 'aucune'})"
+    )
+    return report
+
+
+def list_maintenance_runs(
+    test_mode: bool = False, db_path: str = None, limit: int = 20
+) -> list:
+    """Liste les dernières exécutions consignées, de la plus récente à la plus ancienne.
+
+    Returns:
+        list: Dictionnaires des colonnes de MAINTENANCE_LOG
+    """
+    db_path = get_db_path(test_mode, db_path)
+    with closing(_connect(db_path)) as conn:
+        conn.row_factory = sqlite3.Row
+        exists = conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE name = 'MAINTENANCE_LOG'"
+        ).fetchone()[0]
+        if not exists:
+            return []
+        rows = conn.execute(
+            "SELECT * FROM MAINTENANCE_LOG ORDER BY id_run DESC LIMIT ?", (limit,)
+        ).fetchall()
+    runs = [dict(row) for row in rows]
+    for run in runs:
+        run["steps"] = json.loads(run["steps"] or "[]")
+        run["completed"] = bool(run["completed"])
+    return runs
+
+
+def main(argv: list = None):
+    """Point d'entrée en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Maintenance de la base SQLite")
+    parser.add_argument("command", choices=["run", "status"])
+    parser.add_argument("--db-path", default=None, help="Base de données visée")
+    parser.add_argument("--budget", type=float, default=None, help="Budget (s)")
+    parser.add_argument("--full-vacuum", action="store_true", help="VACUUM complet")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = run_maintenance(
+            db_path=args.db_path, time_budget=args.budget, full_vacuum=args.full_vacuum
+        )
+        return 0 if report else 1
+
+    health = get_database_health(db_path=args.db_path)
+    if health is None:
+        return 1
+    for key, value in health.items():
+        print(f"{key}: {value}")
+    for run in list_maintenance_runs(db_path=args.db_path, limit=5):
+        print(
+            f"{run['started_at']} {run['duration_s']:.2f}s "
+            f"{run['bytes_freed']} octets {','.join(run['steps'])}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
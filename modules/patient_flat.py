@@ -0,0 +1,148 @@
+"""Table dénormalisée PATIENT_FLAT, maintenue par triggers.
+
+PATIENT_FLAT contient une ligne par patient avec les colonnes utilisées par
+l'entraînement et les pages d'analyse. Les variables catégorielles y sont
+stockées sous forme de codes (IDs des tables de référence), décodés en mémoire
+par le cache de références : la lecture est un simple parcours séquentiel,
+sans jointure.
+
+La table est optionnelle : enable_patient_flat la crée, la remplit et installe
+les triggers qui la synchronisent sur les INSERT, UPDATE et DELETE de PATIENT.
+Chaque écriture dans PATIENT coûte alors une écriture supplémentaire.
+"""
+
+from sqlalchemy import text
+
+from modules.db_loader import (
+    drop_triggers,
+    has_triggers,
+    install_triggers,
+    transaction,
+)
+
+# Colonnes numériques recopiées telles quelles depuis PATIENT
+FLAT_NUMERIC_COLUMNS = ("age", "nb_children", "bmi", "insurance_cost")
+
+# Colonnes codées : nom dans PATIENT_FLAT -> (colonne de PATIENT, table de référence)
+FLAT_CODED_COLUMNS = {
+    "sex_code": ("id_sex", "sex"),
+    "smoker_code": ("id_smoking_status", "smoking"),
+    "region_code": ("id_region", "region"),
+}
+
+_FLAT_COLUMNS = FLAT_NUMERIC_COLUMNS + tuple(FLAT_CODED_COLUMNS)
+_SOURCE_COLUMNS = FLAT_NUMERIC_COLUMNS + tuple(
+    source for source, _ in FLAT_CODED_COLUMNS.values()
+)
+
+# id_patient est l'alias du rowid : un changement d'ID déplace la ligne. Les
+# bases dont le trigger précède cette version sont mises à jour par la
+# migration v4 de db_loader
+PATIENT_FLAT_UPDATE_TRIGGER = f"""
+    CREATE TRIGGER IF NOT EXISTS trg_patient_flat_update
+    AFTER UPDATE OF id_patient, {", ".join(_SOURCE_COLUMNS)} ON PATIENT
+    BEGIN
+        DELETE FROM PATIENT_FLAT WHERE patient_rowid = OLD.rowid;
+        INSERT INTO PATIENT_FLAT (patient_rowid, {", ".join(_FLAT_COLUMNS)})
+        VALUES (NEW.rowid, {", ".join(f"NEW.{c}" for c in _SOURCE_COLUMNS)});
+    END
+    """
+
+PATIENT_FLAT_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS PATIENT_FLAT(
+       patient_rowid INTEGER PRIMARY KEY,
+       age INT,
+       nb_children INT,
+       bmi REAL,
+       insurance_cost REAL,
+       sex_code INT NOT NULL,
+       smoker_code INT NOT NULL,
+       region_code INT NOT NULL
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_patient_flat_insert AFTER INSERT ON PATIENT
+    BEGIN
+        INSERT INTO PATIENT_FLAT (patient_rowid, {", ".join(_FLAT_COLUMNS)})
+        VALUES (NEW.rowid, {", ".join(f"NEW.{c}" for c in _SOURCE_COLUMNS)});
+    END
+    """,
+    PATIENT_FLAT_UPDATE_TRIGGER,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_patient_flat_delete AFTER DELETE ON PATIENT
+    BEGIN
+        DELETE FROM PATIENT_FLAT WHERE patient_rowid = OLD.rowid;
+    END
+    """,
+)
+
+PATIENT_FLAT_OBJECTS = (
+    ("TRIGGER", "trg_patient_flat_insert"),
+    ("TRIGGER", "trg_patient_flat_update"),
+    ("TRIGGER", "trg_patient_flat_delete"),
+    ("TABLE", "PATIENT_FLAT"),
+)
+
+
+def has_patient_flat(engine) -> bool:
+    """Indique si la table PATIENT_FLAT et ses triggers sont installés.
+
+    Args:
+        engine: Engine, ou connexion ouverte
+
+    Returns:
+        True si la table dénormalisée est disponible, False sinon
+    """
+    return has_triggers(engine, PATIENT_FLAT_OBJECTS)
+
+
+def refresh_patient_flat(engine) -> int:
+    """Reconstruit entièrement PATIENT_FLAT depuis PATIENT.
+
+    À utiliser pour resynchroniser la table, par exemple après une écriture
+    faite triggers désactivés.
+
+    Args:
+        engine: Engine, ou connexion dont la transaction est gérée par l'appelant
+
+    Returns:
+        int: Nombre de lignes de PATIENT_FLAT
+    """
+    with transaction(engine) as conn:
+        conn.execute(text("DELETE FROM PATIENT_FLAT"))
+        conn.execute(
+            text(
+                f"""
+            INSERT INTO PATIENT_FLAT (patient_rowid, {", ".join(_FLAT_COLUMNS)})
+            SELECT rowid, {", ".join(_SOURCE_COLUMNS)} FROM PATIENT
+            """
+            )
+        )
+        return conn.execute(text("SELECT COUNT(*) FROM PATIENT_FLAT")).scalar()
+
+
+def enable_patient_flat(engine) -> bool:
+    """Crée PATIENT_FLAT, la remplit et installe les triggers de synchronisation.
+
+    Args:
+        engine: Engine, ou connexion dont la transaction est gérée par l'appelant
+
+    Returns:
+        True si la table est disponible, False en cas d'erreur
+    """
+    return install_triggers(
+        engine, "PATIENT_FLAT", PATIENT_FLAT_DDL, populate=refresh_patient_flat
+    )
+
+
+def disable_patient_flat(engine) -> bool:
+    """Supprime PATIENT_FLAT et ses triggers.
+
+    Args:
+        engine: Engine, ou connexion dont la transaction est gérée par l'appelant
+
+    Returns:
+        True si la suppression a réussi, False sinon
+    """
+    return drop_triggers(engine, "PATIENT_FLAT", PATIENT_FLAT_OBJECTS)
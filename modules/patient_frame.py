@@ -0,0 +1,246 @@
+"""Chargement typé des données patients pour l'entraînement et les pages.
+
+load_patient_frame remplace les requêtes PATIENT x SEX x SMOKING x REGION
+dupliquées : seules les colonnes demandées sont lues, les IDs de référence
+sont décodés en mémoire (dtype category) et les colonnes numériques sont
+réduites (int8/int16, float32).
+
+iter_patient_frames parcourt la table par blocs (pagination par rowid) pour
+les traitements sur des tables plus grandes que la mémoire, et
+summarize_patients en calcule les statistiques en flux.
+"""
+
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Engine, text
+
+from modules.db_loader import PATIENT_CHUNK_SIZE, get_engine, get_reference_cache
+from modules.patient_flat import has_patient_flat
+from modules.streaming_stats import CategoryCounter, QuantileSketch, RunningMoments
+
+# Colonnes numériques et leur dtype compact
+NUMERIC_DTYPES = {
+    "age": "int16",
+    "nb_children": "int8",
+    "bmi": "float32",
+    "insurance_cost": "float32",
+}
+
+# Colonnes catégorielles : (colonne de PATIENT, colonne de PATIENT_FLAT, référence)
+CATEGORICAL_SOURCES = {
+    "sex": ("id_sex", "sex_code", "sex"),
+    "smoker": ("id_smoking_status", "smoker_code", "smoking"),
+    "region": ("id_region", "region_code", "region"),
+}
+
+# Colonnes disponibles, dans l'ordre du DataFrame retourné
+PATIENT_FRAME_COLUMNS = tuple(NUMERIC_DTYPES) + tuple(CATEGORICAL_SOURCES)
+
+
+def resolve_columns(columns: list = None) -> list:
+    """Valide une projection de colonnes.
+
+    Args:
+        columns: Colonnes demandées, toutes les colonnes si None
+
+    Returns:
+        list: Colonnes dans l'ordre de PATIENT_FRAME_COLUMNS
+
+    Raises:
+        ValueError: Si une colonne n'existe pas
+    """
+    if columns is None:
+        return list(PATIENT_FRAME_COLUMNS)
+    unknown = set(columns) - set(PATIENT_FRAME_COLUMNS)
+    if unknown:
+        raise ValueError(f"Colonnes inconnues : {', '.join(sorted(unknown))}")
+    return [column for column in PATIENT_FRAME_COLUMNS if column in columns]
+
+
+def patient_select(columns: list, flat: bool) -> tuple:
+    """Construit la liste SELECT et la table source d'une projection.
+
+    Args:
+        columns: Colonnes validées par resolve_columns
+        flat: Si True, lit PATIENT_FLAT au lieu de PATIENT
+
+    Returns:
+        tuple: (expressions SELECT, table source, colonne rowid)
+    """
+    expressions = []
+    for column in columns:
+        if column in CATEGORICAL_SOURCES:
+            patient_column, flat_column, _ = CATEGORICAL_SOURCES[column]
+            source = flat_column if flat else patient_column
+            expressions.append(f"{source} AS {column}")
+        else:
+            expressions.append(column)
+    if flat:
+        return ", ".join(expressions), "PATIENT_FLAT", "patient_rowid"
+    return ", ".join(expressions), "PATIENT", "rowid"
+
+
+def _check_integer_range(values: pd.Series, dtype: str):
+    """Vérifie que des valeurs tiennent dans un dtype entier compact.
+
+    astype ne contrôle pas les bornes : une valeur hors limites serait
+    tronquée silencieusement (300 devient 44 en int8).
+
+    Raises:
+        ValueError: Si une valeur sort des bornes du dtype
+    """
+    bounds = np.iinfo(dtype)
+    if values.min() < bounds.min or values.max() > bounds.max:
+        raise ValueError(
+            f"Valeurs de {values.name} hors des bornes de {dtype} "
+            f"[{bounds.min}, {bounds.max}] : min {values.min()}, max {values.max()}"
+        )
+
+
+def to_patient_frame(raw: pd.DataFrame, references) -> pd.DataFrame:
+    """Applique les dtypes compacts et décode les colonnes catégorielles.
+
+    Args:
+        raw: Résultat brut de la requête (IDs pour les colonnes catégorielles)
+        references: Cache de références de la base
+
+    Returns:
+        pd.DataFrame: Données typées
+
+    Raises:
+        ValueError: Si une colonne entière sort des bornes de son dtype compact
+    """
+    df = pd.DataFrame(index=raw.index)
+    for column in raw.columns:
+        if column in CATEGORICAL_SOURCES:
+            reference = CATEGORICAL_SOURCES[column][2]
+            df[column] = references.categorical_for(reference, raw[column])
+        elif raw[column].isna().any():
+            # Les entiers manquants ne tiennent pas dans un dtype entier
+            df[column] = raw[column].astype("float32")
+        else:
+            dtype = NUMERIC_DTYPES[column]
+            if pd.api.types.is_integer_dtype(dtype):
+                _check_integer_range(raw[column], dtype)
+            df[column] = raw[column].astype(dtype)
+    return df
+
+
+def load_patient_frame(engine: Engine = None, columns: list = None) -> pd.DataFrame:
+    """Charge les patients dans un DataFrame typé et compact.
+
+    La table dénormalisée PATIENT_FLAT est lue si elle est activée, sinon
+    PATIENT ; aucune jointure n'est exécutée dans les deux cas.
+
+    Args:
+        engine: Connexion à la base de données, engine partagé par défaut
+        columns: Colonnes à charger (parmi PATIENT_FRAME_COLUMNS), toutes si None
+
+    Returns:
+        pd.DataFrame: Colonnes numériques en int8/int16/float32 et colonnes
+        sex, smoker, region en dtype category
+    """
+    engine = engine or get_engine()
+    columns = resolve_columns(columns)
+    select, table, _ = patient_select(columns, has_patient_flat(engine))
+
+    with engine.connect() as conn:
+        raw = pd.read_sql_query(text(f"SELECT {select} FROM {table}"), conn)
+    return to_patient_frame(raw, get_reference_cache(engine))
+
+
+def iter_patient_frames(
+    engine: Engine = None,
+    columns: list = None,
+    chunk_size: int = PATIENT_CHUNK_SIZE,
+    after_rowid: int = 0,
+) -> Iterator[pd.DataFrame]:
+    """Parcourt les patients par blocs typés, sans charger toute la table.
+
+    La pagination se fait par clé (WHERE rowid > dernier rowid lu) : chaque
+    bloc est une recherche dans la clé primaire, quel que soit son rang, et
+    aucune transaction de lecture ne reste ouverte entre deux blocs.
+
+    Args:
+        engine: Connexion à la base de données, engine partagé par défaut
+        columns: Colonnes à charger (parmi PATIENT_FRAME_COLUMNS), toutes si None
+        chunk_size: Nombre maximal de lignes par bloc
+        after_rowid: Reprend le parcours après ce rowid
+
+    Yields:
+        pd.DataFrame: Blocs typés comme load_patient_frame, indexés par rowid
+    """
+    engine = engine or get_engine()
+    columns = resolve_columns(columns)
+    select, table, rowid = patient_select(columns, has_patient_flat(engine))
+    references = get_reference_cache(engine)
+    query = text(
+        f"""
+        SELECT {rowid} AS patient_rowid, {select} FROM {table}
+        WHERE {rowid} > :last ORDER BY {rowid} LIMIT :limit
+        """
+    )
+
+    last = after_rowid
+    while True:
+        with engine.connect() as conn:
+            raw = pd.read_sql_query(
+                query,
+                conn,
+                params={"last": last, "limit": chunk_size},
+                index_col="patient_rowid",
+            )
+        if raw.empty:
+            return
+        last = int(raw.index[-1])
+        yield to_patient_frame(raw, references)
+        if len(raw) < chunk_size:
+            return
+
+
+def summarize_patients(
+    engine: Engine = None,
+    columns: list = None,
+    chunk_size: int = PATIENT_CHUNK_SIZE,
+    quantiles: tuple = (0.25, 0.5, 0.75),
+) -> dict:
+    """Calcule les statistiques descriptives des patients en un seul parcours.
+
+    La mémoire utilisée est celle d'un bloc : les statistiques sont
+    accumulées par les réducteurs de modules.streaming_stats.
+
+    Args:
+        engine: Connexion à la base de données, engine partagé par défaut
+        columns: Colonnes à résumer (parmi PATIENT_FRAME_COLUMNS), toutes si None
+        chunk_size: Nombre maximal de lignes par bloc
+        quantiles: Quantiles estimés pour les colonnes numériques
+
+    Returns:
+        dict: Par colonne numérique, effectif, moyenne, écart-type, min, max,
+        asymétrie, aplatissement et quantiles (clé "quantiles") ; par colonne
+        catégorielle, effectif et proportion de chaque modalité
+    """
+    columns = resolve_columns(columns)
+    reducers = {}
+    for column in columns:
+        if column in CATEGORICAL_SOURCES:
+            reducers[column] = (CategoryCounter(),)
+        else:
+            reducers[column] = (RunningMoments(), QuantileSketch())
+
+    for chunk in iter_patient_frames(engine, columns, chunk_size):
+        for column, column_reducers in reducers.items():
+            for reducer in column_reducers:
+                reducer.update(chunk[column])
+
+    summary = {}
+    for column, column_reducers in reducers.items():
+        if column in CATEGORICAL_SOURCES:
+            summary[column] = column_reducers[0].result()
+        else:
+            moments, sketch = column_reducers
+            summary[column] = moments.result()
+            summary[column]["quantiles"] = sketch.result(quantiles)
+    return summary
@@ -0,0 +1,392 @@
+"""Agrégats des coûts d'assurance, maintenus par triggers.
+
+PATIENT_KPIS contient une ligne par cellule (sexe, statut tabagique, région,
+tranche d'âge, tranche d'IMC) avec l'effectif, la somme, la somme des carrés,
+le minimum et le maximum de insurance_cost. PATIENT_COST_HISTOGRAM compte les
+patients par tranche de coût de COST_BUCKET_WIDTH dollars, pour la médiane.
+Les indicateurs du tableau de bord (moyenne, écart-type, médiane, extrêmes)
+se calculent ainsi sur quelques centaines de lignes au plus, quelle que soit
+la taille de PATIENT.
+
+Les tables sont optionnelles : enable_patient_kpis les crée, les remplit et
+installe les triggers qui les mettent à jour à chaque INSERT, UPDATE ou
+DELETE de PATIENT. La suppression du patient le moins (ou le plus) coûteux
+d'une cellule recalcule son extrême depuis PATIENT, sur cette seule cellule.
+"""
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Engine, text
+
+from modules.db_loader import (
+    drop_triggers,
+    get_reference_cache,
+    has_triggers,
+    install_triggers,
+    transaction,
+)
+
+# Largeur (années) des tranches d'âge
+AGE_BUCKET_WIDTH = 10
+
+# Bornes des tranches d'IMC (classification OMS) et leurs libellés
+BMI_BUCKET_BOUNDS = (18.5, 25.0, 30.0)
+BMI_BUCKET_LABELS = ("insuffisance", "normal", "surpoids", "obésité")
+
+# Largeur ($) des tranches de l'histogramme des coûts : précision de la médiane
+COST_BUCKET_WIDTH = 100
+
+# Dimensions des cellules : colonne de PATIENT_KPIS -> table de référence
+KPI_CODED_COLUMNS = {
+    "sex_code": ("id_sex", "sex"),
+    "smoker_code": ("id_smoking_status", "smoking"),
+    "region_code": ("id_region", "region"),
+}
+
+# Facteurs de regroupement -> colonne de PATIENT_KPIS
+KPI_FACTORS = {
+    "sex": "sex_code",
+    "smoker": "smoker_code",
+    "region": "region_code",
+    "age_bucket": "age_bucket",
+    "bmi_bucket": "bmi_bucket",
+}
+
+_KEY_COLUMNS = tuple(KPI_FACTORS.values())
+
+
+def _age_bucket(prefix: str) -> str:
+    return f"(CAST({prefix}age AS INTEGER) / {AGE_BUCKET_WIDTH} * {AGE_BUCKET_WIDTH})"
+
+
+def _bmi_bucket(prefix: str) -> str:
+    cases = " ".join(
+        f"WHEN {prefix}bmi < {bound} THEN {index}"
+        for index, bound in enumerate(BMI_BUCKET_BOUNDS)
+    )
+    return f"(CASE {cases} ELSE {len(BMI_BUCKET_BOUNDS)} END)"
+
+
+def _cost_bucket(prefix: str) -> str:
+    return f"CAST({prefix}insurance_cost / {COST_BUCKET_WIDTH} AS INTEGER)"
+
+
+def _cell_values(prefix: str) -> tuple:
+    """Expressions des clés de la cellule d'un patient (NEW., OLD. ou vide)."""
+    return tuple(f"{prefix}{source}" for source, _ in KPI_CODED_COLUMNS.values()) + (
+        _age_bucket(prefix),
+        _bmi_bucket(prefix),
+    )
+
+
+def _cell_condition(prefix: str) -> str:
+    """Filtre des lignes de PATIENT_KPIS de la cellule d'un patient."""
+    return " AND ".join(
+        f"{column} = {value}"
+        for column, value in zip(_KEY_COLUMNS, _cell_values(prefix))
+    )
+
+
+def _add_patient(prefix: str) -> str:
+    """Instructions ajoutant le coût d'un patient aux agrégats."""
+    cost = f"{prefix}insurance_cost"
+    return f"""
+        INSERT INTO PATIENT_KPIS ({", ".join(_KEY_COLUMNS)}, nb_patients,
+            total_cost, total_squares, min_cost, max_cost)
+        VALUES ({", ".join(_cell_values(prefix))}, 1, {cost}, {cost} * {cost},
+            {cost}, {cost})
+        ON CONFLICT ({", ".join(_KEY_COLUMNS)}) DO UPDATE SET
+            nb_patients = nb_patients + 1,
+            total_cost = total_cost + excluded.total_cost,
+            total_squares = total_squares + excluded.total_squares,
+            min_cost = MIN(min_cost, excluded.min_cost),
+            max_cost = MAX(max_cost, excluded.max_cost);
+        INSERT INTO PATIENT_COST_HISTOGRAM (cost_bucket, nb_patients)
+        VALUES ({_cost_bucket(prefix)}, 1)
+        ON CONFLICT (cost_bucket) DO UPDATE SET nb_patients = nb_patients + 1;
+    """
+
+
+def _remove_patient(prefix: str) -> str:
+    """Instructions retirant le coût d'un patient des agrégats."""
+    cost = f"{prefix}insurance_cost"
+    # Cellule du patient dans PATIENT : le préfixe de l'index
+    # idx_patient_smoking_age_bmi restreint le parcours
+    age_bucket = _age_bucket(prefix)
+    patient_cell = " AND ".join(
+        [f"{source} = {prefix}{source}" for source, _ in KPI_CODED_COLUMNS.values()]
+        + [
+            f"age >= {age_bucket}",
+            f"age < {age_bucket} + {AGE_BUCKET_WIDTH}",
+            f"{_bmi_bucket('')} = {_bmi_bucket(prefix)}",
+        ]
+    )
+    return f"""
+        UPDATE PATIENT_KPIS SET
+            nb_patients = nb_patients - 1,
+            total_cost = total_cost - {cost},
+            total_squares = total_squares - {cost} * {cost},
+            min_cost = CASE WHEN {cost} > min_cost THEN min_cost ELSE (
+                SELECT MIN(insurance_cost) FROM PATIENT WHERE {patient_cell}
+            ) END,
+            max_cost = CASE WHEN {cost} < max_cost THEN max_cost ELSE (
+                SELECT MAX(insurance_cost) FROM PATIENT WHERE {patient_cell}
+            ) END
+        WHERE {_cell_condition(prefix)};
+        DELETE FROM PATIENT_KPIS WHERE {_cell_condition(prefix)} AND nb_patients <= 0;
+        UPDATE PATIENT_COST_HISTOGRAM SET nb_patients = nb_patients - 1
+        WHERE cost_bucket = {_cost_bucket(prefix)};
+        DELETE FROM PATIENT_COST_HISTOGRAM
+        WHERE cost_bucket = {_cost_bucket(prefix)} AND nb_patients <= 0;
+    """
+
+
+_SOURCE_COLUMNS = ("age", "bmi", "insurance_cost") + tuple(
+    source for source, _ in KPI_CODED_COLUMNS.values()
+)
+
+PATIENT_KPIS_DDL = (
+    f"""
+    CREATE TABLE IF NOT EXISTS PATIENT_KPIS(
+       sex_code INT NOT NULL,
+       smoker_code INT NOT NULL,
+       region_code INT NOT NULL,
+       age_bucket INT NOT NULL,
+       bmi_bucket INT NOT NULL,
+       nb_patients INT NOT NULL,
+       total_cost REAL NOT NULL,
+       total_squares REAL NOT NULL,
+       min_cost REAL,
+       max_cost REAL,
+       PRIMARY KEY ({", ".join(_KEY_COLUMNS)})
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS PATIENT_COST_HISTOGRAM(
+       cost_bucket INTEGER PRIMARY KEY,
+       nb_patients INT NOT NULL
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_patient_kpis_insert AFTER INSERT ON PATIENT
+    WHEN NEW.insurance_cost IS NOT NULL
+    BEGIN
+        {_add_patient("NEW.")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_patient_kpis_update_old
+    AFTER UPDATE OF {", ".join(_SOURCE_COLUMNS)} ON PATIENT
+    WHEN OLD.insurance_cost IS NOT NULL
+    BEGIN
+        {_remove_patient("OLD.")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_patient_kpis_update_new
+    AFTER UPDATE OF {", ".join(_SOURCE_COLUMNS)} ON PATIENT
+    WHEN NEW.insurance_cost IS NOT NULL
+    BEGIN
+        {_add_patient("NEW.")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_patient_kpis_delete AFTER DELETE ON PATIENT
+    WHEN OLD.insurance_cost IS NOT NULL
+    BEGIN
+        {_remove_patient("OLD.")}
+    END
+    """,
+)
+
+PATIENT_KPIS_OBJECTS = (
+    ("TRIGGER", "trg_patient_kpis_insert"),
+    ("TRIGGER", "trg_patient_kpis_update_old"),
+    ("TRIGGER", "trg_patient_kpis_update_new"),
+    ("TRIGGER", "trg_patient_kpis_delete"),
+    ("TABLE", "PATIENT_KPIS"),
+    ("TABLE", "PATIENT_COST_HISTOGRAM"),
+)
+
+
+def has_patient_kpis(engine) -> bool:
+    """Indique si les tables d'agrégats et leurs triggers sont installés.
+
+    Args:
+        engine: Engine, ou connexion ouverte
+
+    Returns:
+        True si les agrégats sont disponibles, False sinon
+    """
+    return has_triggers(engine, PATIENT_KPIS_OBJECTS)
+
+
+def refresh_patient_kpis(engine) -> int:
+    """Recalcule entièrement les agrégats depuis PATIENT.
+
+    Args:
+        engine: Engine, ou connexion dont la transaction est gérée par l'appelant
+
+    Returns:
+        int: Nombre de cellules de PATIENT_KPIS
+    """
+    with transaction(engine) as conn:
+        conn.execute(text("DELETE FROM PATIENT_KPIS"))
+        conn.execute(text("DELETE FROM PATIENT_COST_HISTOGRAM"))
+        conn.execute(
+            text(
+                f"""
+            INSERT INTO PATIENT_KPIS ({", ".join(_KEY_COLUMNS)}, nb_patients,
+                total_cost, total_squares, min_cost, max_cost)
+            SELECT {", ".join(_cell_values(""))}, COUNT(*), TOTAL(insurance_cost),
+                   TOTAL(insurance_cost * insurance_cost), MIN(insurance_cost),
+                   MAX(insurance_cost)
+            FROM PATIENT WHERE insurance_cost IS NOT NULL
+            GROUP BY 1, 2, 3, 4, 5
+            """
+            )
+        )
+        conn.execute(
+            text(
+                f"""
+            INSERT INTO PATIENT_COST_HISTOGRAM (cost_bucket, nb_patients)
+            SELECT {_cost_bucket("")}, COUNT(*)
+            FROM PATIENT WHERE insurance_cost IS NOT NULL
+            GROUP BY 1
+            """
+            )
+        )
+        return conn.execute(text("SELECT COUNT(*) FROM PATIENT_KPIS")).scalar()
+
+
+def enable_patient_kpis(engine) -> bool:
+    """Crée les tables d'agrégats, les remplit et installe leurs triggers.
+
+    Args:
+        engine: Engine, ou connexion dont la transaction est gérée par l'appelant
+
+    Returns:
+        True si les agrégats sont disponibles, False en cas d'erreur
+    """
+    return install_triggers(
+        engine, "PATIENT_KPIS", PATIENT_KPIS_DDL, populate=refresh_patient_kpis
+    )
+
+
+def disable_patient_kpis(engine) -> bool:
+    """Supprime les tables d'agrégats et leurs triggers.
+
+    Args:
+        engine: Engine, ou connexion dont la transaction est gérée par l'appelant
+
+    Returns:
+        True si la suppression a réussi, False sinon
+    """
+    return drop_triggers(engine, "PATIENT_KPIS", PATIENT_KPIS_OBJECTS)
+
+
+def _histogram_median(histogram: pd.DataFrame, minimum: float, maximum: float):
+    """Médiane interpolée dans la tranche de l'histogramme qui la contient."""
+    counts = histogram["nb_patients"].to_numpy()
+    cumulative = np.cumsum(counts)
+    target = cumulative[-1] / 2
+    index = int(np.searchsorted(cumulative, target))
+    before = cumulative[index - 1] if index else 0
+    lower = histogram["cost_bucket"].iloc[index] * COST_BUCKET_WIDTH
+    median = lower + COST_BUCKET_WIDTH * (target - before) / counts[index]
+    return float(min(max(median, minimum), maximum))
+
+
+def _summarize(cells: pd.DataFrame) -> pd.DataFrame:
+    """Effectif, moyenne, écart-type et extrêmes à partir des sommes."""
+    count = cells["nb_patients"]
+    variance = (cells["total_squares"] - cells["total_cost"] ** 2 / count) / (count - 1)
+    return pd.DataFrame(
+        {
+            "count": count.astype("int64"),
+            "mean": cells["total_cost"] / count,
+            "std": np.sqrt(variance.clip(lower=0)),
+            "min": cells["min_cost"],
+            "max": cells["max_cost"],
+        }
+    )
+
+
+def get_cost_kpis(engine: Engine) -> dict:
+    """Calcule les indicateurs globaux du coût d'assurance.
+
+    Args:
+        engine: Connexion à la base de données (agrégats activés)
+
+    Returns:
+        dict: count, mean, std, median, min, max ; la médiane est exacte à
+        COST_BUCKET_WIDTH près. None si aucun patient
+    """
+    with engine.connect() as conn:
+        totals = pd.read_sql_query(
+            text(
+                """
+                SELECT SUM(nb_patients) AS nb_patients, TOTAL(total_cost) AS total_cost,
+                       TOTAL(total_squares) AS total_squares,
+                       MIN(min_cost) AS min_cost, MAX(max_cost) AS max_cost
+                FROM PATIENT_KPIS
+                """
+            ),
+            conn,
+        )
+        histogram = pd.read_sql_query(
+            text(
+                "SELECT cost_bucket, nb_patients FROM PATIENT_COST_HISTOGRAM "
+                "ORDER BY cost_bucket"
+            ),
+            conn,
+        )
+
+    if histogram.empty:
+        return None
+    kpis = _summarize(totals).iloc[0].to_dict()
+    kpis["count"] = int(kpis["count"])
+    kpis["median"] = _histogram_median(histogram, kpis["min"], kpis["max"])
+    return kpis
+
+
+def get_cost_kpis_by(engine: Engine, factor: str) -> pd.DataFrame:
+    """Calcule les indicateurs du coût d'assurance par modalité d'un facteur.
+
+    Args:
+        engine: Connexion à la base de données (agrégats activés)
+        factor: sex, smoker, region, age_bucket ou bmi_bucket
+
+    Returns:
+        pd.DataFrame: Une ligne par modalité (colonnes count, mean, std, min,
+        max), indexée par le libellé (borne inférieure pour age_bucket)
+
+    Raises:
+        ValueError: Si le facteur est inconnu
+    """
+    if factor not in KPI_FACTORS:
+        raise ValueError(f"Facteur inconnu : {factor}")
+    column = KPI_FACTORS[factor]
+
+    with engine.connect() as conn:
+        cells = pd.read_sql_query(
+            text(
+                f"""
+                SELECT {column}, SUM(nb_patients) AS nb_patients,
+                       TOTAL(total_cost) AS total_cost,
+                       TOTAL(total_squares) AS total_squares,
+                       MIN(min_cost) AS min_cost, MAX(max_cost) AS max_cost
+                FROM PATIENT_KPIS GROUP BY {column} ORDER BY {column}
+                """
+            ),
+            conn,
+        )
+
+    if column in KPI_CODED_COLUMNS:
+        reference = KPI_CODED_COLUMNS[column][1]
+        labels = get_reference_cache(engine).labels_for(reference, cells[column])
+    elif column == "bmi_bucket":
+        labels = cells[column].map(dict(enumerate(BMI_BUCKET_LABELS)))
+    else:
+        labels = cells[column]
+    return _summarize(cells).set_index(pd.Index(labels, name=factor))
@@ -0,0 +1,265 @@
+"""Mesure des temps d'exécution SQL et journal des requêtes lentes.
+
+instrument_engine branche des écouteurs before/after_cursor_execute sur un
+engine : chaque requête est comptée sous sa forme normalisée (littéraux
+remplacés par ?, espaces compactés) dans un histogramme de latence, avec le
+nombre de lignes écrites rapporté par le pilote. Les requêtes en échec sont
+mesurées et comptées à part par un écouteur handle_error. TimedQueuePool
+mesure en plus l'attente d'une connexion du pool.
+
+Les requêtes plus lentes que le seuil sont journalisées par loguru, avec en
+option leur plan d'exécution (EXPLAIN QUERY PLAN).
+"""
+
+import re
+import threading
+import time
+import weakref
+from functools import lru_cache
+
+import pandas as pd
+from loguru import logger
+from sqlalchemy import Engine, event
+from sqlalchemy.pool import QueuePool
+
+# Bornes supérieures (ms) des classes des histogrammes de latence
+LATENCY_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000, float("inf"))
+
+# Seuil par défaut du journal des requêtes lentes (ms)
+DEFAULT_SLOW_QUERY_MS = 250
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+# Statistiques par engine instrumenté
+_QUERY_STATS = weakref.WeakKeyDictionary()
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(statement: str) -> str:
+    """Ramène une requête à sa forme générique, clé des statistiques.
+
+    Args:
+        statement: Requête SQL telle qu'envoyée au pilote
+
+    Returns:
+        str: Requête avec littéraux remplacés par ? et espaces compactés
+    """
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _IN_LIST.sub("(?)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+class LatencyHistogram:
+    """Histogramme de latences à classes fixes (LATENCY_BUCKETS_MS)."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS_MS)
+
+    def record(self, elapsed_ms: float):
+        """Ajoute une mesure."""
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.buckets[index] += 1
+                break
+
+    def percentile(self, q: float) -> float:
+        """Borne supérieure de la classe contenant le quantile q (0 à 1)."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def result(self) -> dict:
+        """Retourne le résumé de l'histogramme."""
+        return {
+            "count": self.count,
+            "total_ms": self.total_ms,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": self.max_ms,
+        }
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool qui mesure l'attente de chaque emprunt de connexion."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = LatencyHistogram()
+        self._wait_lock = threading.Lock()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._wait_lock:
+                self.wait_stats.record(elapsed_ms)
+
+
+class QueryStats:
+    """Statistiques d'exécution des requêtes d'un engine.
+
+    Args:
+        slow_query_ms: Seuil (ms) du journal des requêtes lentes, None pour
+            le désactiver
+        explain: Si True, journalise le plan d'exécution des SELECT lents
+    """
+
+    def __init__(self, slow_query_ms: float = DEFAULT_SLOW_QUERY_MS, explain=False):
+        self.slow_query_ms = slow_query_ms
+        self.explain = explain
+        self.statements = {}
+        self.rows = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self, statement: str, elapsed_ms: float, rowcount: int, failed: bool = False
+    ):
+        """Ajoute l'exécution d'une requête aux statistiques.
+
+        Args:
+            statement: Requête SQL telle qu'envoyée au pilote
+            elapsed_ms: Durée d'exécution (ms)
+            rowcount: cursor.rowcount, renseigné par sqlite3 pour les seuls
+                INSERT/UPDATE/DELETE (-1 pour un SELECT, ignoré)
+            failed: Si True, l'exécution a levé une erreur
+        """
+        key = normalize_sql(statement)
+        with self._lock:
+            if key not in self.statements:
+                self.statements[key] = LatencyHistogram()
+                self.rows[key] = 0
+                self.errors[key] = 0
+            self.statements[key].record(elapsed_ms)
+            if rowcount > 0:
+                self.rows[key] += rowcount
+            if failed:
+                self.errors[key] += 1
+
+    def reset(self):
+        """Remet les statistiques à zéro."""
+        with self._lock:
+            self.statements.clear()
+            self.rows.clear()
+            self.errors.clear()
+
+    def snapshot(self) -> pd.DataFrame:
+        """Retourne les statistiques par requête, des plus coûteuses aux moins coûteuses.
+
+        La colonne rows ne compte que les lignes écrites (INSERT, UPDATE,
+        DELETE) : le pilote ne connaît pas le nombre de lignes d'un SELECT
+        avant leur lecture par l'appelant, rows vaut 0 pour les lectures.
+
+        Returns:
+            pd.DataFrame: Une ligne par requête normalisée (colonnes sql,
+            count, total_ms, mean_ms, p50_ms, p95_ms, max_ms, rows, errors)
+        """
+        with self._lock:
+            records = [
+                {
+                    "sql": key,
+                    **histogram.result(),
+                    "rows": self.rows[key],
+                    "errors": self.errors[key],
+                }
+                for key, histogram in self.statements.items()
+            ]
+        columns = ["sql", "count", "total_ms", "mean_ms", "p50_ms", "p95_ms"]
+        frame = pd.DataFrame(records, columns=columns + ["max_ms", "rows", "errors"])
+        return frame.sort_values("total_ms", ascending=False, ignore_index=True)
+
+
+def _explain(cursor, statement: str, parameters) -> str:
+    """Plan d'exécution d'un SELECT, lu sur la connexion du curseur."""
+    try:
+        plan_cursor = cursor.connection.execute(
+            f"EXPLAIN QUERY PLAN {statement}", parameters
+        )
+        return " | ".join(row[-1] for row in plan_cursor.fetchall())
+    except Exception as e:
+        return f"plan indisponible ({str(e)})"
+
+
+def instrument_engine(
+    engine: Engine, slow_query_ms: float = DEFAULT_SLOW_QUERY_MS, explain=False
+) -> QueryStats:
+    """Mesure les requêtes exécutées par un engine.
+
+    Args:
+        engine: Connexion à la base de données
+        slow_query_ms: Seuil (ms) du journal des requêtes lentes, None pour
+            le désactiver
+        explain: Si True, journalise le plan d'exécution des SELECT lents
+
+    Returns:
+        QueryStats: Statistiques alimentées par l'engine
+    """
+    if engine in _QUERY_STATS:
+        return _QUERY_STATS[engine]
+    stats = QueryStats(slow_query_ms, explain)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["query_start_time"].pop()) * 1000
+        stats.record(statement, elapsed_ms, cursor.rowcount)
+
+        if stats.slow_query_ms is None or elapsed_ms < stats.slow_query_ms:
+            return
+        message = f"Requête lente ({elapsed_ms:.1f} ms) : {normalize_sql(statement)}"
+        is_select = statement.lstrip()[:6].upper() in ("SELECT", "WITH")
+        if stats.explain and is_select and not executemany:
+            message += f" -- plan : {_explain(cursor, statement, parameters)}"
+        logger.warning(message)
+
+    @event.listens_for(engine, "handle_error")
+    def _record_error(exception_context):
+        # Sans contexte d'exécution, l'erreur précède before_cursor_execute
+        conn = exception_context.connection
+        if conn is None or exception_context.execution_context is None:
+            return
+        start_times = conn.info.get("query_start_time")
+        if not start_times:
+            return
+        elapsed_ms = (time.perf_counter() - start_times.pop()) * 1000
+        stats.record(exception_context.statement, elapsed_ms, 0, failed=True)
+
+    _QUERY_STATS[engine] = stats
+    return stats
+
+
+def get_query_stats(engine: Engine) -> QueryStats:
+    """Retourne les statistiques d'un engine instrumenté, None sinon."""
+    return _QUERY_STATS.get(engine)
+
+
+def get_pool_wait_stats(engine: Engine) -> dict:
+    """Retourne les temps d'attente d'une connexion du pool de l'engine.
+
+    Returns:
+        dict: Résumé de l'histogramme, None si le pool n'est pas mesuré
+    """
+    wait_stats = getattr(engine.pool, "wait_stats", None)
+    return wait_stats.result() if wait_stats is not None else None
@@ -0,0 +1,228 @@
+"""Statistiques calculées en flux, bloc par bloc.
+
+Chaque réducteur expose update (ajout d'un bloc de valeurs), merge (fusion
+avec un réducteur du même type, par exemple calculé sur un autre bloc ou une
+autre partition) et result. La mémoire utilisée ne dépend pas du nombre de
+lignes : ces réducteurs permettent de valider et de résumer des tables plus
+grandes que la mémoire, combinés à iter_patient_frames.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+
+class RunningMoments:
+    """Effectif, moyenne, variance, asymétrie, aplatissement, minimum et maximum.
+
+    Les moments centrés d'ordre 2 à 4 sont fusionnés avec les formules de
+    Pébay, numériquement stables. Variance, asymétrie et aplatissement
+    suivent les conventions de pandas (estimateurs non biaisés).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def update(self, values) -> "RunningMoments":
+        """Ajoute un bloc de valeurs (les valeurs manquantes sont ignorées)."""
+        x = pd.Series(values, copy=False).dropna().to_numpy(dtype="float64")
+        if x.size == 0:
+            return self
+
+        batch = RunningMoments()
+        batch.count = x.size
+        batch.mean = float(x.mean())
+        deviations = x - batch.mean
+        squared = deviations**2
+        batch.m2 = float(squared.sum())
+        batch.m3 = float((squared * deviations).sum())
+        batch.m4 = float((squared**2).sum())
+        batch.minimum = float(x.min())
+        batch.maximum = float(x.max())
+        return self.merge(batch)
+
+    def merge(self, other: "RunningMoments") -> "RunningMoments":
+        """Fusionne les moments d'un autre réducteur dans celui-ci."""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.__dict__.update(other.__dict__)
+            return self
+
+        na, nb = self.count, other.count
+        n = na + nb
+        delta = other.mean - self.mean
+        m2 = self.m2 + other.m2 + delta**2 * na * nb / n
+        m3 = (
+            self.m3
+            + other.m3
+            + delta**3 * na * nb * (na - nb) / n**2
+            + 3 * delta * (na * other.m2 - nb * self.m2) / n
+        )
+        m4 = (
+            self.m4
+            + other.m4
+            + delta**4 * na * nb * (na**2 - na * nb + nb**2) / n**3
+            + 6 * delta**2 * (na**2 * other.m2 + nb**2 * self.m2) / n**2
+            + 4 * delta * (na * other.m3 - nb * self.m3) / n
+        )
+
+        self.count = n
+        self.mean += delta * nb / n
+        self.m2, self.m3, self.m4 = m2, m3, m4
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        return self
+
+    @property
+    def variance(self) -> float:
+        """Variance empirique non biaisée (ddof=1)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self) -> float:
+        """Écart-type empirique (ddof=1)."""
+        return math.sqrt(self.variance) if self.count > 1 else math.nan
+
+    @property
+    def skewness(self) -> float:
+        """Coefficient d'asymétrie ajusté (comme pandas.Series.skew)."""
+        n = self.count
+        if n < 3 or self.m2 == 0:
+            return math.nan
+        g1 = math.sqrt(n) * self.m3 / self.m2**1.5
+        return math.sqrt(n * (n - 1)) / (n - 2) * g1
+
+    @property
+    def kurtosis(self) -> float:
+        """Excès d'aplatissement non biaisé (comme pandas.Series.kurt)."""
+        n = self.count
+        if n < 4 or self.m2 == 0:
+            return math.nan
+        g2 = n * self.m4 / self.m2**2 - 3
+        return ((n + 1) * g2 + 6) * (n - 1) / ((n - 2) * (n - 3))
+
+    def result(self) -> dict:
+        """Retourne les statistiques calculées."""
+        return {
+            "count": self.count,
+            "mean": self.mean if self.count else math.nan,
+            "std": self.std,
+            "min": self.minimum if self.count else math.nan,
+            "max": self.maximum if self.count else math.nan,
+            "skew": self.skewness,
+            "kurtosis": self.kurtosis,
+        }
+
+
+class QuantileSketch:
+    """Quantiles approchés à erreur relative bornée (principe de DDSketch).
+
+    Chaque valeur est rangée dans un seau logarithmique : le quantile estimé
+    est à moins de `relative_accuracy` (en relatif) de la valeur exacte. La
+    mémoire dépend de l'étendue des valeurs, pas de leur nombre.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _add_keys(self, store: dict, values: np.ndarray):
+        keys = np.ceil(np.log(values) / self._log_gamma).astype("int64")
+        unique, counts = np.unique(keys, return_counts=True)
+        for key, count in zip(unique.tolist(), counts.tolist()):
+            store[key] = store.get(key, 0) + count
+
+    def update(self, values) -> "QuantileSketch":
+        """Ajoute un bloc de valeurs (les valeurs manquantes sont ignorées)."""
+        x = pd.Series(values, copy=False).dropna().to_numpy(dtype="float64")
+        self._add_keys(self.positive, x[x > 0])
+        self._add_keys(self.negative, -x[x < 0])
+        self.zero_count += int((x == 0).sum())
+        self.count += x.size
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Fusionne un autre sketch de même précision dans celui-ci."""
+        if other.gamma != self.gamma:
+            raise ValueError("Sketchs de précisions différentes")
+        for store, other_store in (
+            (self.positive, other.positive),
+            (self.negative, other.negative),
+        ):
+            for key, count in other_store.items():
+                store[key] = store.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma**key / (self.gamma + 1)
+
+    def quantile(self, q: float) -> float:
+        """Retourne le quantile q (entre 0 et 1) estimé."""
+        if self.count == 0:
+            return math.nan
+        rank = q * (self.count - 1)
+
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive))
+
+    def result(self, quantiles=(0.25, 0.5, 0.75)) -> dict:
+        """Retourne les quantiles demandés, indexés par leur valeur."""
+        return {q: self.quantile(q) for q in quantiles}
+
+
+class CategoryCounter:
+    """Fréquences des modalités d'une variable catégorielle."""
+
+    def __init__(self):
+        self.counts = {}
+        self.missing = 0
+
+    def update(self, values) -> "CategoryCounter":
+        """Ajoute un bloc de valeurs."""
+        series = pd.Series(values, copy=False)
+        self.missing += int(series.isna().sum())
+        for label, count in series.value_counts(dropna=True).items():
+            if count:
+                self.counts[label] = self.counts.get(label, 0) + int(count)
+        return self
+
+    def merge(self, other: "CategoryCounter") -> "CategoryCounter":
+        """Fusionne les fréquences d'un autre compteur dans celui-ci."""
+        for label, count in other.counts.items():
+            self.counts[label] = self.counts.get(label, 0) + count
+        self.missing += other.missing
+        return self
+
+    def result(self) -> dict:
+        """Retourne effectifs et proportions par modalité."""
+        total = sum(self.counts.values())
+        return {
+            label: {"count": count, "share": count / total}
+            for label, count in sorted(self.counts.items(), key=lambda i: -i[1])
+        }
@@ -0,0 +1,303 @@
+"""Génération parallèle de patients synthétiques.
+
+Le nombre de lignes demandé est découpé en shards de taille fixe, chacun avec
+sa propre graine dérivée de la graine principale (numpy SeedSequence.spawn).
+Les shards sont générés dans des processus séparés, puis insérés dans l'ordre
+par un seul écrivain, en une transaction. Le découpage et les graines ne
+dépendent pas du nombre de processus : pour une graine donnée, la base obtenue
+est identique quel que soit `workers`.
+
+Deux sources sont disponibles :
+- "insurance" (par défaut) : rééchantillonnage bootstrap de data/insurance.csv
+  avec bruit, qui conserve la distribution jointe des données réelles ;
+- "uniform" : tirages uniformes et coût linéaire de generate_patient_arrays.
+
+Usage :
+    python -m modules.synthetic --rows 10000000 --seed 42 --workers 32
+"""
+
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from modules.db_loader import (
+    CSV_COLUMN_DTYPES,
+    CSV_REFERENCE_COLUMNS,
+    INSURANCE_CSV_PATH,
+    PATIENT_CHUNK_SIZE,
+    REFERENCE_TABLES,
+    ReferenceCache,
+    generate_patient_arrays,
+    get_engine,
+    get_patient_reference_ids,
+    insert_patient_arrays,
+    transaction,
+    write_fingerprint,
+)
+
+# Nombre de lignes générées par shard
+SHARD_SIZE = 250_000
+
+# Sources de données synthétiques disponibles
+SYNTHETIC_SOURCES = ("insurance", "uniform")
+
+# Bruit appliqué aux lignes rééchantillonnées
+AGE_JITTER = 2  # années, uniforme sur [-2, 2]
+BMI_JITTER = 1.0  # écart-type
+COST_JITTER = 0.05  # écart-type du facteur log-normal
+
+# Bornes des valeurs générées, celles de insurance.csv
+AGE_RANGE = (18, 64)
+BMI_RANGE = (15.0, 55.0)
+
+
+def plan_shards(nb_patients: int, seed: int = None, shard_size: int = SHARD_SIZE):
+    """Découpe une génération en shards indépendants.
+
+    Args:
+        nb_patients: Nombre total de patients
+        seed: Graine principale (None pour un tirage non reproductible)
+        shard_size: Nombre de lignes par shard
+
+    Returns:
+        list: Couples (graine du shard, nombre de lignes), dans l'ordre d'insertion
+    """
+    starts = range(0, max(nb_patients, 0), shard_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    return [
+        (shard_seed, min(shard_size, nb_patients - start))
+        for shard_seed, start in zip(seeds, starts)
+    ]
+
+
+def fit_insurance_model(conn, csv_path: str = INSURANCE_CSV_PATH) -> dict:
+    """Prépare le rééchantillonnage des données réelles de insurance.csv.
+
+    Les libellés sont convertis en IDs de référence de la base. Le coût est
+    ensuite ajusté par segment (fumeur x obésité) par une régression linéaire
+    sur l'âge et l'IMC : les pentes servent à corriger le coût des lignes
+    tirées quand leur âge et leur IMC sont bruités.
+
+    Args:
+        conn: Connexion ouverte sur la base cible
+        csv_path: Chemin du fichier CSV
+
+    Returns:
+        dict: Tableaux NumPy des colonnes de PATIENT, plus les pentes du coût
+        par ligne (age_slope, bmi_slope)
+    """
+    references = ReferenceCache()
+    references.load(conn)
+
+    df = pd.read_csv(csv_path, usecols=list(CSV_COLUMN_DTYPES), dtype=CSV_COLUMN_DTYPES)
+    columns = {
+        "age": df["age"],
+        "bmi": df["bmi"],
+        "nb_children": df["children"],
+        "insurance_cost": df["charges"],
+    }
+    for csv_column in CSV_REFERENCE_COLUMNS:
+        id_column = REFERENCE_TABLES[ReferenceCache.resolve(csv_column)][1]
+        labels = df[csv_column].str.strip().str.lower()
+        columns[id_column] = references.codes_for(csv_column, labels)
+    frame = pd.DataFrame(columns).dropna()
+
+    model = {
+        name: frame[name].to_numpy(
+            dtype="float64" if name in ("bmi", "insurance_cost") else "int64"
+        )
+        for name in frame.columns
+    }
+
+    # Pentes du coût par segment fumeur x obésité
+    smoker = model["id_smoking_status"] == references.get_id("smoking", "yes")
+    segments = smoker * 2 + (model["bmi"] >= 30)
+    model["age_slope"] = np.zeros(len(frame))
+    model["bmi_slope"] = np.zeros(len(frame))
+    for segment in np.unique(segments):
+        rows = segments == segment
+        design = np.column_stack(
+            [np.ones(rows.sum()), model["age"][rows], model["bmi"][rows]]
+        )
+        coefficients = np.linalg.lstsq(
+            design, model["insurance_cost"][rows], rcond=None
+        )[0]
+        model["age_slope"][rows] = coefficients[1]
+        model["bmi_slope"][rows] = coefficients[2]
+
+    logger.info(f"Modèle insurance.csv ajusté sur {len(frame)} lignes")
+    return model
+
+
+def sample_insurance_arrays(rng: np.random.Generator, nb_patients: int, model: dict):
+    """Génère des patients par rééchantillonnage bootstrap bruité.
+
+    Args:
+        rng: Générateur NumPy
+        nb_patients: Nombre de patients à générer
+        model: Modèle retourné par fit_insurance_model
+
+    Returns:
+        dict: Tableaux NumPy indexés par nom de colonne de PATIENT
+    """
+    rows = rng.integers(0, len(model["age"]), size=nb_patients)
+
+    age = np.clip(
+        model["age"][rows] + rng.integers(-AGE_JITTER, AGE_JITTER + 1, nb_patients),
+        *AGE_RANGE,
+    )
+    bmi = np.round(
+        np.clip(
+            model["bmi"][rows] + rng.normal(0, BMI_JITTER, nb_patients), *BMI_RANGE
+        ),
+        2,
+    )
+
+    # Coût de la ligne tirée, corrigé du bruit sur l'âge et l'IMC
+    insurance_cost = (
+        model["insurance_cost"][rows]
+        + model["age_slope"][rows] * (age - model["age"][rows])
+        + model["bmi_slope"][rows] * (bmi - model["bmi"][rows])
+    )
+    insurance_cost = np.maximum(insurance_cost, model["insurance_cost"].min())
+    insurance_cost = np.round(
+        insurance_cost * rng.lognormal(0, COST_JITTER, nb_patients), 2
+    )
+
+    return {
+        "age": age,
+        "bmi": bmi,
+        "nb_children": model["nb_children"][rows],
+        "insurance_cost": insurance_cost,
+        "id_sex": model["id_sex"][rows],
+        "id_smoking_status": model["id_smoking_status"][rows],
+        "id_region": model["id_region"][rows],
+    }
+
+
+def generate_shard(shard_seed, nb_rows: int, generator, params: dict) -> dict:
+    """Génère les colonnes d'un shard (exécuté dans un processus de travail).
+
+    Args:
+        shard_seed: Graine du shard (numpy SeedSequence)
+        nb_rows: Nombre de lignes du shard
+        generator: generate_patient_arrays ou sample_insurance_arrays
+        params: Arguments nommés du générateur
+
+    Returns:
+        dict: Tableaux NumPy indexés par nom de colonne de PATIENT
+    """
+    rng = np.random.default_rng(shard_seed)
+    return generator(rng, nb_rows, **params)
+
+
+def generate_patients_parallel(
+    engine=None,
+    nb_patients: int = 1000,
+    seed: int = None,
+    workers: int = None,
+    shard_size: int = SHARD_SIZE,
+    chunk_size: int = PATIENT_CHUNK_SIZE,
+    source: str = "insurance",
+) -> int:
+    """Génère des patients sur plusieurs processus et les insère en masse.
+
+    Au plus deux shards par processus sont en attente d'insertion : la
+    mémoire utilisée ne dépend pas du nombre total de lignes.
+
+    Args:
+        engine: Engine, ou connexion dont la transaction est gérée par l'appelant
+        nb_patients: Nombre de patients à générer
+        seed: Graine principale (None pour un tirage non reproductible)
+        workers: Nombre de processus, os.cpu_count() par défaut ; 1 génère
+            dans le processus courant
+        shard_size: Nombre de lignes par shard
+        chunk_size: Nombre de lignes insérées par appel à executemany
+        source: Source des données, parmi SYNTHETIC_SOURCES
+
+    Returns:
+        int: Nombre de patients insérés
+
+    Raises:
+        ValueError: Si la source est inconnue
+    """
+    if source not in SYNTHETIC_SOURCES:
+        raise ValueError(f"Source inconnue : {source}")
+    engine = engine or get_engine()
+    workers = max(1, workers or os.cpu_count() or 1)
+    shards = plan_shards(nb_patients, seed, shard_size)
+    logger.info(
+        f"Génération de {nb_patients} patients en {len(shards)} shards "
+        f"sur {workers} processus"
+    )
+    start_time = time.perf_counter()
+
+    nb_inserted = 0
+    with transaction(engine) as conn:
+        if source == "insurance":
+            generator = sample_insurance_arrays
+            params = {"model": fit_insurance_model(conn)}
+        else:
+            generator = generate_patient_arrays
+            params = get_patient_reference_ids(conn)
+
+        if workers == 1:
+            for shard_seed, nb_rows in shards:
+                columns = generate_shard(shard_seed, nb_rows, generator, params)
+                nb_inserted += insert_patient_arrays(conn, columns, chunk_size)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
+                for shard_seed, nb_rows in shards:
+                    pending.append(
+                        executor.submit(
+                            generate_shard, shard_seed, nb_rows, generator, params
+                        )
+                    )
+                    # Insertion dans l'ordre des shards, par un seul écrivain
+                    while pending and (
+                        len(pending) >= 2 * workers or pending[0].done()
+                    ):
+                        columns = pending.popleft().result()
+                        nb_inserted += insert_patient_arrays(conn, columns, chunk_size)
+                        logger.debug(f"Patients insérés : {nb_inserted}/{nb_patients}")
+                while pending:
+                    columns = pending.popleft().result()
+                    nb_inserted += insert_patient_arrays(conn, columns, chunk_size)
+                    logger.debug(f"Patients insérés : {nb_inserted}/{nb_patients}")
+
+        write_fingerprint(conn)
+
+    elapsed = time.perf_counter() - start_time
+    rate = nb_inserted / elapsed if elapsed > 0 else float("inf")
+    logger.info(
+        f"{nb_inserted} patients insérés en {elapsed:.2f}s ({rate:,.0f} lignes/s)"
+    )
+    return nb_inserted
+
+
+def main(argv: list = None):
+    """Point d'entrée en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Génération de patients synthétiques")
+    parser.add_argument("--rows", type=int, required=True, help="Patients à générer")
+    parser.add_argument("--seed", type=int, default=None, help="Graine principale")
+    parser.add_argument("--workers", type=int, default=None, help="Processus")
+    parser.add_argument("--db-path", default=None, help="Base de données visée")
+    parser.add_argument("--source", choices=SYNTHETIC_SOURCES, default="insurance")
+    args = parser.parse_args(argv)
+
+    engine = get_engine(db_path=args.db_path, profile="bulk_load")
+    generate_patients_parallel(
+        engine, args.rows, args.seed, args.workers, source=args.source
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
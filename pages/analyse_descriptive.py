@@ -1,7 +1,9 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from modules.db_loader import create_database
+from modules.db_loader import get_database_fingerprint, get_readonly_engine
+from modules.patient_frame import load_patient_frame
+from modules.patient_kpis import get_cost_kpis, get_cost_kpis_by, has_patient_kpis
 
 # Configuration de la page avec métadonnées améliorées
 st.set_page_config(
@@ -163,23 +165,40 @@ if "is_authenticated" not in st.session_state or not st.session_state.is_authent
     st.stop()
 
 
+# Facteurs de l'analyse -> facteur des agrégats PATIENT_KPIS (âge et IMC
+# par tranche)
+KPI_FACTOR_OF = {
+    "age": "age_bucket",
+    "bmi": "bmi_bucket",
+    "sex": "sex",
+    "smoker": "smoker",
+    "region": "region",
+}
+
+
 # Fonction de chargement des données
 @st.cache_data
-def load_data():
-    """Charge les données depuis la base"""
-    engine = create_database(force_recreate=False)
-    with engine.connect() as conn:
-        df = pd.read_sql_query(
-            """
-            SELECT p.*, s.sex_type, sm.smoking_status, r.region_name
-            FROM PATIENT p
-            JOIN SEX s ON p.id_sex = s.id_sex
-            JOIN SMOKING sm ON p.id_smoking_status = sm.id_smoking_status
-            JOIN REGION r ON p.id_region = r.id_region
-            """,
-            conn,
-        )
-    return df
+def load_data(fingerprint: str, columns: tuple = None):
+    """Charge les colonnes demandées (toutes si None), cache invalidé par l'empreinte"""
+    return load_patient_frame(get_readonly_engine(), list(columns) if columns else None)
+
+
+@st.cache_data
+def load_kpis(fingerprint: str):
+    """Indicateurs du coût d'assurance lus dans PATIENT_KPIS, None si absente"""
+    engine = get_readonly_engine()
+    return get_cost_kpis(engine) if has_patient_kpis(engine) else None
+
+
+@st.cache_data
+def load_factor_kpis(fingerprint: str, factor: str):
+    """Indicateurs du coût par modalité d'un facteur, lus dans PATIENT_KPIS si possible"""
+    engine = get_readonly_engine()
+    if factor in KPI_FACTOR_OF and has_patient_kpis(engine):
+        return get_cost_kpis_by(engine, KPI_FACTOR_OF[factor])
+    df_factor = load_data(fingerprint, (factor, "insurance_cost"))
+    grouped = df_factor.groupby(factor, observed=True)["insurance_cost"]
+    return grouped.agg(["count", "mean", "std", "min", "max"])
 
 
 # Titre de la page avec accessibilité
@@ -197,8 +216,24 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-# Chargement des données
-df = load_data()
+# Chargement des données (lecture seule : la page ne crée ni ne reconstruit la base)
+engine = get_readonly_engine()
+if engine is None:
+    st.error("🚫 Base de données indisponible")
+    st.stop()
+fingerprint = get_database_fingerprint(engine)
+
+# Indicateurs tirés des agrégats maintenus par triggers, sinon de la seule
+# colonne des coûts
+kpis = load_kpis(fingerprint)
+if kpis is None:
+    costs = load_data(fingerprint, ("insurance_cost",))["insurance_cost"]
+    kpis = {
+        "mean": costs.mean(),
+        "median": costs.median(),
+        "max": costs.max(),
+        "min": costs.min(),
+    }
 
 # Statistiques générales avec accessibilité
 st.markdown(
@@ -219,7 +254,7 @@ with col1:
             </div>
         </div>
     """.format(
-            df["insurance_cost"].mean()
+            kpis["mean"]
         ),
         unsafe_allow_html=True,
     )
@@ -234,7 +269,7 @@ with col2:
             </div>
         </div>
     """.format(
-            df["insurance_cost"].median()
+            kpis["median"]
         ),
         unsafe_allow_html=True,
     )
@@ -249,7 +284,7 @@ with col3:
             </div>
         </div>
     """.format(
-            df["insurance_cost"].max()
+            kpis["max"]
         ),
         unsafe_allow_html=True,
     )
@@ -264,7 +299,7 @@ with col4:
             </div>
         </div>
     """.format(
-            df["insurance_cost"].min()
+            kpis["min"]
         ),
         unsafe_allow_html=True,
     )
@@ -286,8 +321,9 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
+# Histogramme : données ligne à ligne, colonne des coûts seulement
 fig = px.histogram(
-    df,
+    load_data(fingerprint, ("insurance_cost",)),
     x="insurance_cost",
     nbins=50,
     title="Distribution des Coûts d'Assurance",
@@ -353,22 +389,44 @@ st.markdown(
 
 factor = st.selectbox(
     "Sélectionnez un facteur d'analyse",
-    ["age", "bmi", "nb_children", "sex_type", "smoking_status", "region_name"],
+    ["age", "bmi", "nb_children", "sex", "smoker", "region"],
     format_func=lambda x: {
         "age": "Âge",
         "bmi": "IMC",
         "nb_children": "Nombre d'enfants",
-        "sex_type": "Sexe",
-        "smoking_status": "Statut tabagique",
-        "region_name": "Région",
+        "sex": "Sexe",
+        "smoker": "Statut tabagique",
+        "region": "Région",
     }[x],
 )
 
+# Indicateurs par modalité, lus dans les agrégats quand ils sont disponibles
+factor_kpis = load_factor_kpis(fingerprint, factor)
+st.dataframe(
+    factor_kpis.rename(
+        columns={
+            "count": "Patients",
+            "mean": "Coût moyen ($)",
+            "std": "Écart-type ($)",
+            "min": "Coût minimum ($)",
+            "max": "Coût maximum ($)",
+        }
+    ),
+    use_container_width=True,
+    column_config={
+        column: st.column_config.NumberColumn(format="%.2f")
+        for column in ("Coût moyen ($)", "Écart-type ($)")
+    },
+)
+
+# Boîtes et violons : données ligne à ligne du facteur et des coûts
+df_factor = load_data(fingerprint, (factor, "insurance_cost"))
+
 col1, col2 = st.columns(2)
 
 with col1:
     fig1 = px.box(
-        df,
+        df_factor,
         x=factor,
         y="insurance_cost",
         title=f"Distribution des Coûts par {factor}",
@@ -401,7 +459,7 @@ with col1:
 
 with col2:
     fig2 = px.violin(
-        df,
+        df_factor,
         x=factor,
         y="insurance_cost",
         title=f"Distribution Détaillée par {factor}",
@@ -449,13 +507,14 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-# Création d'un DataFrame pour l'analyse des variables catégorielles
-df_encoded = df.copy()
-df_encoded["smoker_encoded"] = (df_encoded["smoking_status"] == "yes").astype(int)
-df_encoded["sex_encoded"] = (df_encoded["sex_type"] == "male").astype(int)
+# Création d'un DataFrame pour l'analyse des variables catégorielles : seule
+# la matrice de corrélation charge toutes les colonnes
+df_encoded = load_data(fingerprint).copy()
+df_encoded["smoker_encoded"] = (df_encoded["smoker"] == "yes").astype(int)
+df_encoded["sex_encoded"] = (df_encoded["sex"] == "male").astype(int)
 
 # Création de variables dummy pour la région
-region_dummies = pd.get_dummies(df_encoded["region_name"], prefix="region")
+region_dummies = pd.get_dummies(df_encoded["region"], prefix="region")
 df_encoded = pd.concat([df_encoded, region_dummies], axis=1)
 
 # Sélection des colonnes pour la matrice de corrélation
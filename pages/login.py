@@ -1,8 +1,8 @@
 import streamlit as st
 import time
 from datetime import datetime
-from modules.auth import verify_user
-from modules.db_loader import create_database
+from modules.auth import AuthBusyError, verify_user
+from modules.db_loader import get_engine
 
 # Styles personnalisés pour l'accessibilité
 st.markdown(
@@ -109,11 +109,15 @@ def check_rate_limiting() -> bool:
 
 
 def login_user(username: str, password: str) -> bool:
-    """Tente de connecter l'utilisateur avec gestion de sécurité améliorée"""
+    """Tente de connecter l'utilisateur avec gestion de sécurité améliorée
+
+    Lève AuthBusyError si le service d'authentification est saturé : la
+    tentative n'est alors pas décomptée.
+    """
     if not check_rate_limiting():
         return False
 
-    engine = create_database()
+    engine = get_engine()
     user = verify_user(engine, username, password)
 
     if user:
@@ -205,11 +209,19 @@ def show_login_page():
         if submit:
             if not username or not password:
                 st.error("⚠️ Veuillez remplir tous les champs")
-            elif login_user(username, password):
-                st.success("✅ Connexion réussie!")
-                st.experimental_rerun()
             else:
-                st.error("❌ Identifiants incorrects")
+                try:
+                    logged_in = login_user(username, password)
+                except AuthBusyError:
+                    st.warning(
+                        "⏳ Service de connexion saturé, réessayez dans un instant"
+                    )
+                else:
+                    if logged_in:
+                        st.success("✅ Connexion réussie!")
+                        st.experimental_rerun()
+                    else:
+                        st.error("❌ Identifiants incorrects")
 
     # Informations de sécurité
     st.markdown(
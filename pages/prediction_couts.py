@@ -1,7 +1,12 @@
 import streamlit as st
 import pandas as pd
 from models.cost_predictor import CostPredictor
-from modules.db_loader import create_database
+from modules.async_db import (
+    fetch_scalar_async,
+    get_similar_profiles_async,
+    run_concurrently,
+)
+from modules.db_loader import get_readonly_engine
 import plotly.express as px
 from datetime import datetime
 
@@ -249,25 +254,6 @@ if "is_authenticated" not in st.session_state or not st.session_state.is_authent
     st.stop()
 
 
-# Fonction de chargement des données pour la comparaison
-@st.cache_data
-def load_data():
-    """Charge les données depuis la base"""
-    engine = create_database(force_recreate=False)
-    with engine.connect() as conn:
-        df = pd.read_sql_query(
-            """
-            SELECT p.*, s.sex_type, sm.smoking_status, r.region_name
-            FROM PATIENT p
-            JOIN SEX s ON p.id_sex = s.id_sex
-            JOIN SMOKING sm ON p.id_smoking_status = sm.id_smoking_status
-            JOIN REGION r ON p.id_region = r.id_region
-            """,
-            conn,
-        )
-    return df
-
-
 # Chargement du modèle en cache
 @st.cache_resource
 def load_model():
@@ -683,9 +669,21 @@ if predict_clicked:
                     unsafe_allow_html=True,
                 )
 
-                # Comparaison avec la moyenne
-                df = load_data()
-                moyenne_generale = df["insurance_cost"].mean()
+                # Comparaison avec la moyenne : moyenne générale et profils
+                # similaires lus en parallèle, en lecture seule
+                engine = get_readonly_engine()
+                if engine is None:
+                    st.error("🚫 Base de données indisponible")
+                    st.stop()
+                page_data = run_concurrently(
+                    moyenne=fetch_scalar_async(
+                        engine, "SELECT AVG(insurance_cost) FROM PATIENT"
+                    ),
+                    similar_profiles=get_similar_profiles_async(
+                        engine, smoker, age, bmi
+                    ),
+                )
+                moyenne_generale = page_data["moyenne"]
                 difference = prediction[0] - moyenne_generale
                 pourcentage = (difference / moyenne_generale) * 100
 
@@ -718,11 +716,7 @@ if predict_clicked:
                 )
 
                 # Filtrage des profils similaires
-                similar_profiles = df[
-                    (df["age"].between(age - 5, age + 5))
-                    & (df["bmi"].between(bmi - 2, bmi + 2))
-                    & (df["smoking_status"] == smoker)
-                ]
+                similar_profiles = page_data["similar_profiles"]
 
                 if not similar_profiles.empty:
                     fig = px.box(
@@ -3,17 +3,39 @@
 import os
 import sys
 import glob
+import uuid
 from pathlib import Path
 
+import pytest
+
 # Ajout du répertoire racine au PYTHONPATH
 root_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(root_dir))
 
+from modules.db_loader import create_database  # noqa: E402
+
+
+@pytest.fixture
+def test_db_path(tmp_path):
+    """Chemin unique d'une base de test, dans le répertoire temporaire du test"""
+    return str(tmp_path / f"test_medical_costs_{uuid.uuid4()}.db")
+
+
+@pytest.fixture
+def test_db(test_db_path):
+    """Fixture pour créer une base de test"""
+    engine = create_database(db_path=test_db_path)
+
+    yield engine
+
+    if engine is not None:
+        engine.dispose()
+
 
 def pytest_sessionfinish(session, exitstatus):
     """Nettoie les bases de données de test après l'exécution des tests"""
     data_dir = root_dir / "data"
-    test_pattern = str(data_dir / "test_medical_costs_*.db")
+    test_pattern = str(data_dir / "test_medical_costs_*.db*")
 
     # Suppression des bases de test
     for db_file in glob.glob(test_pattern):
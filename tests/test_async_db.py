@@ -0,0 +1,68 @@
+"""Tests pour le module async_db.py"""
+
+import asyncio
+
+import pytest
+
+from modules.async_db import (
+    fetch_frame_async,
+    fetch_scalar_async,
+    gather_named,
+    get_reference_cache_async,
+    get_reference_id_async,
+    get_similar_profiles_async,
+    load_patient_frame_async,
+    run_concurrently,
+    verify_user_async,
+)
+from modules.auth import create_user
+from modules.db_loader import get_similar_profiles
+from modules.patient_frame import load_patient_frame
+
+
+def test_run_concurrently(test_db):
+    """Test que les requêtes parallèles donnent les résultats synchrones"""
+    results = run_concurrently(
+        frame=load_patient_frame_async(test_db, columns=["age", "smoker"]),
+        mean=fetch_scalar_async(test_db, "SELECT AVG(insurance_cost) FROM PATIENT"),
+        regions=fetch_frame_async(
+            test_db,
+            "SELECT region_name FROM REGION WHERE id_region <= :max",
+            {"max": 2},
+        ),
+        similar=get_similar_profiles_async(test_db, "yes", 40, 28.0),
+        region_id=get_reference_id_async(test_db, "REGION", "region_name", "northeast"),
+    )
+
+    assert results["frame"].equals(load_patient_frame(test_db, ["age", "smoker"]))
+    assert results["mean"] > 0
+    assert len(results["regions"]) == 2
+    assert results["similar"].equals(get_similar_profiles(test_db, "yes", 40, 28.0))
+    assert results["region_id"] is not None
+
+
+def test_async_auth_and_references(test_db):
+    """Test de verify_user et du cache de références en asynchrone"""
+    create_user(test_db, "async_user", "secret123")
+
+    async def scenario():
+        return await gather_named(
+            user=verify_user_async(test_db, "async_user", "secret123"),
+            wrong=verify_user_async(test_db, "async_user", "mauvais"),
+            references=get_reference_cache_async(test_db),
+        )
+
+    results = asyncio.run(scenario())
+    assert results["user"]["username"] == "async_user"
+    assert results["wrong"] is None
+    assert results["references"].get_id("smoker", "yes") is not None
+
+
+def test_engine_required():
+    """Test qu'un engine absent est refusé, sans repli sur get_engine"""
+    with pytest.raises(ValueError):
+        run_concurrently(mean=fetch_scalar_async(None, "SELECT 1"))
+    with pytest.raises(ValueError):
+        run_concurrently(similar=get_similar_profiles_async(None, "yes", 40, 28.0))
+    with pytest.raises(TypeError):
+        run_concurrently(frame=fetch_frame_async("SELECT 1"))
@@ -1,11 +1,22 @@
 """Tests pour le module auth.py"""
 
+import bcrypt
 import pytest
+import threading
+import time
 import uuid
 import os
 from pathlib import Path
 from sqlalchemy import text
-from modules.auth import hash_password, verify_password, create_user, verify_user
+from modules import auth
+from modules.auth import (
+    AuthBusyError,
+    PasswordHasher,
+    hash_password,
+    verify_password,
+    create_user,
+    verify_user,
+)
 from modules.db_loader import create_database
 
 
@@ -159,3 +170,82 @@ def test_verify_user_admin(test_db):
     assert user_info["username"] == username
     assert user_info["email"] == email
     assert user_info["is_admin"] is True
+
+
+def test_password_hasher_stats():
+    """Test des vérifications dans le pool et de leurs statistiques"""
+    hasher = PasswordHasher(workers=2, queue_size=4)
+    hashed = hash_password("test123")
+    try:
+        assert hasher.verify("test123", hashed) is True
+        assert hasher.verify("wrong123", hashed) is False
+
+        stats = hasher.stats()
+        assert stats["workers"] == 2
+        assert stats["queued"] == 0 and stats["active"] == 0
+        assert stats["rejected"] == 0
+        assert stats["hash_latency"]["count"] == 2
+        assert stats["hash_latency"]["max_ms"] > 0
+    finally:
+        hasher.shutdown()
+
+
+def test_password_hasher_busy(monkeypatch):
+    """Test du refus immédiat quand la file d'attente est pleine"""
+    release = threading.Event()
+    monkeypatch.setattr(auth, "verify_password", lambda *args: release.wait(5))
+    hasher = PasswordHasher(workers=1, queue_size=1)
+
+    # Un appel en cours et un en attente occupent toutes les places
+    callers = [
+        threading.Thread(target=hasher.verify, args=("a", "b")) for _ in range(2)
+    ]
+    for caller in callers:
+        caller.start()
+    deadline = time.time() + 5
+    while hasher.stats()["active"] + hasher.stats()["queued"] < 2:
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+    with pytest.raises(AuthBusyError):
+        hasher.verify("a", "b")
+
+    release.set()
+    for caller in callers:
+        caller.join(5)
+    stats = hasher.stats()
+    assert stats["rejected"] == 1
+    assert stats["hash_latency"]["count"] == 2
+    assert stats["queue_wait"]["count"] == 2
+
+    # Les places sont rendues : les vérifications sont de nouveau acceptées
+    assert hasher.verify("a", "b") is True
+    hasher.shutdown()
+
+
+def test_verify_user_busy(test_db):
+    """Test de verify_user avec un pool saturé"""
+    create_user(test_db, "busyuser", "testpass")
+    hasher = PasswordHasher(workers=1, queue_size=0)
+    # Hash coûteux : la vérification en cours occupe l'unique place du pool
+    slow_hash = bcrypt.hashpw(b"slowpass", bcrypt.gensalt(rounds=13)).decode()
+    caller = threading.Thread(target=hasher.verify, args=("slowpass", slow_hash))
+    try:
+        caller.start()
+        deadline = time.time() + 5
+        while hasher.stats()["active"] < 1:
+            assert time.time() < deadline
+            time.sleep(0.01)
+
+        with pytest.raises(AuthBusyError):
+            verify_user(test_db, "busyuser", "testpass", hasher=hasher)
+        # Utilisateur inconnu : aucune vérification bcrypt
+        assert verify_user(test_db, "nonexistent", "testpass", hasher=hasher) is None
+
+        # Place rendue : la vérification est de nouveau acceptée
+        caller.join(30)
+        assert verify_user(test_db, "busyuser", "testpass", hasher=hasher)
+        assert hasher.stats()["rejected"] == 1
+    finally:
+        caller.join(30)
+        hasher.shutdown()
@@ -0,0 +1,98 @@
+"""Tests pour le module backup.py"""
+
+import sqlite3
+import threading
+from contextlib import closing
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+
+from modules.backup import backup_database, list_backups, restore_backup
+
+
+@pytest.fixture
+def backup_path(tmp_path):
+    """Chemin des sauvegardes, dans le répertoire temporaire du test"""
+    return str(tmp_path / "backups" / "backup.db")
+
+
+def _count_markers(engine):
+    with engine.connect() as conn:
+        return conn.execute(
+            text("SELECT COUNT(*) FROM USER_TYPE WHERE type_name = 'marker'")
+        ).scalar()
+
+
+def test_backup_rotation(test_db, test_db_path, backup_path):
+    """Test de la sauvegarde et de la rotation des sauvegardes"""
+    first = backup_database(
+        db_path=test_db_path, backup_path=backup_path, pages=4, keep=2
+    )
+    second = backup_database(db_path=test_db_path, backup_path=backup_path, keep=2)
+    third = backup_database(db_path=test_db_path, backup_path=backup_path, keep=2)
+
+    assert first and second and third
+    backups = list_backups(backup_path)
+    assert backups == [third, second]
+    assert not Path(first).exists()
+    assert not list(Path(backup_path).parent.glob("*.partial"))
+
+
+def test_restore_backup(test_db, test_db_path, backup_path):
+    """Test de la restauration de la sauvegarde la plus récente"""
+    assert backup_database(db_path=test_db_path, backup_path=backup_path)
+
+    with test_db.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO USER_TYPE (id_user_type, type_name) VALUES (92, 'marker')"
+            )
+        )
+    assert _count_markers(test_db) == 1
+
+    assert restore_backup(db_path=test_db_path, backup_path=backup_path)
+    assert _count_markers(test_db) == 0
+
+
+def test_restore_without_backup(test_db, test_db_path, backup_path):
+    """Test de la restauration sans sauvegarde disponible"""
+    assert restore_backup(db_path=test_db_path, backup_path=backup_path) is False
+
+
+def test_backup_gives_up_under_continuous_writes(test_db, test_db_path, backup_path):
+    """Test que la sauvegarde est abandonnée si des écritures la relancent sans fin"""
+    stop = threading.Event()
+
+    def _write():
+        with closing(sqlite3.connect(test_db_path, isolation_level=None)) as conn:
+            while not stop.is_set():
+                conn.execute("UPDATE PATIENT SET bmi = bmi WHERE id_patient = 1")
+                stop.wait(0.002)
+
+    writer = threading.Thread(target=_write)
+    writer.start()
+    try:
+        snapshot = backup_database(
+            db_path=test_db_path,
+            backup_path=backup_path,
+            pages=1,
+            sleep=0.01,
+            max_restarts=2,
+        )
+    finally:
+        stop.set()
+        writer.join()
+
+    assert snapshot is None
+    assert list_backups(backup_path) == []
+    assert not list(Path(backup_path).parent.glob("*.partial"))
+
+
+def test_backup_time_limit(test_db, test_db_path, backup_path):
+    """Test que la sauvegarde est abandonnée au-delà de sa durée maximale"""
+    snapshot = backup_database(
+        db_path=test_db_path, backup_path=backup_path, pages=1, max_duration=0
+    )
+    assert snapshot is None
+    assert not list(Path(backup_path).parent.glob("*.partial"))
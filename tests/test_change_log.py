@@ -0,0 +1,94 @@
+"""Tests pour le module change_log.py"""
+
+import pytest
+from sqlalchemy import text
+
+from modules.change_log import (
+    disable_change_tracking,
+    enable_change_tracking,
+    get_change_sequence,
+    get_patient_changes,
+    has_change_tracking,
+    prune_patient_changes,
+)
+from modules.db_loader import load_patient_data, upgrade_database
+
+
+@pytest.fixture
+def test_db(test_db):
+    """Fixture pour créer une base de test avec le journal activé"""
+    assert enable_change_tracking(test_db)
+    return test_db
+
+
+def test_change_tracking_lifecycle(test_db):
+    """Test de l'activation et de la désactivation du journal"""
+    assert has_change_tracking(test_db)
+    assert get_change_sequence(test_db) == 0
+
+    assert disable_change_tracking(test_db)
+    assert not has_change_tracking(test_db)
+
+
+def test_get_patient_changes(test_db):
+    """Test du delta retourné après insertions, mises à jour et suppressions"""
+    changes, since = get_patient_changes(test_db)
+    assert changes.empty and since == 0
+
+    load_patient_data(test_db, nb_patients=20, seed=1)
+    changes, since = get_patient_changes(test_db, columns=["age", "smoker"])
+    assert len(changes) == 20
+    assert list(changes.columns) == ["seq", "deleted", "age", "smoker"]
+    assert changes["seq"].is_monotonic_increasing
+    assert since == get_change_sequence(test_db)
+
+    with test_db.begin() as conn:
+        conn.execute(text("UPDATE PATIENT SET age = 99 WHERE rowid = 1"))
+        conn.execute(text("UPDATE PATIENT SET age = 98 WHERE rowid = 1"))
+        conn.execute(text("DELETE FROM PATIENT WHERE rowid = 2"))
+
+    changes, last = get_patient_changes(test_db, since=since)
+    assert last == since + 3
+    assert list(changes.index) == [1, 2]
+    assert changes.loc[1, "age"] == 98 and not changes.loc[1, "deleted"]
+    assert changes.loc[2, "deleted"]
+
+    assert get_patient_changes(test_db, since=last)[0].empty
+    assert prune_patient_changes(test_db, since) == 20
+    assert len(get_patient_changes(test_db)[0]) == 2
+
+
+def test_patient_changes_follow_id_change(test_db):
+    """Test d'un changement de id_patient : l'ancien ID est journalisé supprimé"""
+    since = get_change_sequence(test_db)
+    with test_db.begin() as conn:
+        conn.execute(text("UPDATE PATIENT SET id_patient = 5000 WHERE id_patient = 1"))
+
+    changes, _ = get_patient_changes(test_db, since=since, columns=["age"])
+    assert list(changes.index) == [1, 5000]
+    assert changes.loc[1, "deleted"]
+    assert not changes.loc[5000, "deleted"]
+
+
+def test_change_log_trigger_upgraded(test_db):
+    """Test que la migration v4 remplace l'ancien trigger de mise à jour"""
+    with test_db.begin() as conn:
+        conn.execute(text("DROP TRIGGER trg_patient_changes_update"))
+        conn.execute(
+            text(
+                """
+                CREATE TRIGGER trg_patient_changes_update AFTER UPDATE ON PATIENT
+                BEGIN
+                    INSERT INTO PATIENT_CHANGES (patient_rowid, operation)
+                    VALUES (NEW.rowid, 'U');
+                END
+                """
+            )
+        )
+        conn.execute(text("PRAGMA user_version = 3"))
+
+    assert upgrade_database(test_db)
+    since = get_change_sequence(test_db)
+    with test_db.begin() as conn:
+        conn.execute(text("UPDATE PATIENT SET id_patient = 5000 WHERE id_patient = 1"))
+    assert get_patient_changes(test_db, since=since)[0].loc[1, "deleted"]
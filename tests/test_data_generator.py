@@ -0,0 +1,34 @@
+"""Tests pour le module data_generator.py"""
+
+from sqlalchemy import text
+
+from models.data_generator import MedicalDataGenerator
+from modules.db_loader import get_database_fingerprint
+from modules.patient_frame import load_patient_frame
+
+
+def _names(engine):
+    with engine.connect() as conn:
+        return conn.execute(
+            text("SELECT prenom, nom FROM PATIENT ORDER BY rowid")
+        ).fetchall()
+
+
+def test_initialize_name_columns(test_db):
+    """Test du remplissage des noms manquants, par rowid"""
+    expected = load_patient_frame(test_db)
+    MedicalDataGenerator(test_db, seed=42)
+
+    names = _names(test_db)
+    assert len(names) == len(expected)
+    assert all(prenom and nom for prenom, nom in names)
+    assert load_patient_frame(test_db).equals(expected)
+    assert get_database_fingerprint(test_db) is not None
+
+    # Seuls les noms manquants sont complétés
+    with test_db.begin() as conn:
+        conn.execute(text("UPDATE PATIENT SET nom = NULL WHERE rowid = 1"))
+    MedicalDataGenerator(test_db, seed=1)
+    updated = _names(test_db)
+    assert updated[0][0] == names[0][0] and updated[0][1]
+    assert updated[1:] == names[1:]
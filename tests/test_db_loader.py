@@ -1,10 +1,40 @@
 import os
+import sqlite3
 import sys
+from contextlib import closing
 from pathlib import Path
 import uuid
 import pytest
+import pandas as pd
 from sqlalchemy import text
-from modules.db_loader import create_database, get_reference_id, load_patient_data
+from sqlalchemy.exc import OperationalError
+from config import DB_CONFIG
+import modules.db_loader as db_loader
+from modules.db_loader import (
+    create_database,
+    APPLICATION_ID,
+    SCHEMA_VERSION,
+    SCHEMA_INDEXES,
+    ReferenceCache,
+    dispose_engines,
+    drop_triggers,
+    explain_hot_queries,
+    get_database_fingerprint,
+    get_engine,
+    get_readonly_engine,
+    initialize_database,
+    is_database_valid,
+    get_reference_cache,
+    get_reference_id,
+    get_similar_profiles,
+    get_sqlite_profile,
+    has_triggers,
+    install_triggers,
+    load_csv_patient_data,
+    load_patient_data,
+    rebuild_database,
+    split_sql_script,
+)
 
 # Ajout du chemin du projet au PYTHONPATH
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -50,6 +80,7 @@ def test_create_database(test_db):
             "PATIENT",
             "USER_ACCOUNT",
             "manages",
+            "DB_METADATA",
         ]
         result = conn.execute(
             text(
@@ -153,3 +184,582 @@ def test_admin_account_created(test_db):
         assert result is not None
         assert result.username == "seb"
         assert result.type_name == "admin"
+
+
+def test_load_patient_data_nb_patients_and_seed(test_db):
+    """Test du chargement vectorisé : nombre de lignes et reproductibilité"""
+    query = text(
+        "SELECT age, bmi, nb_children, insurance_cost, id_sex, id_smoking_status, "
+        "id_region FROM PATIENT ORDER BY rowid DESC LIMIT 250"
+    )
+
+    with test_db.connect() as conn:
+        count_before = conn.execute(text("SELECT COUNT(*) FROM PATIENT")).scalar()
+
+    assert load_patient_data(test_db, nb_patients=250, seed=42, chunk_size=100) == 250
+    with test_db.connect() as conn:
+        first_run = conn.execute(query).fetchall()
+
+    assert load_patient_data(test_db, nb_patients=250, seed=42) == 250
+    with test_db.connect() as conn:
+        second_run = conn.execute(query).fetchall()
+        count_after = conn.execute(text("SELECT COUNT(*) FROM PATIENT")).scalar()
+
+    assert count_after == count_before + 500
+    assert first_run == second_run
+    assert all(18 <= row.age <= 65 for row in first_run)
+    assert all(0 <= row.nb_children <= 5 for row in first_run)
+
+
+def test_load_csv_patient_data(test_db, tmp_path):
+    """Test de l'import CSV en streaming avec conversion des libellés"""
+    csv_path = tmp_path / "claims.csv"
+    csv_path.write_text(
+        "age,sex,bmi,children,smoker,region,charges\n"
+        "19,female,27.9,0,yes,southwest,16884.924\n"
+        "18,male,33.77,1,no,southeast,1725.5523\n"
+        "28,Male,33,3,no,northeast,4449.462\n"
+        "40,unknown,25,1,no,southeast,5000\n",
+        encoding="utf-8",
+    )
+
+    with test_db.connect() as conn:
+        count_before = conn.execute(text("SELECT COUNT(*) FROM PATIENT")).scalar()
+
+    # Petits blocs pour vérifier le découpage
+    assert load_csv_patient_data(test_db, str(csv_path), chunk_size=2) == 3
+
+    with test_db.connect() as conn:
+        count_after = conn.execute(text("SELECT COUNT(*) FROM PATIENT")).scalar()
+        rows = conn.execute(
+            text(
+                """
+                SELECT p.age, p.nb_children, s.sex_type, sm.smoking_status,
+                       r.region_name, p.insurance_cost
+                FROM PATIENT p
+                JOIN SEX s ON p.id_sex = s.id_sex
+                JOIN SMOKING sm ON p.id_smoking_status = sm.id_smoking_status
+                JOIN REGION r ON p.id_region = r.id_region
+                ORDER BY p.rowid DESC LIMIT 3
+                """
+            )
+        ).fetchall()
+
+    assert count_after == count_before + 3
+    assert rows[-1] == (19, 0, "female", "yes", "southwest", 16884.92)
+    assert rows[0][2] == "male"
+
+
+def test_insurance_csv_loaded(test_db):
+    """Test que seul data/insurance.csv est chargé par défaut à l'initialisation"""
+    with test_db.connect() as conn:
+        count = conn.execute(text("SELECT COUNT(*) FROM PATIENT")).scalar()
+    assert count == 1338
+
+
+def test_initialize_database_synthetic_opt_in(tmp_path):
+    """Test que les patients synthétiques ne sont ajoutés que sur demande"""
+    engine = db_loader.build_engine(str(tmp_path / "test_medical_costs_synthetic.db"))
+    try:
+        assert initialize_database(engine, nb_patients=50)
+        with engine.connect() as conn:
+            count = conn.execute(text("SELECT COUNT(*) FROM PATIENT")).scalar()
+        assert count == 1338 + 50
+    finally:
+        engine.dispose()
+
+
+def test_sqlite_profile_applied(test_db):
+    """Test que le profil de performance est appliqué à chaque connexion"""
+    expected = get_sqlite_profile()
+    with test_db.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == (
+            expected["cache_size"]
+        )
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == (
+            expected["busy_timeout"]
+        )
+
+
+def test_sqlite_bulk_load_profile(tmp_path):
+    """Test du profil de chargement en masse et d'un profil inconnu"""
+    db_path = tmp_path / "test_medical_costs_bulk.db"
+    engine = create_database(db_path=str(db_path), profile="bulk_load")
+    try:
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 0
+            assert conn.execute(text("PRAGMA temp_store")).scalar() == 2
+    finally:
+        engine.dispose()
+
+    with pytest.raises(ValueError):
+        get_sqlite_profile("inconnu")
+
+
+def test_sqlite_profile_overrides(monkeypatch):
+    """Test du remplacement de valeurs d'un profil par la configuration"""
+    monkeypatch.setitem(
+        db_loader.DB_CONFIG, "profile_overrides", {"bulk_load": {"mmap_size": 4096}}
+    )
+    profile = get_sqlite_profile("bulk_load")
+    assert profile["mmap_size"] == 4096
+    assert (
+        profile["synchronous"] == db_loader.SQLITE_PROFILES["bulk_load"]["synchronous"]
+    )
+    assert get_sqlite_profile("dashboard") == db_loader.SQLITE_PROFILES["dashboard"]
+
+
+def test_get_engine_registry(tmp_path):
+    """Test que le registre retourne un seul engine poolé par base"""
+    db_path = str(tmp_path / "test_medical_costs_registry.db")
+    try:
+        engine = get_engine(db_path=db_path)
+        assert engine is not None
+        assert get_engine(db_path=db_path) is engine
+        assert engine.pool.size() == DB_CONFIG["max_connections"]
+        assert engine.pool.timeout() == DB_CONFIG["timeout"]
+    finally:
+        dispose_engines(db_path)
+
+    # Après libération, un nouvel engine est construit
+    try:
+        assert get_engine(db_path=db_path) is not engine
+    finally:
+        dispose_engines(db_path)
+
+
+def test_schema_stamp_and_fingerprint(test_db):
+    """Test de la version de schéma et de l'empreinte inscrites dans la base"""
+    with test_db.connect() as conn:
+        assert conn.execute(text("PRAGMA user_version")).scalar() == SCHEMA_VERSION
+        assert conn.execute(text("PRAGMA application_id")).scalar() == APPLICATION_ID
+    assert is_database_valid(test_db)
+
+    # L'empreinte change avec les données
+    fingerprint = get_database_fingerprint(test_db)
+    assert fingerprint
+    load_patient_data(test_db, nb_patients=10, seed=1)
+    assert get_database_fingerprint(test_db) != fingerprint
+
+
+def test_fingerprint_tracks_updates(test_db):
+    """Test qu'une modification ordinaire d'une colonne change l'empreinte"""
+    fingerprint = get_database_fingerprint(test_db)
+    with test_db.begin() as conn:
+        conn.execute(text("UPDATE PATIENT SET bmi = bmi + 1 WHERE id_patient = 1"))
+    updated = get_database_fingerprint(test_db)
+    assert updated != fingerprint
+
+    with test_db.begin() as conn:
+        conn.execute(text("UPDATE PATIENT SET id_region = 2 WHERE id_patient = 1"))
+    assert get_database_fingerprint(test_db) not in (fingerprint, updated)
+
+
+def test_partial_database_invalid(tmp_path):
+    """Test qu'une base sans en-tête de schéma est invalide puis reconstruite"""
+    db_path = tmp_path / "test_medical_costs_partial.db"
+    engine = create_database(db_path=str(db_path))
+    with engine.begin() as conn:
+        conn.execute(text("PRAGMA user_version = 0"))
+        conn.execute(text("DROP TABLE manages"))
+    assert not is_database_valid(engine)
+    engine.dispose()
+
+    # La migration échoue (table manquante) : la base est recréée
+    engine = create_database(db_path=str(db_path))
+    try:
+        assert is_database_valid(engine)
+        with engine.connect() as conn:
+            assert conn.execute(
+                text("SELECT COUNT(*) FROM sqlite_master WHERE name = 'manages'")
+            ).scalar()
+    finally:
+        engine.dispose()
+
+
+def test_legacy_database_upgraded(tmp_path):
+    """Test qu'une base existante complète est migrée sans être recréée"""
+    db_path = tmp_path / "test_medical_costs_legacy.db"
+    engine = create_database(db_path=str(db_path))
+    with engine.begin() as conn:
+        # Base antérieure au schéma v1 : ni DB_METADATA ni triggers associés
+        for (name,) in conn.execute(
+            text(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+                "AND name LIKE 'trg_data_version_%'"
+            )
+        ).fetchall():
+            conn.execute(text(f"DROP TRIGGER {name}"))
+        conn.execute(text("DROP TABLE DB_METADATA"))
+        conn.execute(text("PRAGMA user_version = 0"))
+        conn.execute(text("PRAGMA application_id = 0"))
+        conn.execute(
+            text(
+                "INSERT INTO USER_TYPE (id_user_type, type_name) VALUES (90, 'legacy')"
+            )
+        )
+    engine.dispose()
+
+    engine = create_database(db_path=str(db_path))
+    try:
+        assert is_database_valid(engine)
+        assert get_database_fingerprint(engine)
+        with engine.connect() as conn:
+            assert conn.execute(
+                text("SELECT COUNT(*) FROM USER_TYPE WHERE type_name = 'legacy'")
+            ).scalar()
+    finally:
+        engine.dispose()
+
+
+def test_hot_queries_use_indexes(test_db):
+    """Test que les plans des requêtes fréquentes utilisent les index"""
+    report = explain_hot_queries(test_db)
+    for name, result in report.items():
+        assert result["uses_index"], f"{name} : {result['plan']}"
+    assert "COVERING INDEX" in " ".join(report["similar_profiles"]["plan"])
+
+
+def test_get_similar_profiles(test_db):
+    """Test des profils similaires servis par l'index couvrant"""
+    similar = get_similar_profiles(test_db, "yes", 40, 30.0)
+    with test_db.connect() as conn:
+        expected = conn.execute(
+            text(
+                """
+                SELECT COUNT(*) FROM PATIENT p
+                JOIN SMOKING sm ON p.id_smoking_status = sm.id_smoking_status
+                WHERE sm.smoking_status = 'yes'
+                AND p.age BETWEEN 35 AND 45 AND p.bmi BETWEEN 28 AND 32
+                """
+            )
+        ).scalar()
+    assert len(similar) == expected
+    assert list(similar.columns) == ["age", "bmi", "insurance_cost"]
+
+
+def test_indexes_added_by_upgrade(tmp_path):
+    """Test que la migration ajoute les index à une base existante"""
+    db_path = tmp_path / "test_medical_costs_indexes.db"
+    engine = create_database(db_path=str(db_path))
+    with engine.begin() as conn:
+        for name in SCHEMA_INDEXES:
+            conn.execute(text(f"DROP INDEX {name}"))
+        conn.execute(text("PRAGMA user_version = 1"))
+    engine.dispose()
+
+    engine = create_database(db_path=str(db_path))
+    try:
+        with engine.connect() as conn:
+            indexes = {
+                row[0]
+                for row in conn.execute(
+                    text("SELECT name FROM sqlite_master WHERE type = 'index'")
+                )
+            }
+        assert set(SCHEMA_INDEXES) <= indexes
+        assert all(
+            result["uses_index"] for result in explain_hot_queries(engine).values()
+        )
+    finally:
+        engine.dispose()
+
+
+def test_reference_cache(test_db):
+    """Test du cache de références : dictionnaires et conversion vectorisée"""
+    cache = get_reference_cache(test_db)
+    assert get_reference_cache(test_db) is cache
+
+    male_id = cache.get_id("sex", "male")
+    assert male_id == get_reference_id(test_db, "sex", "sex_type", "male")
+    assert cache.get_label("sex", male_id) == "male"
+    assert cache.get_id("region", "nowhere") is None
+
+    codes = cache.codes_for("smoker", pd.Series(["yes", "no", "yes", "maybe"]))
+    assert codes.dtype == "Int64"
+    assert codes.isna().tolist() == [False, False, False, True]
+    assert cache.labels_for("smoker", codes.dropna()).tolist() == ["yes", "no", "yes"]
+
+    with pytest.raises(KeyError):
+        cache.codes_for("unknown", pd.Series(["x"]))
+
+
+def test_reference_cache_invalidated_by_fingerprint(test_db):
+    """Test que le cache est rechargé quand l'empreinte de la base change"""
+    cache = ReferenceCache(test_db, ttl=0)
+    assert cache.get_id("user_type", "auditor") is None
+
+    with test_db.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO USER_TYPE (id_user_type, type_name) VALUES (91, 'auditor')"
+            )
+        )
+    # Le compteur de modifications change l'empreinte : le cache est rechargé
+    assert cache.get_id("user_type", "auditor") is not None
+
+
+def test_split_sql_script():
+    """Test du découpage d'un script SQL contenant des ';' imbriqués"""
+    script = """
+    CREATE TABLE T(a TEXT);
+    INSERT INTO T VALUES ('x;y');
+    CREATE TRIGGER trg AFTER INSERT ON T BEGIN
+        DELETE FROM T WHERE a = 'z';
+    END;
+    """
+    statements = split_sql_script(script)
+    assert len(statements) == 3
+    assert statements[1] == "INSERT INTO T VALUES ('x;y');"
+    assert statements[2].endswith("END;")
+
+
+def test_initialize_database_atomic(tmp_path, monkeypatch):
+    """Test que l'initialisation est annulée entièrement en cas d'erreur"""
+
+    def failing_load(*args, **kwargs):
+        raise RuntimeError("échec simulé")
+
+    monkeypatch.setattr(db_loader, "load_patient_data", failing_load)
+    engine = db_loader.build_engine(str(tmp_path / "test_medical_costs_atomic.db"))
+    try:
+        assert initialize_database(engine, nb_patients=10) is False
+        with engine.connect() as conn:
+            tables = conn.execute(
+                text("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'")
+            ).scalar()
+        assert tables == 0
+        assert not is_database_valid(engine)
+    finally:
+        engine.dispose()
+
+
+def test_rebuild_database_replaces_live_content(tmp_path):
+    """Test de la reconstruction par fichier temporaire copié dans la base"""
+    db_path = tmp_path / "test_medical_costs_rebuild.db"
+    engine = get_engine(db_path=str(db_path))
+    try:
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    "INSERT INTO USER_TYPE (id_user_type, type_name) VALUES (92, 'marker')"
+                )
+            )
+
+        assert rebuild_database(db_path=str(db_path), nb_patients=200)
+        assert not list(tmp_path.glob("*.rebuild*"))
+
+        # L'engine existant lit la nouvelle base sans reconnexion
+        with engine.connect() as conn:
+            markers = conn.execute(
+                text("SELECT COUNT(*) FROM USER_TYPE WHERE type_name = 'marker'")
+            ).scalar()
+            patients = conn.execute(text("SELECT COUNT(*) FROM PATIENT")).scalar()
+        assert markers == 0
+        assert patients == 1338 + 200
+        assert is_database_valid(engine)
+    finally:
+        dispose_engines(str(db_path))
+
+
+def test_rebuild_database_with_open_reader(tmp_path):
+    """Test que la reconstruction aboutit pendant qu'un lecteur reste connecté"""
+    db_path = tmp_path / "test_medical_costs_rebuild_reader.db"
+    engine = create_database(db_path=str(db_path))
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO USER_TYPE (id_user_type, type_name) VALUES (92, 'marker')"
+            )
+        )
+    engine.dispose()
+
+    query = "SELECT COUNT(*) FROM USER_TYPE WHERE type_name = 'marker'"
+    dashboard = get_readonly_engine(db_path=str(db_path), immutable=False)
+    try:
+        # Connexion du pool de lecture restée ouverte, inactive
+        with dashboard.connect() as conn:
+            assert conn.execute(text(query)).scalar() == 1
+
+        with closing(sqlite3.connect(db_path, isolation_level=None)) as reader:
+            # Lecteur d'un autre processus au milieu d'une transaction
+            reader.execute("BEGIN")
+            assert reader.execute(query).fetchone()[0] == 1
+
+            assert rebuild_database(db_path=str(db_path), nb_patients=10)
+
+            # Le lecteur garde son instantané, puis voit la nouvelle base
+            assert reader.execute(query).fetchone()[0] == 1
+            reader.execute("COMMIT")
+            assert reader.execute(query).fetchone()[0] == 0
+
+        with dashboard.connect() as conn:
+            assert conn.execute(text(query)).scalar() == 0
+        assert not list(tmp_path.glob("*.rebuild*"))
+    finally:
+        dispose_engines(str(db_path))
+
+
+def test_rebuild_database_failure_keeps_live_file(tmp_path, monkeypatch):
+    """Test qu'un échec de reconstruction laisse la base en service intacte"""
+    db_path = tmp_path / "test_medical_costs_rebuild_ko.db"
+    engine = create_database(db_path=str(db_path))
+    engine.dispose()
+    inode = db_path.stat().st_ino
+
+    monkeypatch.setattr(db_loader, "initialize_database", lambda *args, **kwargs: False)
+    assert rebuild_database(db_path=str(db_path)) is False
+    assert db_path.stat().st_ino == inode
+    assert not list(tmp_path.glob("*.rebuild*"))
+
+
+def test_trigger_helpers(test_db):
+    """Test de l'installation tout-ou-rien des objets d'une fonctionnalité"""
+    objects = (("TRIGGER", "trg_test_insert"), ("TABLE", "TEST_LOG"))
+    ddl = (
+        "CREATE TABLE TEST_LOG(patient_rowid INTEGER)",
+        """
+        CREATE TRIGGER trg_test_insert AFTER INSERT ON PATIENT
+        BEGIN
+            INSERT INTO TEST_LOG VALUES (NEW.rowid);
+        END
+        """,
+    )
+
+    def _failing_populate(conn):
+        raise RuntimeError("échec du remplissage")
+
+    assert not install_triggers(test_db, "TEST_LOG", ddl, _failing_populate)
+    assert not has_triggers(test_db, objects)
+
+    assert install_triggers(test_db, "TEST_LOG", ddl)
+    assert has_triggers(test_db, objects)
+    assert drop_triggers(test_db, "TEST_LOG", objects)
+    assert not has_triggers(test_db, objects)
+
+
+def test_readonly_engine(tmp_path):
+    """Test de l'engine en lecture seule : lectures, écritures refusées"""
+    db_path = str(tmp_path / "test_medical_costs_readonly.db")
+    assert get_readonly_engine(db_path=db_path) is None
+    assert not os.path.exists(db_path)
+
+    writer = create_database(db_path=db_path)
+    try:
+        reader = get_readonly_engine(db_path=db_path)
+        assert reader is not None and get_readonly_engine(db_path=db_path) is reader
+        assert get_database_fingerprint(reader) == get_database_fingerprint(writer)
+
+        with pytest.raises(OperationalError):
+            with reader.begin() as conn:
+                conn.execute(text("DELETE FROM PATIENT"))
+
+        # Les écritures de l'engine principal sont visibles des lecteurs
+        load_patient_data(writer, nb_patients=10)
+        with reader.connect() as conn:
+            assert conn.execute(text("PRAGMA query_only")).scalar() == 1
+            count = conn.execute(text("SELECT COUNT(*) FROM PATIENT")).scalar()
+        with writer.connect() as conn:
+            assert conn.execute(text("SELECT COUNT(*) FROM PATIENT")).scalar() == count
+
+        # Fichier figé : lecture sans verrou
+        with writer.connect() as conn:
+            conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+        frozen = get_readonly_engine(db_path=db_path, immutable=True)
+        assert "immutable=1" in str(frozen.url)
+        assert get_database_fingerprint(frozen) == get_database_fingerprint(writer)
+    finally:
+        writer.dispose()
+        dispose_engines(db_path)
+
+
+LEGACY_V2_SCHEMA = """
+CREATE TABLE SEX(id_sex INTEGER PRIMARY KEY AUTOINCREMENT, sex_type VARCHAR(50));
+CREATE TABLE SMOKING(
+   id_smoking_status INTEGER PRIMARY KEY AUTOINCREMENT, smoking_status VARCHAR(50)
+);
+CREATE TABLE REGION(id_region INTEGER PRIMARY KEY AUTOINCREMENT, region_name VARCHAR(50));
+CREATE TABLE USER_TYPE(id_user_type INTEGER PRIMARY KEY AUTOINCREMENT, type_name VARCHAR(50));
+CREATE TABLE PATIENT(
+   id_patient VARCHAR(50), age INT, nb_children INT, bmi DECIMAL(15,2),
+   insurance_cost DECIMAL(15,2), id_region INT NOT NULL,
+   id_smoking_status INT NOT NULL, id_sex INT NOT NULL, prenom TEXT,
+   PRIMARY KEY(id_patient)
+);
+CREATE INDEX idx_patient_sex ON PATIENT(id_sex);
+CREATE INDEX idx_patient_region ON PATIENT(id_region);
+CREATE INDEX idx_patient_smoking_age_bmi
+   ON PATIENT(id_smoking_status, age, bmi, insurance_cost);
+CREATE TABLE USER_ACCOUNT(
+   id_user_account INTEGER PRIMARY KEY AUTOINCREMENT,
+   username VARCHAR(50) UNIQUE NOT NULL, email VARCHAR(100),
+   password_hash VARCHAR(255) NOT NULL,
+   created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+   updated_at DATETIME DEFAULT CURRENT_TIMESTAMP, id_user_type INT NOT NULL
+);
+CREATE TABLE manages(
+   id_patient VARCHAR(50), id_user_account INT,
+   PRIMARY KEY(id_patient, id_user_account)
+);
+CREATE INDEX idx_manages_user_account ON manages(id_user_account);
+CREATE TABLE DB_METADATA(key VARCHAR(50) PRIMARY KEY, value VARCHAR(255));
+INSERT INTO SEX (sex_type) VALUES ('male'), ('female');
+INSERT INTO SMOKING (smoking_status) VALUES ('yes'), ('no');
+INSERT INTO REGION (region_name)
+   VALUES ('southwest'), ('southeast'), ('northwest'), ('northeast');
+INSERT INTO USER_TYPE (type_name) VALUES ('admin'), ('user');
+INSERT INTO USER_ACCOUNT (username, password_hash, id_user_type)
+   VALUES ('seb', 'hash', 1);
+INSERT INTO PATIENT VALUES ('EXT-1', 30, 0, 22.5, 1000.0, 1, 2, 1, 'Ana');
+INSERT INTO PATIENT VALUES (NULL, 40, 2, 31.0, 5000.0, 2, 1, 2, NULL);
+INSERT INTO PATIENT VALUES (NULL, 50, 1, 27.0, 9000.0, 3, 2, 1, NULL);
+DELETE FROM PATIENT WHERE age = 40;
+INSERT INTO manages VALUES ('EXT-1', 1);
+PRAGMA application_id = 1229144369;
+PRAGMA user_version = 2;
+"""
+
+
+def test_schema_v2_migrated_to_integer_keys(tmp_path):
+    """Test de la migration v2 -> v3 : clé entière, références WITHOUT ROWID"""
+    from modules.patient_flat import enable_patient_flat, has_patient_flat
+
+    db_path = tmp_path / "test_medical_costs_v2.db"
+    with closing(sqlite3.connect(db_path)) as raw_conn:
+        raw_conn.executescript(LEGACY_V2_SCHEMA)
+    engine = db_loader.build_engine(str(db_path))
+    assert enable_patient_flat(engine)
+    engine.dispose()
+
+    engine = create_database(db_path=str(db_path))
+    try:
+        assert is_database_valid(engine)
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text(
+                    "SELECT rowid, id_patient, external_id, age, prenom "
+                    "FROM PATIENT ORDER BY id_patient"
+                )
+            ).fetchall()
+            assert [tuple(row) for row in rows] == [
+                (1, 1, "EXT-1", 30, "Ana"),
+                (3, 3, None, 50, None),
+            ]
+            assert conn.execute(text("SELECT * FROM manages")).fetchall() == [(1, 1)]
+            schema = dict(
+                conn.execute(text("SELECT name, sql FROM sqlite_master")).fetchall()
+            )
+        for table in ["SEX", "SMOKING", "REGION", "USER_TYPE", "manages"]:
+            assert schema[table].endswith("WITHOUT ROWID")
+        assert "idx_patient_external_id" in schema
+        assert set(SCHEMA_INDEXES) <= set(schema)
+
+        # Les triggers de PATIENT_FLAT survivent à la reconstruction de PATIENT
+        assert has_patient_flat(engine)
+        load_patient_data(engine, nb_patients=5, seed=1)
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT COUNT(*) FROM PATIENT_FLAT")).scalar() == 7
+        assert get_reference_id(engine, "SMOKING", "smoking_status", "no") == 2
+    finally:
+        engine.dispose()
@@ -0,0 +1,93 @@
+"""Tests pour le module maintenance.py"""
+
+import sqlite3
+from contextlib import closing
+
+from sqlalchemy import text
+
+from modules.db_loader import DB_CONFIG
+from modules.maintenance import (
+    get_database_health,
+    list_maintenance_runs,
+    run_maintenance,
+)
+
+
+def _delete_patients(engine):
+    with engine.begin() as conn:
+        last = conn.execute(text("SELECT MAX(id_patient) FROM PATIENT")).scalar()
+        conn.execute(
+            text("DELETE FROM PATIENT WHERE id_patient > :first"),
+            {"first": last // 2},
+        )
+
+
+def test_database_health(test_db, test_db_path, tmp_path):
+    """Test des mesures de fragmentation et de WAL"""
+    health = get_database_health(db_path=test_db_path)
+
+    assert health["page_count"] > 0
+    assert 0 <= health["fragmentation"] < 1
+    assert health["has_statistics"]
+    assert health["wal_bytes"] >= 0
+    assert get_database_health(db_path=str(tmp_path / "absente.db")) is None
+
+
+def _checkpoint(db_path):
+    """Reporte le WAL dans le fichier de base, qui contient alors les pages libres"""
+    with closing(sqlite3.connect(db_path)) as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def test_full_vacuum_enables_incremental(test_db, test_db_path):
+    """Test du VACUUM complet puis des VACUUM incrémentaux"""
+    _delete_patients(test_db)
+    _checkpoint(test_db_path)
+
+    report = run_maintenance(db_path=test_db_path, full_vacuum=True)
+    assert report["completed"]
+    assert report["steps"] == ["vacuum", "optimize", "wal_checkpoint"]
+    assert report["bytes_freed"] > 0
+    health = get_database_health(db_path=test_db_path)
+    assert health["auto_vacuum"] == "INCREMENTAL"
+    assert health["freelist_count"] == 0
+
+    _delete_patients(test_db)
+    assert get_database_health(db_path=test_db_path)["freelist_count"] > 0
+    report = run_maintenance(db_path=test_db_path)
+    assert "incremental_vacuum" in report["steps"]
+    assert get_database_health(db_path=test_db_path)["freelist_count"] == 0
+
+    runs = list_maintenance_runs(db_path=test_db_path)
+    assert len(runs) == 2
+    assert runs[0]["steps"] == report["steps"]
+    assert runs[1]["steps"][0] == "vacuum"
+
+
+def test_incremental_vacuum_unavailable(test_db, test_db_path):
+    """Test d'une base sans auto_vacuum : l'étape est sautée"""
+    _delete_patients(test_db)
+
+    report = run_maintenance(db_path=test_db_path)
+    assert report["skipped"] == ["incremental_vacuum"]
+    assert not report["completed"]
+    assert report["steps"] == ["optimize"]
+
+
+def test_exhausted_budget_skips_steps(test_db, test_db_path):
+    """Test du budget de temps : aucune étape lancée une fois l'échéance passée"""
+    report = run_maintenance(db_path=test_db_path, time_budget=0)
+
+    assert report["steps"] == []
+    assert report["skipped"] == ["optimize"]
+    assert list_maintenance_runs(db_path=test_db_path)[0]["completed"] is False
+
+
+def test_wal_truncation_not_counted(test_db, test_db_path, monkeypatch):
+    """Test que la troncature du WAL n'est pas comptée comme espace libéré"""
+    monkeypatch.setitem(DB_CONFIG, "maintenance", {"wal_checkpoint_mb": 0})
+    assert get_database_health(db_path=test_db_path)["wal_bytes"] > 0
+
+    report = run_maintenance(db_path=test_db_path)
+    assert "wal_checkpoint" in report["steps"]
+    assert report["bytes_freed"] == 0
@@ -0,0 +1,93 @@
+"""Tests pour le module patient_flat.py"""
+
+import pytest
+from sqlalchemy import text
+
+from modules.db_loader import load_patient_data, upgrade_database
+from modules.patient_flat import (
+    disable_patient_flat,
+    enable_patient_flat,
+    has_patient_flat,
+)
+
+
+@pytest.fixture
+def test_db(test_db):
+    """Fixture pour créer une base de test avec PATIENT_FLAT activée"""
+    assert enable_patient_flat(test_db)
+    return test_db
+
+
+def _mismatches(engine):
+    """Nombre de lignes différentes entre PATIENT et PATIENT_FLAT"""
+    with engine.connect() as conn:
+        return conn.execute(
+            text(
+                """
+                SELECT COUNT(*) FROM (
+                    SELECT rowid, age, nb_children, bmi, insurance_cost,
+                           id_sex, id_smoking_status, id_region FROM PATIENT
+                    EXCEPT
+                    SELECT patient_rowid, age, nb_children, bmi, insurance_cost,
+                           sex_code, smoker_code, region_code FROM PATIENT_FLAT
+                ) UNION ALL SELECT
+                    (SELECT COUNT(*) FROM PATIENT) - (SELECT COUNT(*) FROM PATIENT_FLAT)
+                """
+            )
+        ).fetchall()
+
+
+def test_patient_flat_synchronized(test_db):
+    """Test de la synchronisation par triggers sur INSERT, UPDATE et DELETE"""
+    assert has_patient_flat(test_db)
+    assert _mismatches(test_db) == [(0,), (0,)]
+
+    load_patient_data(test_db, nb_patients=50, seed=3)
+    with test_db.begin() as conn:
+        conn.execute(text("UPDATE PATIENT SET age = age + 1 WHERE rowid % 7 = 0"))
+        conn.execute(text("DELETE FROM PATIENT WHERE rowid % 11 = 0"))
+
+    assert _mismatches(test_db) == [(0,), (0,)]
+
+
+def test_patient_flat_follows_id_change(test_db):
+    """Test d'un changement de id_patient : la ligne suit le nouvel ID"""
+    with test_db.begin() as conn:
+        last = conn.execute(text("SELECT MAX(id_patient) FROM PATIENT")).scalar()
+        conn.execute(
+            text("UPDATE PATIENT SET id_patient = :new WHERE id_patient = 1"),
+            {"new": last + 1},
+        )
+
+    assert _mismatches(test_db) == [(0,), (0,)]
+
+
+def test_patient_flat_trigger_upgraded(test_db):
+    """Test que la migration v4 remplace l'ancien trigger de mise à jour"""
+    with test_db.begin() as conn:
+        conn.execute(text("DROP TRIGGER trg_patient_flat_update"))
+        conn.execute(
+            text(
+                """
+                CREATE TRIGGER trg_patient_flat_update AFTER UPDATE OF age ON PATIENT
+                BEGIN
+                    UPDATE PATIENT_FLAT SET age = NEW.age
+                    WHERE patient_rowid = NEW.rowid;
+                END
+                """
+            )
+        )
+        conn.execute(text("PRAGMA user_version = 3"))
+
+    assert upgrade_database(test_db)
+    with test_db.begin() as conn:
+        conn.execute(text("UPDATE PATIENT SET id_patient = 5000 WHERE id_patient = 1"))
+    assert _mismatches(test_db) == [(0,), (0,)]
+
+
+def test_disable_patient_flat(test_db):
+    """Test de la suppression de la table et des triggers"""
+    assert disable_patient_flat(test_db)
+    assert not has_patient_flat(test_db)
+    # Les écritures dans PATIENT fonctionnent sans la table dénormalisée
+    assert load_patient_data(test_db, nb_patients=5) == 5
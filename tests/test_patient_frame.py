@@ -0,0 +1,117 @@
+"""Tests pour le module patient_frame.py"""
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from modules.patient_flat import enable_patient_flat
+from modules.patient_frame import (
+    PATIENT_FRAME_COLUMNS,
+    iter_patient_frames,
+    load_patient_frame,
+    summarize_patients,
+    to_patient_frame,
+)
+
+
+def _joined_summary(engine):
+    with engine.connect() as conn:
+        return conn.execute(
+            text(
+                """
+                SELECT COUNT(*), SUM(p.age), SUM(sm.smoking_status = 'yes'),
+                       SUM(r.region_name = 'northeast')
+                FROM PATIENT p
+                JOIN SMOKING sm ON p.id_smoking_status = sm.id_smoking_status
+                JOIN REGION r ON p.id_region = r.id_region
+                """
+            )
+        ).fetchone()
+
+
+def test_load_patient_frame_dtypes(test_db):
+    """Test des dtypes compacts et du contenu du DataFrame"""
+    df = load_patient_frame(test_db)
+
+    assert tuple(df.columns) == PATIENT_FRAME_COLUMNS
+    assert df["age"].dtype == "int16"
+    assert df["nb_children"].dtype == "int8"
+    assert df["bmi"].dtype == "float32"
+    assert df["insurance_cost"].dtype == "float32"
+    for column in ["sex", "smoker", "region"]:
+        assert df[column].dtype == "category"
+    assert list(df["smoker"].cat.categories) == ["yes", "no"]
+
+    count, age_sum, smokers, northeast = _joined_summary(test_db)
+    assert len(df) == count
+    assert int(df["age"].sum()) == age_sum
+    assert (df["smoker"] == "yes").sum() == smokers
+    assert (df["region"] == "northeast").sum() == northeast
+
+
+def test_load_patient_frame_projection(test_db):
+    """Test de la projection de colonnes et des colonnes inconnues"""
+    df = load_patient_frame(test_db, columns=["region", "insurance_cost"])
+    assert list(df.columns) == ["insurance_cost", "region"]
+
+    with pytest.raises(ValueError):
+        load_patient_frame(test_db, columns=["prenom"])
+
+
+def test_load_patient_frame_from_flat_table(test_db):
+    """Test que la table dénormalisée donne le même résultat"""
+    expected = load_patient_frame(test_db)
+    assert enable_patient_flat(test_db)
+    df = load_patient_frame(test_db)
+
+    assert df.dtypes.equals(expected.dtypes)
+    assert df.reset_index(drop=True).equals(expected.reset_index(drop=True))
+
+
+def test_iter_patient_frames(test_db):
+    """Test que les blocs recomposent exactement le chargement complet"""
+    expected = load_patient_frame(test_db)
+    chunks = list(iter_patient_frames(test_db, chunk_size=300))
+
+    assert [len(chunk) for chunk in chunks[:-1]] == [300] * (len(chunks) - 1)
+    assert all(chunk.dtypes.equals(expected.dtypes) for chunk in chunks)
+    df = pd.concat(chunks)
+    assert df.index.is_monotonic_increasing and df.index.is_unique
+    assert df.reset_index(drop=True).equals(expected.reset_index(drop=True))
+
+    resumed = pd.concat(iter_patient_frames(test_db, after_rowid=chunks[0].index[-1]))
+    assert len(resumed) == len(expected) - 300
+
+
+def test_summarize_patients(test_db):
+    """Test des statistiques en flux contre le calcul en mémoire"""
+    df = load_patient_frame(test_db)
+    summary = summarize_patients(test_db, chunk_size=250)
+
+    cost = df["insurance_cost"].astype("float64")
+    assert summary["insurance_cost"]["count"] == len(df)
+    assert summary["insurance_cost"]["mean"] == pytest.approx(cost.mean())
+    assert summary["insurance_cost"]["std"] == pytest.approx(cost.std())
+    assert summary["insurance_cost"]["skew"] == pytest.approx(cost.skew())
+    assert summary["age"]["max"] == df["age"].max()
+    assert summary["bmi"]["quantiles"][0.5] == pytest.approx(
+        df["bmi"].median(), rel=0.02
+    )
+
+    smokers = summary["smoker"]["yes"]
+    assert smokers["count"] == (df["smoker"] == "yes").sum()
+    assert sum(v["share"] for v in summary["region"].values()) == pytest.approx(1)
+
+
+def test_out_of_range_integers_rejected(test_db):
+    """Test qu'une valeur hors des bornes du dtype compact lève une erreur"""
+    with test_db.begin() as conn:
+        conn.execute(text("UPDATE PATIENT SET nb_children = 300 WHERE id_patient = 1"))
+
+    with pytest.raises(ValueError, match="nb_children"):
+        load_patient_frame(test_db, ["nb_children"])
+    assert load_patient_frame(test_db, ["age"])["age"].dtype == "int16"
+
+    raw = pd.DataFrame({"age": [40, 70000]})
+    with pytest.raises(ValueError, match="int16"):
+        to_patient_frame(raw, None)
@@ -0,0 +1,99 @@
+"""Tests pour le module patient_kpis.py"""
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from modules.db_loader import load_patient_data
+from modules.patient_frame import load_patient_frame
+from modules.patient_kpis import (
+    COST_BUCKET_WIDTH,
+    disable_patient_kpis,
+    enable_patient_kpis,
+    get_cost_kpis,
+    get_cost_kpis_by,
+    has_patient_kpis,
+)
+
+
+@pytest.fixture
+def test_db(test_db):
+    """Fixture pour créer une base de test avec les agrégats activés"""
+    assert enable_patient_kpis(test_db)
+    return test_db
+
+
+def _assert_kpis_match(engine):
+    """Compare les agrégats à un calcul complet sur PATIENT"""
+    with engine.connect() as conn:
+        costs = pd.read_sql_query(text("SELECT insurance_cost FROM PATIENT"), conn)
+    costs = costs["insurance_cost"]
+    kpis = get_cost_kpis(engine)
+
+    assert kpis["count"] == len(costs)
+    assert kpis["mean"] == pytest.approx(costs.mean(), rel=1e-9)
+    assert kpis["std"] == pytest.approx(costs.std(), rel=1e-6)
+    assert kpis["min"] == pytest.approx(costs.min())
+    assert kpis["max"] == pytest.approx(costs.max())
+    assert abs(kpis["median"] - costs.median()) <= COST_BUCKET_WIDTH
+
+
+def test_patient_kpis_lifecycle(test_db):
+    """Test de l'activation et de la désactivation des agrégats"""
+    assert has_patient_kpis(test_db)
+    _assert_kpis_match(test_db)
+
+    assert disable_patient_kpis(test_db)
+    assert not has_patient_kpis(test_db)
+
+
+def test_triggers_keep_kpis_in_sync(test_db):
+    """Test de la mise à jour des agrégats par les triggers"""
+    load_patient_data(test_db, nb_patients=200)
+    _assert_kpis_match(test_db)
+
+    with test_db.begin() as conn:
+        # Suppression des extrêmes : min et max recalculés sur leur cellule
+        conn.execute(
+            text(
+                "DELETE FROM PATIENT WHERE insurance_cost IN "
+                "(SELECT MIN(insurance_cost) FROM PATIENT "
+                "UNION SELECT MAX(insurance_cost) FROM PATIENT)"
+            )
+        )
+        conn.execute(
+            text(
+                "UPDATE PATIENT SET age = age + 15, insurance_cost = insurance_cost * 2 "
+                "WHERE id_patient % 7 = 0"
+            )
+        )
+        conn.execute(text("UPDATE PATIENT SET bmi = 17.0 WHERE id_patient % 11 = 0"))
+    _assert_kpis_match(test_db)
+
+    with test_db.begin() as conn:
+        conn.execute(text("DELETE FROM PATIENT"))
+        assert conn.execute(text("SELECT COUNT(*) FROM PATIENT_KPIS")).scalar() == 0
+    assert get_cost_kpis(test_db) is None
+
+
+def test_kpis_by_factor(test_db):
+    """Test des indicateurs par modalité d'un facteur"""
+    df = load_patient_frame(test_db)
+    by_smoker = get_cost_kpis_by(test_db, "smoker")
+    expected = df.groupby("smoker", observed=True)["insurance_cost"]
+
+    assert set(by_smoker.index) == {"yes", "no"}
+    for label, group in expected:
+        assert by_smoker.loc[label, "count"] == len(group)
+        assert by_smoker.loc[label, "mean"] == pytest.approx(group.mean(), rel=1e-5)
+        assert by_smoker.loc[label, "max"] == pytest.approx(group.max(), rel=1e-5)
+
+    by_bmi = get_cost_kpis_by(test_db, "bmi_bucket")
+    assert by_bmi["count"].sum() == len(df)
+    assert set(by_bmi.index) <= {"insuffisance", "normal", "surpoids", "obésité"}
+
+    by_age = get_cost_kpis_by(test_db, "age_bucket")
+    assert list(by_age.index) == sorted(set(df["age"].astype(int) // 10 * 10))
+
+    with pytest.raises(ValueError):
+        get_cost_kpis_by(test_db, "nb_children")
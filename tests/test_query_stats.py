@@ -0,0 +1,87 @@
+"""Tests pour le module query_stats.py"""
+
+import pytest
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from modules.query_stats import (
+    LatencyHistogram,
+    get_pool_wait_stats,
+    get_query_stats,
+    instrument_engine,
+    normalize_sql,
+)
+
+
+def test_normalize_sql():
+    """Test de la normalisation des requêtes"""
+    assert (
+        normalize_sql("SELECT *\n  FROM PATIENT WHERE age > 40 AND sex = 'male'")
+        == "SELECT * FROM PATIENT WHERE age > ? AND sex = ?"
+    )
+    assert normalize_sql("SELECT 1 WHERE x IN (1, 2, 3)") == "SELECT ? WHERE x IN (?)"
+
+
+def test_latency_histogram():
+    """Test des percentiles de l'histogramme"""
+    histogram = LatencyHistogram()
+    for elapsed_ms in [0.5] * 90 + [30] * 9 + [700]:
+        histogram.record(elapsed_ms)
+
+    result = histogram.result()
+    assert result["count"] == 100
+    assert result["p50_ms"] == 1
+    assert result["p95_ms"] == 50
+    assert result["max_ms"] == 700
+
+
+def test_engine_statistics(test_db):
+    """Test des statistiques par requête et de l'attente du pool"""
+    stats = get_query_stats(test_db)
+    assert stats is not None and instrument_engine(test_db) is stats
+    stats.reset()
+
+    with test_db.begin() as conn:
+        for age in (30, 40, 50):
+            conn.execute(text(f"SELECT COUNT(*) FROM PATIENT WHERE age > {age}"))
+        conn.execute(text("UPDATE PATIENT SET nb_children = nb_children"))
+
+    snapshot = stats.snapshot().set_index("sql")
+    assert snapshot.loc["SELECT COUNT(*) FROM PATIENT WHERE age > ?", "count"] == 3
+    assert snapshot.loc["UPDATE PATIENT SET nb_children = nb_children", "rows"] > 0
+    assert snapshot.loc["SELECT COUNT(*) FROM PATIENT WHERE age > ?", "rows"] == 0
+    assert get_pool_wait_stats(test_db)["count"] > 0
+
+
+def test_slow_query_log(test_db):
+    """Test du journal des requêtes lentes avec plan d'exécution"""
+    stats = get_query_stats(test_db)
+    stats.slow_query_ms, stats.explain = 0, True
+    messages = []
+    handler = logger.add(messages.append, level="WARNING")
+    try:
+        with test_db.connect() as conn:
+            conn.execute(text("SELECT age FROM PATIENT WHERE id_sex = 1"))
+    finally:
+        logger.remove(handler)
+
+    assert any("Requête lente" in m and "plan :" in m for m in messages)
+
+
+def test_failed_statements(test_db):
+    """Test des requêtes en échec : comptées, sans fuite des temps de départ"""
+    stats = get_query_stats(test_db)
+    stats.reset()
+
+    with test_db.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT missing FROM PATIENT"))
+        conn.execute(text("SELECT COUNT(*) FROM PATIENT"))
+        assert conn.info["query_start_time"] == []
+
+    snapshot = stats.snapshot().set_index("sql")
+    assert snapshot.loc["SELECT missing FROM PATIENT", "count"] == 3
+    assert snapshot.loc["SELECT missing FROM PATIENT", "errors"] == 3
+    assert snapshot.loc["SELECT COUNT(*) FROM PATIENT", "errors"] == 0
@@ -0,0 +1,58 @@
+"""Tests pour le module streaming_stats.py"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.streaming_stats import CategoryCounter, QuantileSketch, RunningMoments
+
+
+@pytest.fixture
+def values():
+    """Échantillon asymétrique, avec zéros, négatifs et valeurs manquantes"""
+    rng = np.random.default_rng(0)
+    x = np.concatenate([rng.lognormal(9, 0.8, 5000), np.zeros(50), -rng.random(50)])
+    x[::97] = np.nan
+    return pd.Series(x)
+
+
+def test_running_moments_merge(values):
+    """Test que la fusion de blocs donne les statistiques de pandas"""
+    merged = RunningMoments()
+    for chunk in np.array_split(values, 7):
+        merged.merge(RunningMoments().update(chunk))
+
+    result = merged.result()
+    assert result["count"] == values.count()
+    assert result["mean"] == pytest.approx(values.mean())
+    assert result["std"] == pytest.approx(values.std())
+    assert result["skew"] == pytest.approx(values.skew())
+    assert result["kurtosis"] == pytest.approx(values.kurt())
+    assert result["min"] == values.min()
+    assert result["max"] == values.max()
+
+
+def test_quantile_sketch_accuracy(values):
+    """Test de l'erreur relative des quantiles estimés"""
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for chunk in np.array_split(values, 5):
+        sketch.merge(QuantileSketch(0.01).update(chunk))
+
+    for q in (0.01, 0.25, 0.5, 0.9, 0.99):
+        expected = values.quantile(q, interpolation="lower")
+        assert sketch.quantile(q) == pytest.approx(expected, rel=0.02, abs=1e-9)
+
+    with pytest.raises(ValueError):
+        sketch.merge(QuantileSketch(0.05))
+
+
+def test_category_counter():
+    """Test des fréquences et des valeurs manquantes"""
+    counter = CategoryCounter().update(pd.Series(["yes", "no", "no", None]))
+    counter.merge(CategoryCounter().update(pd.Categorical(["no", "yes", "no"])))
+
+    assert counter.missing == 1
+    assert counter.result() == {
+        "no": {"count": 4, "share": 4 / 6},
+        "yes": {"count": 2, "share": 2 / 6},
+    }
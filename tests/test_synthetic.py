@@ -0,0 +1,97 @@
+"""Tests pour le module synthetic.py"""
+
+import uuid
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from modules.db_loader import create_database
+from modules.synthetic import (
+    fit_insurance_model,
+    generate_patients_parallel,
+    plan_shards,
+    sample_insurance_arrays,
+)
+
+
+@pytest.fixture
+def make_db(tmp_path):
+    """Fixture créant des bases de test vides de patients"""
+    engines = []
+
+    def _make():
+        db_path = tmp_path / f"test_medical_costs_{uuid.uuid4()}.db"
+        engine = create_database(db_path=str(db_path))
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM PATIENT"))
+        engines.append(engine)
+        return engine
+
+    yield _make
+
+    for engine in engines:
+        engine.dispose()
+
+
+def _patients(engine):
+    with engine.connect() as conn:
+        return pd.read_sql_query(text("SELECT * FROM PATIENT ORDER BY rowid"), conn)
+
+
+def test_plan_shards():
+    """Test du découpage en shards"""
+    assert [size for _, size in plan_shards(2500, seed=1, shard_size=1000)] == [
+        1000,
+        1000,
+        500,
+    ]
+    assert plan_shards(0, seed=1) == []
+
+
+def test_generation_independent_of_workers(make_db):
+    """Test qu'une graine donne la même base quel que soit le nombre de processus"""
+    sequential, parallel = make_db(), make_db()
+
+    assert (
+        generate_patients_parallel(sequential, 2500, seed=7, workers=1, shard_size=400)
+        == 2500
+    )
+    assert (
+        generate_patients_parallel(parallel, 2500, seed=7, workers=3, shard_size=400)
+        == 2500
+    )
+
+    expected = _patients(sequential)
+    assert len(expected) == 2500
+    pd.testing.assert_frame_equal(_patients(parallel), expected)
+
+
+def test_insurance_sampling_matches_source(make_db):
+    """Test que les données générées reproduisent la distribution de insurance.csv"""
+    engine = make_db()
+    with engine.connect() as conn:
+        model = fit_insurance_model(conn)
+    source = pd.DataFrame({k: v for k, v in model.items() if not k.endswith("slope")})
+    sample = pd.DataFrame(
+        sample_insurance_arrays(np.random.default_rng(0), 100_000, model)
+    )
+
+    assert sample["age"].between(18, 64).all()
+    for column in ["age", "bmi", "insurance_cost"]:
+        assert sample[column].mean() == pytest.approx(source[column].mean(), rel=0.02)
+    by_smoker = sample.groupby("id_smoking_status")["insurance_cost"].mean()
+    expected = source.groupby("id_smoking_status")["insurance_cost"].mean()
+    pd.testing.assert_series_equal(by_smoker, expected, rtol=0.03)
+    assert sample.corr()["insurance_cost"]["age"] == pytest.approx(
+        source.corr()["insurance_cost"]["age"], abs=0.03
+    )
+
+
+def test_generation_sources(make_db):
+    """Test de la source uniforme et des sources inconnues"""
+    engine = make_db()
+    assert generate_patients_parallel(engine, 100, seed=1, workers=1, source="uniform")
+    with pytest.raises(ValueError):
+        generate_patients_parallel(engine, 100, source="normal")